@@ -1,11 +1,14 @@
-from flask import Flask
+from flask import Flask, g
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_moment import Moment
 from flask_sqlalchemy import SQLAlchemy
 from flask_wtf import CSRFProtect
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-db = SQLAlchemy()
+from .database import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
 migrate = Migrate()
 csrf = CSRFProtect()
@@ -27,30 +30,89 @@ def create_app(config=None):
     else:
         app.config.from_pyfile("config.py")
 
+    # Behind TRUSTED_PROXIES reverse proxies, request.remote_addr is the
+    # client address they add to X-Forwarded-For rather than the last proxy's
+    proxies = app.config.get("TRUSTED_PROXIES", 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies)
+
     db.init_app(app)
     login_manager.init_app(app)
     migrate.init_app(app, db)
     csrf.init_app(app)
     moment.init_app(app)
 
-    from .models import User
+    from .database import init_read_replica, init_sqlite_profile
+
+    init_sqlite_profile(app)
+    init_read_replica(app)
+
+    from .profiling import init_profiling
+
+    # First, so a profiled request includes the other before_request hooks
+    init_profiling(app)
+
+    from .instrumentation import init_sql_instrumentation
+
+    # Registered first, so its after_request hook runs last and sees every query
+    init_sql_instrumentation(app)
+
+    from .metrics import init_metrics
+
+    # After the SQL instrumentation, so the request's DB time is still there
+    init_metrics(app)
+
+    from .passwords import init_password_policy
+
+    init_password_policy(app)
+
+    from .rate_limit import init_login_rate_limit
+
+    init_login_rate_limit(app)
+
+    from .sessions import init_sessions
+
+    init_sessions(app)
+
+    from .user_cache import init_user_cache, load_user
 
     login_manager.login_view = "main.login"
     login_manager.login_message_category = "info"
 
-    @login_manager.user_loader
-    def load_user(user_id):
-        """
-        Load a user by their user ID.
-        """
-        return User.query.get(int(user_id))
+    init_user_cache(app)
+    login_manager.user_loader(load_user)
+
+    from .images import init_avatars, init_image_pipeline
+
+    init_image_pipeline(app)
+    init_avatars(app)
 
     from .routes import bp
 
     app.register_blueprint(bp)
 
+    from .counters import init_open_ticket_counter
     from .utils import inject_open_tickets_count
 
+    init_open_ticket_counter(app)
     app.context_processor(inject_open_tickets_count)
 
+    from .importer import init_importer
+    from .seed import init_seed
+
+    init_importer(app)
+    init_seed(app)
+
+    from .template_cache import init_template_cache
+
+    # Last, so preloaded templates see everything registered above
+    init_template_cache(app)
+
+    @app.teardown_request
+    def clear_open_tickets_count(exc):
+        """
+        Forgets the badge count looked up during the request.
+        """
+        g.pop("open_tickets_count", None)
+
     return app
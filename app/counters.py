@@ -0,0 +1,168 @@
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.database import read_from_primary
+from app.models import Ticket
+
+OPEN_STATUSES = ("open", "in-progress")
+
+# Keys used to stage counter changes on a session until it commits
+_DELTA_KEY = "open_ticket_delta"
+_STALE_KEY = "open_ticket_stale"
+
+
+class OpenTicketCounter:
+    """
+    Caches the number of open and in-progress tickets.
+
+    The value is adjusted in place as tickets are committed and is
+    reconciled against the database whenever it is older than
+    `reconcile_interval` seconds, which also picks up changes made by
+    other processes. Recounts always read the primary: a lagging replica
+    would bring back the count from before a bulk change, and keep it for
+    the whole interval.
+    """
+
+    def __init__(self, reconcile_interval=60):
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._value = None
+        self._reconciled_at = 0.0
+
+    def get(self):
+        """
+        Returns the cached count, reconciling first if it is missing or stale.
+        """
+        with self._lock:
+            if (
+                self._value is None
+                or time.monotonic() - self._reconciled_at >= self.reconcile_interval
+            ):
+                self._reconcile()
+            return self._value
+
+    def reconcile(self):
+        """
+        Recounts open tickets from the database.
+        """
+        with self._lock:
+            self._reconcile()
+            return self._value
+
+    def apply(self, delta):
+        """
+        Adjusts the cached count by `delta` after a committed change.
+        """
+        with self._lock:
+            if self._value is not None:
+                self._value = max(0, self._value + delta)
+
+    def invalidate(self):
+        """
+        Drops the cached count so the next read recounts from the database.
+        """
+        with self._lock:
+            self._value = None
+
+    def _reconcile(self):
+        with read_from_primary():
+            self._value = Ticket.query.filter(Ticket.status.in_(OPEN_STATUSES)).count()
+        self._reconciled_at = time.monotonic()
+
+
+def init_open_ticket_counter(app):
+    """
+    Attaches an open-ticket counter to the application.
+    """
+    app.extensions["open_ticket_counter"] = OpenTicketCounter(
+        app.config.get("OPEN_TICKETS_RECONCILE_SECONDS", 60)
+    )
+
+
+def get_open_ticket_counter():
+    """
+    Returns the counter of the current application, if there is one.
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("open_ticket_counter")
+
+
+def _stage(target, delta=0, stale=False):
+    session = object_session(target)
+    if session is None:
+        return
+    if stale:
+        session.info[_STALE_KEY] = True
+    else:
+        session.info[_DELTA_KEY] = session.info.get(_DELTA_KEY, 0) + delta
+
+
+@event.listens_for(Ticket, "after_insert")
+def _ticket_inserted(mapper, connection, target):
+    if target.status in OPEN_STATUSES:
+        _stage(target, 1)
+
+
+@event.listens_for(Ticket, "after_update")
+def _ticket_updated(mapper, connection, target):
+    history = inspect(target).attrs.status.history
+    if not history.has_changes():
+        return
+    if not history.deleted:
+        # The previous status was never loaded, so the change can't be counted
+        _stage(target, stale=True)
+        return
+    was_open = history.deleted[0] in OPEN_STATUSES
+    is_open = target.status in OPEN_STATUSES
+    if was_open != is_open:
+        _stage(target, 1 if is_open else -1)
+
+
+@event.listens_for(Ticket, "after_delete")
+def _ticket_deleted(mapper, connection, target):
+    if "status" in inspect(target).unloaded:
+        _stage(target, stale=True)
+    elif target.status in OPEN_STATUSES:
+        _stage(target, -1)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _ticket_bulk_statement(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the mapper events above
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None and table.name == Ticket.__tablename__:
+        orm_execute_state.session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged_changes(session):
+    delta = session.info.pop(_DELTA_KEY, 0)
+    stale = session.info.pop(_STALE_KEY, False)
+    counter = get_open_ticket_counter()
+    if counter is None:
+        return
+    if stale:
+        counter.invalidate()
+    elif delta:
+        counter.apply(delta)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged_changes(session, previous_transaction):
+    delta = session.info.pop(_DELTA_KEY, 0)
+    if not previous_transaction.nested:
+        session.info.pop(_STALE_KEY, None)
+    elif delta:
+        # Changes made before the savepoint may still commit
+        session.info[_STALE_KEY] = True
@@ -0,0 +1,208 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import click
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask import session as http_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.expression import UpdateBase
+
+# Name of the SQLALCHEMY_BINDS entry that read-only requests are sent to
+REPLICA_BIND = "replica"
+
+# Session cookie key holding the time until which reads stay on the primary
+_PRIMARY_UNTIL_KEY = "_primary_until"
+
+# Applied to every new SQLite connection unless SQLITE_TUNING is disabled.
+# SQLITE_PRAGMAS in the app config overrides individual values.
+SQLITE_PRAGMAS = {
+    # Readers no longer block behind a writer, and vice versa
+    "journal_mode": "WAL",
+    # Safe with WAL: a power loss may drop the last commits but never corrupts
+    "synchronous": "NORMAL",
+    # Negative values are in KiB, so this is a 64 MiB page cache per connection
+    "cache_size": -64_000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    # Wait for a competing writer instead of failing with "database is locked"
+    "busy_timeout": 5_000,
+}
+
+
+def set_sqlite_pragmas(dbapi_connection, pragmas):
+    """
+    Runs `PRAGMA name = value` for each entry on a raw SQLite connection.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def init_sqlite_profile(app):
+    """
+    Tunes every SQLite engine of the application for concurrent use.
+
+    Each new connection gets `SQLITE_PRAGMAS`. Other databases are left alone.
+    """
+    if not app.config.get("SQLITE_TUNING", True):
+        return
+
+    pragmas = {**SQLITE_PRAGMAS, **app.config.get("SQLITE_PRAGMAS", {})}
+
+    def on_connect(dbapi_connection, connection_record):
+        set_sqlite_pragmas(dbapi_connection, pragmas)
+
+    with app.app_context():
+        for engine in app.extensions["sqlalchemy"].engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", on_connect)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica while `read_from_replica` is active.
+
+    Flushes and INSERT, UPDATE and DELETE statements always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+            and reads_from_replica()
+        ):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def reads_from_replica():
+    """
+    Whether reads should go to the replica at this point of the request.
+
+    A client that recently wrote is kept on the primary, so it always sees its
+    own changes even while the replica is lagging.
+    """
+    if not has_app_context() or not g.get("read_replica", False):
+        return False
+    if has_request_context() and http_session.get(_PRIMARY_UNTIL_KEY, 0) > time.time():
+        return False
+    return True
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Routes the reads made inside the block to the replica, if one is configured.
+    """
+    if not has_app_context():
+        yield
+        return
+    previous = g.get("read_replica", False)
+    g.read_replica = True
+    try:
+        yield
+    finally:
+        g.read_replica = previous
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Routes the reads made inside the block to the primary, even in a view
+    that otherwise reads from the replica.
+    """
+    if not has_app_context():
+        yield
+        return
+    previous = g.get("read_replica", False)
+    g.read_replica = False
+    try:
+        yield
+    finally:
+        g.read_replica = previous
+
+
+def replica_reads(view_method):
+    """
+    Decorator for read-only view methods whose queries may use the replica.
+    """
+
+    @wraps(view_method)
+    def wrapper(*args, **kwargs):
+        with read_from_replica():
+            return view_method(*args, **kwargs)
+
+    return wrapper
+
+
+def stick_to_primary():
+    """
+    Keeps the client's reads on the primary for a while after a write request.
+    """
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        http_session[_PRIMARY_UNTIL_KEY] = time.time() + current_app.config.get(
+            "REPLICA_STICKY_SECONDS", 10
+        )
+
+
+class SQLiteReplicator:
+    """
+    Stand-in for database replication when running locally on SQLite.
+
+    Each `sync` copies the primary database file over the replica with
+    SQLite's backup API, so the replica lags by however long it has been.
+    """
+
+    def __init__(self, primary_path, replica_path):
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+
+    def sync(self):
+        source = sqlite3.connect(self.primary_path)
+        target = sqlite3.connect(self.replica_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+
+@click.command("replicate")
+@click.option("--interval", default=1.0, help="Seconds between copies.")
+def replicate_command(interval):
+    """
+    Keeps the SQLite replica in sync with the primary database.
+    """
+    engines = current_app.extensions["sqlalchemy"].engines
+    if REPLICA_BIND not in engines:
+        raise click.ClickException(f"No '{REPLICA_BIND}' entry in SQLALCHEMY_BINDS.")
+    replicator = SQLiteReplicator(
+        engines[None].url.database, engines[REPLICA_BIND].url.database
+    )
+    click.echo(f"Copying {replicator.primary_path} to {replicator.replica_path}")
+    while True:
+        replicator.sync()
+        time.sleep(interval)
+
+
+def init_read_replica(app):
+    """
+    Sends read-only requests to the replica bind, when one is configured.
+    """
+    if REPLICA_BIND not in app.config.get("SQLALCHEMY_BINDS", {}):
+        return
+    # No models live on the replica, so drop the metadata Flask-SQLAlchemy
+    # made for the bind. Otherwise create_all() would expect a replica engine
+    # in every app sharing `db`.
+    app.extensions["sqlalchemy"].metadatas.pop(REPLICA_BIND, None)
+    app.before_request(stick_to_primary)
+    app.cli.add_command(replicate_command)
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.database import read_from_replica
+from app.models import Comment, Ticket, User
+from app.queries import all_tickets_query, closed_tickets_query
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_SCOPES = {"all": all_tickets_query, "closed": closed_tickets_query}
+
+_creator = aliased(User, name="creator")
+_assignee = aliased(User, name="assignee")
+_author = aliased(User, name="author")
+
+TICKET_COLUMNS = {
+    "id": Ticket.id,
+    "title": Ticket.title,
+    "description": Ticket.description,
+    "status": Ticket.status,
+    "priority": Ticket.priority,
+    "created_at": Ticket.created_at,
+    "updated_at": Ticket.updated_at,
+    "creator": _creator.name,
+    "creator_email": _creator.email,
+    "assignee": _assignee.name,
+    "assignee_email": _assignee.email,
+}
+COMMENT_COLUMNS = {
+    "id": Comment.id,
+    "ticket_id": Comment.ticket_id,
+    "created_at": Comment.created_at,
+    "author": _author.name,
+    "author_email": _author.email,
+    "comment_text": Comment.comment_text,
+}
+
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_date_range(start, end):
+    """
+    Parses optional ISO 8601 bounds into a half-open (start, end) range.
+
+    A bare date as the end bound includes the whole of that day.
+    """
+    try:
+        start = datetime.fromisoformat(start) if start else None
+        end_value = datetime.fromisoformat(end) if end else None
+    except ValueError:
+        raise ExportError("Dates must be in ISO 8601 format, e.g. 2024-01-31.")
+    if end_value is not None and len(end) == len(date.min.isoformat()):
+        end_value += timedelta(days=1)
+    return start, end_value
+
+
+def _in_range(column, bounds):
+    start, end = bounds
+    criteria = []
+    if start is not None:
+        criteria.append(column >= start)
+    if end is not None:
+        criteria.append(column < end)
+    return criteria
+
+
+def ticket_export_query(user, scope="all", created=(None, None), updated=(None, None)):
+    """
+    Ticket rows visible to `user` on the All or Closed Tickets page, by ID.
+    """
+    query = (
+        db.session.query(*TICKET_COLUMNS.values())
+        .select_from(Ticket)
+        .outerjoin(_creator, Ticket.user_id == _creator.id)
+        .outerjoin(_assignee, Ticket.assigned_to == _assignee.id)
+    )
+    query = EXPORT_SCOPES[scope](user, query)
+    return query.filter(
+        *_in_range(Ticket.created_at, created), *_in_range(Ticket.updated_at, updated)
+    ).order_by(Ticket.id)
+
+
+def comment_export_query(user, scope="all", created=(None, None), updated=(None, None)):
+    """
+    Comments on the tickets `ticket_export_query` would return, by ID.
+
+    `created` applies to the comment, `updated` to its ticket.
+    """
+    query = (
+        db.session.query(*COMMENT_COLUMNS.values())
+        .join(Ticket, Comment.ticket_id == Ticket.id)
+        .outerjoin(_author, Comment.user_id == _author.id)
+    )
+    query = EXPORT_SCOPES[scope](user, query)
+    return query.filter(
+        *_in_range(Comment.created_at, created), *_in_range(Ticket.updated_at, updated)
+    ).order_by(Comment.id)
+
+
+def _batches(query, batch_size):
+    # yield_per streams the result in batches instead of buffering all rows
+    with read_from_replica():
+        result = db.session.execute(
+            query.statement.execution_options(yield_per=batch_size)
+        )
+        yield from result.partitions()
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(query, columns, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields the rows of `query` as CSV text, one chunk per batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in _batches(query, batch_size):
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.getvalue():
+        # Only the header is left when there were no rows
+        yield buffer.getvalue()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def stream_ndjson(query, columns, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields the rows of `query` as newline-delimited JSON objects.
+    """
+    for rows in _batches(query, batch_size):
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+            for row in rows
+        )
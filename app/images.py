@@ -0,0 +1,271 @@
+import atexit
+import collections
+import hashlib
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from flask import current_app, request, url_for
+from PIL import Image, ImageOps
+
+from app import db
+from app.metrics import IMAGE_PROCESSING_DURATION
+from app.models import User
+from app.user_cache import invalidate_user
+from app.utils import UPLOAD_FOLDER
+
+ORIGINALS_FOLDER = os.path.join(UPLOAD_FOLDER, "originals")
+AVATAR_FOLDER = os.path.join(UPLOAD_FOLDER, "avatars")
+
+# profile_image values with this prefix name a content-addressed variant set
+AVATAR_PREFIX = "avatars/"
+# 1x and 2x of the avatar slots: 50px and smaller, and the 100px navbar
+# and profile page circles
+AVATAR_SIZES = (32, 64, 100, 200)
+AVATAR_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+AVATAR_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def avatar_filename(key, size, ext):
+    return f"{key}-{size}.{ext}"
+
+
+def build_avatar_variants(source_path, avatar_folder, key):
+    """
+    Writes every size and format of an avatar, each replaced atomically.
+
+    The original is deleted afterwards, whether or not it could be read, so
+    only uploads still being processed are kept. Runs in a worker process,
+    so it only deals with files.
+    """
+    try:
+        with Image.open(source_path) as original:
+            original = ImageOps.exif_transpose(original).convert("RGB")
+            for size in AVATAR_SIZES:
+                img = ImageOps.fit(original, (size, size), Image.Resampling.LANCZOS)
+                for ext, image_format in AVATAR_FORMATS.items():
+                    target_path = os.path.join(
+                        avatar_folder, avatar_filename(key, size, ext)
+                    )
+                    # Write alongside and rename, so readers never see a partial file
+                    tmp_path = f"{target_path}.{os.getpid()}.tmp"
+                    img.save(tmp_path, format=image_format, quality=85)
+                    os.replace(tmp_path, target_path)
+    finally:
+        os.remove(source_path)
+    return AVATAR_PREFIX + key
+
+
+class ImagePipeline:
+    """
+    Builds avatar variants of uploaded profile images on a bounded process pool.
+
+    At most `max_pending` jobs are queued. Once the pool is that busy, or when
+    `max_workers` is 0, images are processed in the calling thread instead.
+    """
+
+    def __init__(self, app, max_workers=2, max_pending=16):
+        self.app = app
+        self.max_workers = max_workers
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._lock = threading.Lock()
+        self._executor = None
+        # While a user has jobs on the pool, their newest submission and the
+        # number of those jobs, so an older job that finishes last is dropped
+        self._latest = {}
+        self._in_flight = collections.Counter()
+        self._submissions = itertools.count(1)
+
+    def submit(self, user_id, upload, current_image=None):
+        """
+        Stores the uploaded original and schedules its avatar variants.
+
+        Files are named after a hash of the upload, so a new image never
+        reuses an old URL. If the variants already existed or were built
+        inline, returns the new `profile_image` value for the caller to save
+        with the rest of its changes. Otherwise returns the job's future, and
+        the user is updated when the job is done, unless the user has
+        uploaded another image since or no longer has `current_image`, the
+        value they had when this one was submitted.
+        """
+        submission = self._supersede(user_id)
+        for folder in (UPLOAD_FOLDER, ORIGINALS_FOLDER, AVATAR_FOLDER):
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+        data = upload.read()
+        key = hashlib.sha256(data).hexdigest()[:32]
+        if all(
+            os.path.exists(os.path.join(AVATAR_FOLDER, avatar_filename(key, size, ext)))
+            for size in AVATAR_SIZES
+            for ext in AVATAR_FORMATS
+        ):
+            return AVATAR_PREFIX + key
+
+        file_ext = upload.filename.rsplit(".", 1)[1].lower()
+        source_path = os.path.join(ORIGINALS_FOLDER, f"{key}.{file_ext}")
+        with open(source_path, "wb") as f:
+            f.write(data)
+
+        if self.max_workers == 0 or not self._slots.acquire(blocking=False):
+            started = time.perf_counter()
+            profile_image = build_avatar_variants(source_path, AVATAR_FOLDER, key)
+            IMAGE_PROCESSING_DURATION.observe(
+                time.perf_counter() - started, mode="inline"
+            )
+            return profile_image
+
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(
+                build_avatar_variants, source_path, AVATAR_FOLDER, key
+            )
+        except Exception:
+            self._slots.release()
+            raise
+        self._supersede(user_id, submission)
+        future.add_done_callback(
+            partial(self._job_done, user_id, submission, current_image, started)
+        )
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                atexit.register(self.shutdown)
+            return self._executor
+
+    def _supersede(self, user_id, job=None):
+        """
+        Makes the submission, or the pool `job`, the user's newest one.
+
+        Returns the new submission number when `job` is None.
+        """
+        with self._lock:
+            submission = job or next(self._submissions)
+            if job is not None:
+                self._in_flight[user_id] += 1
+            if self._in_flight[user_id]:
+                self._latest[user_id] = max(self._latest.get(user_id, 0), submission)
+            return submission
+
+    def _job_done(self, user_id, submission, current_image, started, future):
+        self._slots.release()
+        with self._lock:
+            superseded = self._latest[user_id] != submission
+            self._in_flight[user_id] -= 1
+            if not self._in_flight[user_id]:
+                del self._in_flight[user_id], self._latest[user_id]
+        try:
+            profile_image = future.result()
+            IMAGE_PROCESSING_DURATION.observe(
+                time.perf_counter() - started, mode="pool"
+            )
+        except Exception:
+            self.app.logger.exception(
+                "Profile image processing failed for user %s", user_id
+            )
+            return
+        if superseded:
+            return
+        with self.app.app_context():
+            self._finish(user_id, profile_image, current_image)
+
+    def _finish(self, user_id, profile_image, current_image):
+        # A single UPDATE in the callback's own session, so the new image
+        # appears all at once or not at all. It only applies while the user
+        # still has the image they had when uploading, so an image saved
+        # since, by this process or another one, is not overwritten.
+        result = db.session.execute(
+            db.update(User)
+            .where(
+                User.id == user_id,
+                User.profile_image.is_not_distinct_from(current_image),
+            )
+            .values(profile_image=profile_image)
+        )
+        db.session.commit()
+        if result.rowcount:
+            invalidate_user(user_id)
+
+
+def init_image_pipeline(app):
+    """
+    Attaches a profile image pipeline to the application.
+    """
+    app.extensions["image_pipeline"] = ImagePipeline(
+        app,
+        max_workers=app.config.get("IMAGE_PROCESSING_WORKERS", 2),
+        max_pending=app.config.get("IMAGE_PROCESSING_QUEUE_SIZE", 16),
+    )
+
+
+def get_image_pipeline():
+    return current_app.extensions["image_pipeline"]
+
+
+def _variant_for(size):
+    """Smallest avatar size covering `size` pixels, or the largest one."""
+    return next((s for s in AVATAR_SIZES if s >= size), AVATAR_SIZES[-1])
+
+
+def avatar_sources(profile_image, size):
+    """
+    Returns the image URLs for showing `profile_image` at `size` CSS pixels.
+
+    Variant sets get the smallest JPEG and WebP variants covering 1x and 2x
+    displays. Older single-file images and the default avatar get only `src`.
+    """
+    if not profile_image or not profile_image.startswith(AVATAR_PREFIX):
+        filename = "uploads/profile_images/" + (profile_image or "default.jpg")
+        return {"src": url_for("static", filename=filename)}
+
+    key = profile_image[len(AVATAR_PREFIX) :]
+    one_x, two_x = _variant_for(size), _variant_for(size * 2)
+
+    def variant_url(px, ext):
+        filename = f"uploads/profile_images/avatars/{avatar_filename(key, px, ext)}"
+        return url_for("static", filename=filename)
+
+    return {
+        "src": variant_url(one_x, "jpg"),
+        "srcset": f"{variant_url(one_x, 'jpg')} 1x, {variant_url(two_x, 'jpg')} 2x",
+        "webp_srcset": (
+            f"{variant_url(one_x, 'webp')} 1x, {variant_url(two_x, 'webp')} 2x"
+        ),
+    }
+
+
+def add_avatar_cache_headers(response):
+    """
+    Lets browsers cache avatar variants for good, as their names never change.
+    """
+    filename = (request.view_args or {}).get("filename", "")
+    if (
+        request.endpoint == "static"
+        and filename.startswith("uploads/profile_images/avatars/")
+        and response.status_code == 200
+    ):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = AVATAR_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def init_avatars(app):
+    """
+    Registers the avatar template helper and cache headers.
+    """
+    app.add_template_global(avatar_sources)
+    app.after_request(add_avatar_cache_headers)
@@ -0,0 +1,338 @@
+import csv
+import itertools
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.export import FORMULA_PREFIXES
+from app.models import Comment, Ticket, User
+from app.tickets import PRIORITIES, STATUSES
+
+IMPORT_CHUNK_SIZE = 5000
+ROLES = ("admin", "support", "regular")
+# Existing rows are looked up in batches of this many IDs
+ID_BATCH_SIZE = 500
+# Imported users without a password hash can't log in until it is reset
+LOCKED_PASSWORD_HASH = "!"
+
+
+class ImportFailed(click.ClickException):
+    pass
+
+
+def read_rows(path):
+    """
+    Yields the records of a CSV file (with a header row) or an NDJSON file.
+
+    The quote the CSV export puts before values that would run as
+    spreadsheet formulas is removed again.
+    """
+    if path.endswith((".ndjson", ".jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                yield {key: _unguard(value) for key, value in record.items()}
+
+
+def _unguard(value):
+    if (
+        isinstance(value, str)
+        and value[:1] == "'"
+        and value[1:].startswith(FORMULA_PREFIXES)
+    ):
+        return value[1:]
+    return value
+
+
+def _value(record, key):
+    value = record.get(key)
+    if isinstance(value, str):
+        value = value.strip()
+    return value if value not in ("", None) else None
+
+
+def _choice(record, key, choices, default):
+    value = _value(record, key) or default
+    if value not in choices:
+        raise ValueError(f"{key} must be one of {', '.join(choices)}: {value!r}")
+    return value
+
+
+def _datetime(record, key):
+    value = _value(record, key)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} is not an ISO 8601 date: {value!r}")
+
+
+class RecordMapper:
+    """
+    Turns imported records into column values, resolving users by email.
+
+    The record layout matches the CSV and NDJSON exports, so an export can
+    be imported into another instance. Tickets and comments keep their
+    exported IDs, and comments name their ticket by that ID, so the target
+    must not hold other tickets or comments with the same IDs.
+    """
+
+    def __init__(self):
+        self.user_ids = {}
+        self.unresolved = 0
+        self.now = datetime.now(timezone.utc)
+
+    def load_users(self):
+        self.user_ids = {
+            email.lower(): user_id
+            for email, user_id in db.session.execute(db.select(User.email, User.id))
+        }
+
+    def user_id(self, email):
+        if email is None:
+            return None
+        user_id = self.user_ids.get(email.lower())
+        if user_id is None:
+            self.unresolved += 1
+        return user_id
+
+    def user(self, record):
+        email = _value(record, "email")
+        if not email or not _value(record, "name"):
+            raise ValueError("users need a name and an email")
+        return {
+            "name": _value(record, "name"),
+            "email": email.lower(),
+            "role": _choice(record, "role", ROLES, "regular"),
+            "password_hash": _value(record, "password_hash") or LOCKED_PASSWORD_HASH,
+            "profile_image": _value(record, "profile_image"),
+        }
+
+    def ticket(self, record):
+        created_at = _datetime(record, "created_at") or self.now
+        row = {
+            "title": _value(record, "title"),
+            "description": _value(record, "description") or "",
+            "status": _choice(record, "status", STATUSES, "open"),
+            "priority": _choice(record, "priority", PRIORITIES, "low"),
+            "created_at": created_at,
+            "updated_at": _datetime(record, "updated_at") or created_at,
+            "user_id": self.user_id(_value(record, "creator_email")),
+            "assigned_to": self.user_id(_value(record, "assignee_email")),
+        }
+        if not row["title"]:
+            raise ValueError("tickets need a title")
+        if _value(record, "id") is not None:
+            row["id"] = int(_value(record, "id"))
+        return row
+
+    def comment(self, record):
+        row = {
+            "ticket_id": int(_value(record, "ticket_id")),
+            "user_id": self.user_id(_value(record, "author_email")),
+            "comment_text": _value(record, "comment_text") or "",
+            "created_at": _datetime(record, "created_at") or self.now,
+        }
+        if _value(record, "id") is not None:
+            row["id"] = int(_value(record, "id"))
+        return row
+
+
+class ImportState:
+    """
+    Remembers how many records of each file have been committed.
+
+    The count is saved after every chunk, so an import that stopped part way
+    picks up at the first chunk that did not commit.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.done = json.load(f)
+        except FileNotFoundError:
+            self.done = {}
+
+    def get(self, source):
+        return self.done.get(os.path.abspath(source), 0)
+
+    def set(self, source, rows):
+        self.done[os.path.abspath(source)] = rows
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.done, f)
+        os.replace(tmp, self.path)
+
+    def clear(self, source):
+        self.set(source, 0)
+
+
+def _insert_ignoring_duplicates(table):
+    # Users already present, matched by email, are kept as they are
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    return table.insert()
+
+
+def _drop_rows_already_imported(table, rows, fields):
+    """
+    Returns `rows` without those an earlier run of the import inserted.
+
+    A chunk can be committed without being recorded in the import state, if
+    the import stops in between. Its rows are found by ID, and an existing
+    row with the same ID but other `fields` values is not from the import:
+    skipping the record would lose it and attach its comments to an
+    unrelated ticket, so ValueError is raised instead.
+    """
+    ids = [row["id"] for row in rows if "id" in row]
+    existing = {}
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        existing.update(
+            (row.id, row)
+            for row in db.session.execute(
+                db.select(table.c.id, *(table.c[field] for field in fields)).where(
+                    table.c.id.in_(ids[start : start + ID_BATCH_SIZE])
+                )
+            )
+        )
+    for row in rows:
+        found = existing.get(row.get("id"))
+        if found is not None and any(getattr(found, f) != row[f] for f in fields):
+            raise ValueError(
+                f"{table.name} {row['id']} already exists and is not from this "
+                "import. Import into an empty instance."
+            )
+    return [row for row in rows if row.get("id") not in existing]
+
+
+def import_file(kind, source, mapper, state, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Inserts the records of `source` in chunks of bulk INSERTs.
+
+    Every chunk is committed on its own and recorded in `state`. Returns
+    (rows read, rows inserted, seconds).
+    """
+    table, to_row, fields = {
+        "users": (User.__table__, mapper.user, None),
+        "tickets": (Ticket.__table__, mapper.ticket, ("title", "description")),
+        "comments": (Comment.__table__, mapper.comment, ("ticket_id", "comment_text")),
+    }[kind]
+    # Compiled once and run with each chunk as its parameter list, which
+    # SQLAlchemy sends as multi-row VALUES batches or a DB-API executemany
+    statement = _insert_ignoring_duplicates(table) if fields is None else table.insert()
+    done = state.get(source)
+    if done:
+        click.echo(f"{kind}: resuming {source} after record {done}")
+
+    records = itertools.islice(read_rows(source), done, None)
+    read = inserted = 0
+    start = time.perf_counter()
+    while chunk := list(itertools.islice(records, chunk_size)):
+        rows = []
+        for number, record in enumerate(chunk, start=done + read + 1):
+            try:
+                rows.append(to_row(record))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ImportFailed(f"{source}, record {number}: {e}")
+        if fields is not None:
+            try:
+                rows = _drop_rows_already_imported(table, rows, fields)
+            except ValueError as e:
+                raise ImportFailed(f"{source}: {e}")
+        try:
+            # Rows with an ID and rows without one can't share an executemany
+            for _, group in itertools.groupby(rows, key=lambda row: "id" in row):
+                result = db.session.execute(statement, list(group))
+                inserted += max(result.rowcount, 0)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise ImportFailed(
+                f"{source}, records {done + read + 1}-{done + read + len(chunk)}: "
+                f"{e.__class__.__name__}: {getattr(e, 'orig', e)}"
+            )
+        read += len(chunk)
+        state.set(source, done + read)
+    elapsed = time.perf_counter() - start
+    return read, inserted, elapsed
+
+
+@click.command("import")
+@click.option("--users", "users_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--tickets", "tickets_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--comments", "comments_file", type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--chunk-size", default=IMPORT_CHUNK_SIZE, show_default=True, type=click.IntRange(1)
+)
+@click.option(
+    "--state-file",
+    type=click.Path(dir_okay=False),
+    help="Progress file, import_state.json in the instance folder by default.",
+)
+@click.option("--restart", is_flag=True, help="Ignore earlier progress.")
+@with_appcontext
+def import_command(
+    users_file, tickets_file, comments_file, chunk_size, state_file, restart
+):
+    """
+    Imports users, tickets and comments from CSV or NDJSON files.
+
+    Files use the columns of the /export downloads. Users are matched by
+    email: tickets name them in creator_email and assignee_email, comments in
+    author_email. Users without a password_hash can't log in until they reset
+    their password. Running the same command again after a failure resumes
+    where it stopped.
+    """
+    if not (users_file or tickets_file or comments_file):
+        raise click.UsageError("Give at least one of --users, --tickets, --comments.")
+    if state_file is None:
+        os.makedirs(current_app.instance_path, exist_ok=True)
+        state_file = os.path.join(current_app.instance_path, "import_state.json")
+    state = ImportState(state_file)
+    mapper = RecordMapper()
+
+    for kind, source in (
+        ("users", users_file),
+        ("tickets", tickets_file),
+        ("comments", comments_file),
+    ):
+        if source is None:
+            continue
+        if restart:
+            state.clear(source)
+        # Users imported so far are needed to resolve the next file's emails
+        mapper.load_users()
+        read, inserted, elapsed = import_file(kind, source, mapper, state, chunk_size)
+        rate = read / elapsed if elapsed else 0
+        click.echo(
+            f"{kind}: {read} records, {inserted} inserted, "
+            f"{read - inserted} already present, in {elapsed:.1f}s ({rate:,.0f} rows/s)"
+        )
+    if mapper.unresolved:
+        click.echo(f"{mapper.unresolved} emails matched no user and were left empty")
+
+
+def init_importer(app):
+    """
+    Adds the `flask import` command.
+    """
+    app.cli.add_command(import_command)
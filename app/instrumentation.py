@@ -0,0 +1,231 @@
+import heapq
+import json
+import logging
+import os
+import time
+from logging.handlers import RotatingFileHandler
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Structured per-request summary, one JSON object per line at INFO level
+sql_logger = logging.getLogger("app.sql")
+# Slow statements and their plans, written to SLOW_QUERY_LOG
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+SLOWEST_STATEMENTS = 3
+SLOW_QUERY_MS = 200
+SLOW_QUERY_LOG_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
+# Statements longer than this are cut short in the request log line
+_LOGGED_STATEMENT_CHARS = 300
+
+_EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN",
+    "postgresql": "EXPLAIN",
+    "mysql": "EXPLAIN",
+    "mariadb": "EXPLAIN",
+}
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class RequestSQLStats:
+    """
+    SQL statements run while handling one request.
+
+    Keeps the count, the total time spent in the database and the
+    `keep` slowest statements.
+    """
+
+    def __init__(self, keep=SLOWEST_STATEMENTS):
+        self.keep = keep
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_seconds = 0.0
+        # Min-heap of (seconds, sequence, statement), the fastest on top
+        self._slowest = []
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.db_seconds += seconds
+        entry = (seconds, self.count, statement)
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, entry)
+        elif self.keep:
+            heapq.heappushpop(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """
+        (seconds, statement) pairs, the slowest first.
+        """
+        return [(s, statement) for s, _, statement in sorted(self._slowest)[::-1]]
+
+    def server_timing(self):
+        """
+        Value for the Server-Timing response header.
+        """
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.count} queries", '
+            f"app;dur={total_ms:.2f}"
+        )
+
+    def log_record(self, response):
+        return {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "statements": self.count,
+            "slowest": [
+                {
+                    "ms": round(seconds * 1000, 2),
+                    "sql": " ".join(statement.split())[:_LOGGED_STATEMENT_CHARS],
+                }
+                for seconds, statement in self.slowest
+            ],
+        }
+
+
+def explain(dbapi_connection, dialect_name, statement, parameters):
+    """
+    Returns the query plan of `statement` as lines of text.
+
+    Runs on its own DB-API cursor of the connection that ran the statement,
+    so it sees the same transaction and does not disturb the open result.
+    """
+    prefix = _EXPLAIN_PREFIXES.get(dialect_name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"{prefix} {statement}", parameters)
+        return [" | ".join(str(value) for value in row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class SQLInstrumentation:
+    """
+    Times every SQL statement of a request through cursor execute events.
+
+    Statements that take longer than `slow_ms` are written to the slow query
+    log together with their EXPLAIN output. Only statements run while the
+    view handles the request are counted, so a streamed response body is not
+    included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.keep = app.config.get("SQL_SLOWEST_STATEMENTS", SLOWEST_STATEMENTS)
+        self.slow_ms = app.config.get("SLOW_QUERY_MS", SLOW_QUERY_MS)
+        self.server_timing = app.config.get("SQL_SERVER_TIMING", True)
+        self._log_configured = False
+
+    def before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        context._instrumentation_started = time.perf_counter()
+
+    def after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        if not has_request_context():
+            return
+        seconds = time.perf_counter() - context._instrumentation_started
+        stats = g.get("sql_stats")
+        if stats is None:
+            return
+        stats.record(statement, seconds)
+        if self.slow_ms is not None and seconds * 1000 >= self.slow_ms:
+            self.log_slow_statement(conn, statement, parameters, executemany, seconds)
+
+    def log_slow_statement(self, conn, statement, parameters, executemany, seconds):
+        self._configure_slow_query_log()
+        if executemany:
+            plan = ["(not explained: executemany)"]
+        else:
+            try:
+                plan = explain(
+                    conn.connection.dbapi_connection,
+                    conn.dialect.name,
+                    statement,
+                    parameters,
+                )
+            except Exception as e:
+                plan = [f"(EXPLAIN failed: {e.__class__.__name__}: {e})"]
+        slow_query_logger.warning(
+            "%.1f ms %s %s (%s)\n%s\n%s",
+            seconds * 1000,
+            request.method,
+            request.path,
+            request.endpoint,
+            statement.strip(),
+            "\n".join(f"  {line}" for line in plan) or "  (no plan)",
+        )
+
+    def _configure_slow_query_log(self):
+        if self._log_configured:
+            return
+        self._log_configured = True
+        path = self.app.config.get("SLOW_QUERY_LOG") or os.path.join(
+            self.app.instance_path, "slow_queries.log"
+        )
+        # One handler per file, however many apps are created in the process
+        path = os.path.abspath(path)
+        if any(
+            getattr(handler, "baseFilename", None) == path
+            for handler in slow_query_logger.handlers
+        ):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=self.app.config.get("SLOW_QUERY_LOG_BYTES", SLOW_QUERY_LOG_BYTES),
+            backupCount=self.app.config.get(
+                "SLOW_QUERY_LOG_BACKUPS", SLOW_QUERY_LOG_BACKUPS
+            ),
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.WARNING)
+        # Keeps the multi-line plans out of the application log
+        slow_query_logger.propagate = False
+
+    def start_request(self):
+        g.sql_stats = RequestSQLStats(self.keep)
+
+    def finish_request(self, response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+        if self.server_timing:
+            response.headers.add("Server-Timing", stats.server_timing())
+        if sql_logger.isEnabledFor(logging.INFO):
+            sql_logger.info(json.dumps(stats.log_record(response)))
+        return response
+
+
+def init_sql_instrumentation(app):
+    """
+    Collects SQL timings per request on every engine of the application.
+
+    Set `SQL_INSTRUMENTATION = False` to turn this off.
+    """
+    if not app.config.get("SQL_INSTRUMENTATION", True):
+        return
+    instrumentation = SQLInstrumentation(app)
+    with app.app_context():
+        for engine in app.extensions["sqlalchemy"].engines.values():
+            event.listen(
+                engine, "before_cursor_execute", instrumentation.before_cursor_execute
+            )
+            event.listen(
+                engine, "after_cursor_execute", instrumentation.after_cursor_execute
+            )
+    app.before_request(instrumentation.start_request)
+    app.after_request(instrumentation.finish_request)
+    app.extensions["sql_instrumentation"] = instrumentation
@@ -0,0 +1,98 @@
+import math
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+# Seconds between sweeps for keys past their expiry
+EVICT_INTERVAL = 60
+
+
+class LocalRedis:
+    """
+    Stand-in for a Redis client with the few commands this app uses.
+
+    Supports strings (get, set, delete), hashes (hmget, hset) and key expiry,
+    all kept in process memory. Lets the Redis backends run without a
+    server, e.g. in development and tests. Expired keys are dropped when
+    they are read and on every `evict_interval`.
+    """
+
+    def __init__(self, evict_interval=EVICT_INTERVAL, clock=time.time):
+        self.evict_interval = evict_interval
+        self.clock = clock
+        self._data = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+        self._evicted_at = 0.0
+
+    def _expire_due(self, name):
+        now = self.clock()
+        if now - self._evicted_at >= self.evict_interval:
+            self._evicted_at = now
+            for key in [k for k, at in self._expires.items() if at <= now]:
+                self._delete(key)
+        if self._expires.get(name, math.inf) <= now:
+            self._delete(name)
+
+    def _delete(self, name):
+        self._expires.pop(name, None)
+        return self._data.pop(name, None) is not None
+
+    def get(self, name):
+        with self._lock:
+            self._expire_due(name)
+            return self._data.get(name)
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (
+                value if isinstance(value, bytes) else str(value).encode()
+            )
+            if ex is None:
+                self._expires.pop(name, None)
+            else:
+                self._expires[name] = self.clock() + ex
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._delete(name) for name in names)
+
+    def hmget(self, name, keys):
+        with self._lock:
+            self._expire_due(name)
+            values = self._data.get(name, {})
+            return [values.get(key) for key in keys]
+
+    def hset(self, name, mapping):
+        with self._lock:
+            self._data.setdefault(name, {}).update(
+                {key: str(value).encode() for key, value in mapping.items()}
+            )
+            return len(mapping)
+
+    def expire(self, name, seconds):
+        with self._lock:
+            self._expire_due(name)
+            if name not in self._data:
+                return False
+            self._expires[name] = self.clock() + seconds
+            return True
+
+    def __len__(self):
+        return len(self._data)
+
+
+def connect(url=None):
+    """
+    A Redis client for `url`, or a LocalRedis when no URL is given.
+    """
+    if not url:
+        return LocalRedis()
+    if redis is None:
+        raise ValueError(f"{url!r} needs the redis package.")
+    return redis.Redis.from_url(url)
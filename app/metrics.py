@@ -0,0 +1,341 @@
+import atexit
+import bisect
+import hmac
+import json
+import os
+import threading
+import time
+
+from flask import Response, abort, current_app, g, request
+from flask.signals import before_render_template, template_rendered
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+IMAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Seconds between writes of this process's metrics to METRICS_DIR
+FLUSH_INTERVAL = 1.0
+# Without METRICS_TOKEN, /metrics only answers requests from these addresses
+LOCAL_ADDRESSES = ("127.0.0.1", "::1")
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labelnames):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def _values(self, labels, size):
+        # Each thread updates its own shard, so observing needs no lock
+        shard = self.registry._shard()
+        key = (self.name, tuple(str(labels[name]) for name in self.labelnames))
+        values = shard.get(key)
+        if values is None:
+            values = shard[key] = [0] * size
+        return values
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        self._values(labels, 1)[0] += amount
+
+    def samples(self, labels, values):
+        yield self.name, labels, values[0]
+
+
+class Histogram(_Metric):
+    """
+    Counts observations per bucket. Values are the bucket counts, the count
+    above the last bound and the sum of all observations.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, labelnames, buckets):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        values = self._values(labels, len(self.buckets) + 2)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def samples(self, labels, values):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+            cumulative += count
+            yield f"{self.name}_bucket", labels + (("le", str(bound)),), cumulative
+        yield f"{self.name}_sum", labels, values[-1]
+        yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms shared by every thread and, optionally, process.
+
+    Each thread adds to a shard of its own, and the shards are only summed
+    when the metrics are read. With a `directory`, every process also writes
+    its totals to `<pid>.json` there at most once per `flush_interval`, and
+    reading the metrics sums the files of all processes. Files of processes
+    that have exited are kept, so counters never go backwards; empty the
+    directory when the whole server is restarted.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.directory = None
+        self.flush_interval = FLUSH_INTERVAL
+        self._reset()
+
+    def _reset(self):
+        # Also replaces the lock, which another thread may have held at fork
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = []
+        # Totals of threads that have exited
+        self._retired = {}
+        self._flushed_at = 0.0
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(self, name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(self, name, help, labelnames, buckets))
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def process_values(self):
+        """
+        Sums the shards of every thread of this process.
+        """
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    _merge(self._retired, shard)
+            self._shards = live
+            totals = _merge({}, self._retired)
+            for _, shard in live:
+                _merge(totals, shard)
+        return totals
+
+    def collect(self):
+        """
+        Sums the values of this process and, with a directory, all others.
+        """
+        totals = self.process_values()
+        if self.directory is None:
+            return totals
+        own = f"{os.getpid()}.json"
+        for filename in os.listdir(self.directory):
+            if filename == own or not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    values = json.load(f)
+            except (OSError, ValueError):
+                continue
+            _merge(
+                totals,
+                {
+                    (name, tuple(labels)): counts
+                    for name, labels, counts in values
+                    if name in self.metrics
+                },
+            )
+        return totals
+
+    def flush(self, force=False):
+        """
+        Writes this process's totals to the directory, if it is time to.
+        """
+        if self.directory is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+        self._flushed_at = now
+        values = [
+            [name, list(labels), counts]
+            for (name, labels), counts in self.process_values().items()
+        ]
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(values, f)
+        os.replace(tmp, path)
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        by_metric = {}
+        for (name, labels), values in sorted(self.collect().items()):
+            by_metric.setdefault(name, []).append((labels, values))
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for label_values, values in by_metric.get(name, []):
+                labels = tuple(zip(metric.labelnames, label_values))
+                for sample, sample_labels, value in metric.samples(labels, values):
+                    lines.append(f"{sample}{_format_labels(sample_labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge(totals, values):
+    # list() copies in one step, while other threads may be adding keys
+    for key, counts in list(values.items()):
+        existing = totals.get(key)
+        if existing is None:
+            totals[key] = list(counts)
+        else:
+            for i, count in enumerate(counts):
+                existing[i] += count
+    return totals
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+REGISTRY = MetricsRegistry()
+# A forked worker starts from zero instead of counting the parent's requests again
+os.register_at_fork(after_in_child=REGISTRY._reset)
+atexit.register(lambda: REGISTRY.flush(force=True))
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "helpdesk_request_duration_seconds",
+    "Time to handle a request, without streaming the body.",
+    ("endpoint", "method"),
+)
+REQUEST_DB_DURATION = REGISTRY.histogram(
+    "helpdesk_request_db_seconds",
+    "Time spent running SQL statements per request.",
+    ("endpoint",),
+)
+TEMPLATE_RENDER_DURATION = REGISTRY.histogram(
+    "helpdesk_template_render_seconds",
+    "Time to render a Jinja template.",
+    ("endpoint", "template"),
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    "helpdesk_response_size_bytes",
+    "Size of response bodies with a known length.",
+    ("endpoint",),
+    buckets=SIZE_BUCKETS,
+)
+LOGINS = REGISTRY.counter(
+    "helpdesk_logins_total", "Login attempts by result.", ("result",)
+)
+IMAGE_PROCESSING_DURATION = REGISTRY.histogram(
+    "helpdesk_image_processing_seconds",
+    "Time to build the avatar variants of an upload, including time queued.",
+    ("mode",),
+    buckets=IMAGE_BUCKETS,
+)
+
+
+def _endpoint():
+    # Unmatched URLs share one label, so scanners can't add a series per path
+    return request.endpoint or "unmatched"
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+
+
+def _finish_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+    endpoint = _endpoint()
+    REQUEST_DURATION.observe(
+        time.perf_counter() - started, endpoint=endpoint, method=request.method
+    )
+    stats = g.get("sql_stats")
+    if stats is not None:
+        REQUEST_DB_DURATION.observe(stats.db_seconds, endpoint=endpoint)
+    if response.content_length is not None:
+        RESPONSE_SIZE.observe(response.content_length, endpoint=endpoint)
+    REGISTRY.flush()
+    return response
+
+
+def _template_started(sender, template, context, **extra):
+    g.setdefault("metrics_templates", []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    started = g.get("metrics_templates")
+    if started:
+        TEMPLATE_RENDER_DURATION.observe(
+            time.perf_counter() - started.pop(),
+            endpoint=_endpoint(),
+            template=template.name or "string",
+        )
+
+
+def metrics_view():
+    """
+    Serves the metrics to Prometheus.
+
+    With METRICS_TOKEN set, requests need `Authorization: Bearer <token>`.
+    Without it, only local requests are answered. Requests that came
+    through a proxy count as local only when TRUSTED_PROXIES is set, which
+    makes `request.remote_addr` the client's address.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        given = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(given.encode(), f"Bearer {token}".encode()):
+            abort(401)
+    elif request.remote_addr not in LOCAL_ADDRESSES or (
+        "X-Forwarded-For" in request.headers
+        and not current_app.config.get("TRUSTED_PROXIES")
+    ):
+        abort(404)
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+    """
+    Records request metrics and serves them at /metrics.
+
+    Set METRICS_DIR to a directory shared by the worker processes of one
+    server, so that /metrics reports all of them. Set `METRICS = False` to
+    turn metrics off.
+    """
+    if not app.config.get("METRICS", True):
+        return
+    directory = app.config.get("METRICS_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    REGISTRY.directory = directory or None
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
@@ -1,9 +1,9 @@
 from datetime import datetime, timezone
 
 from flask_login import UserMixin
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from . import db
+from .passwords import get_password_policy
 
 
 class User(UserMixin, db.Model):
@@ -14,7 +14,8 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
     email = db.Column(db.String(150), unique=True, nullable=False)
-    password_hash = db.Column(db.String(150), nullable=False)
+    # Wide enough for scrypt and argon2 hashes
+    password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(50), nullable=False)
     profile_image = db.Column(
         db.String(150), nullable=True
@@ -42,7 +43,7 @@ class User(UserMixin, db.Model):
         if not self.validate_password(password):
             raise ValueError("Password does not meet complexity requirements.")
 
-        self.password_hash = generate_password_hash(password, method="pbkdf2:sha256")
+        self.password_hash = get_password_policy().hash(password)
 
     @staticmethod
     def validate_password(password):
@@ -61,7 +62,17 @@ class User(UserMixin, db.Model):
 
     # Verify password
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """
+        Checks the password, upgrading the stored hash if it is outdated.
+
+        The new hash is only set on the user; the caller commits it.
+        """
+        policy = get_password_policy()
+        if not policy.verify(self.password_hash, password):
+            return False
+        if policy.needs_rehash(self.password_hash):
+            self.password_hash = policy.hash(password)
+        return True
 
 
 class Ticket(db.Model):
@@ -97,6 +108,19 @@ class Ticket(db.Model):
     )
     ticket_comments = db.relationship("Comment", back_populates="ticket")
 
+    # Indexes for the list view filters, their (created_at, id) keyset order
+    # and the duplicate ticket check in CreateTicketView
+    __table_args__ = (
+        db.Index("ix_ticket_created_at_id", "created_at", "id"),
+        db.Index("ix_ticket_status_created_at_id", "status", "created_at", "id"),
+        db.Index(
+            "ix_ticket_assigned_to_created_at_id", "assigned_to", "created_at", "id"
+        ),
+        db.Index(
+            "ix_ticket_user_id_title_created_at", "user_id", "title", "created_at"
+        ),
+    )
+
 
 class Comment(db.Model):
     """
@@ -113,3 +137,7 @@ class Comment(db.Model):
     commenter = db.relationship(
         "User", back_populates="user_comments", overlaps="comments"
     )
+
+    __table_args__ = (
+        db.Index("ix_comment_ticket_id_created_at_id", "ticket_id", "created_at", "id"),
+    )
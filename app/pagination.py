@@ -0,0 +1,139 @@
+import base64
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+from app.models import Comment, Ticket
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+DEFAULT_COMMENTS_PER_PAGE = 20
+
+
+class KeysetPage:
+    """
+    A single page of rows fetched with keyset (cursor) pagination.
+    """
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def encode_cursor(row):
+    """
+    Encodes the (created_at, id) position of a row as an opaque URL-safe token.
+    """
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Decodes a cursor token back into a (created_at, id) tuple.
+
+    Returns None if the token is missing or malformed.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def get_page_size():
+    """
+    Reads the requested page size from the query string, clamped to the allowed range.
+    """
+    default = current_app.config.get("TICKETS_PER_PAGE", DEFAULT_PAGE_SIZE)
+    maximum = current_app.config.get("TICKETS_MAX_PER_PAGE", MAX_PAGE_SIZE)
+    per_page = request.args.get("per_page", default, type=int)
+    return max(1, min(per_page, maximum))
+
+
+def paginate_keyset(
+    query, after=None, before=None, per_page=DEFAULT_PAGE_SIZE, model=Ticket
+):
+    """
+    Returns a KeysetPage of `model` rows ordered newest first by (created_at, id).
+
+    `after` fetches the page following a cursor and `before` the page preceding
+    it. Only one of them is honoured, with `after` taking precedence.
+    """
+    if after is not None:
+        created_at, row_id = after
+        query = query.filter(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+            )
+        ).order_by(model.created_at.desc(), model.id.desc())
+    elif before is not None:
+        created_at, row_id = before
+        query = query.filter(
+            or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > row_id),
+            )
+        ).order_by(model.created_at.asc(), model.id.asc())
+    else:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    # Fetch one extra row to find out whether there is another page
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if before is not None and after is None:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after is not None
+
+    return KeysetPage(
+        rows,
+        per_page,
+        next_cursor=encode_cursor(rows[-1]) if rows and has_next else None,
+        prev_cursor=encode_cursor(rows[0]) if rows and has_prev else None,
+    )
+
+
+def paginate_tickets(query):
+    """
+    Paginates a ticket query using the cursor and page size from the current request.
+    """
+    return paginate_keyset(
+        query,
+        after=decode_cursor(request.args.get("after")),
+        before=decode_cursor(request.args.get("before")),
+        per_page=get_page_size(),
+    )
+
+
+def paginate_comments(query):
+    """
+    Returns the newest comments of a comment query, or those older than the
+    `after` cursor of the current request.
+    """
+    return paginate_keyset(
+        query,
+        after=decode_cursor(request.args.get("after")),
+        per_page=current_app.config.get("COMMENTS_PER_PAGE", DEFAULT_COMMENTS_PER_PAGE),
+        model=Comment,
+    )
@@ -0,0 +1,209 @@
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app, has_app_context
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import argon2
+except ImportError:  # pragma: no cover - depends on the environment
+    argon2 = None
+
+# Schemes and their default cost, written like Werkzeug's method strings:
+# pbkdf2:<hash>:<iterations>, scrypt:<n>:<r>:<p> and
+# argon2:<time cost>:<memory in KiB>:<parallelism>
+DEFAULT_METHODS = {
+    "pbkdf2": "pbkdf2:sha256:600000",
+    "scrypt": "scrypt:32768:8:1",
+    "argon2": "argon2:3:65536:4",
+}
+DEFAULT_PASSWORD_HASH = DEFAULT_METHODS["pbkdf2"]
+# Seconds clients are asked to wait when hashing is saturated
+RETRY_AFTER = 2
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when too many password hashes are already queued or running.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__("Too many password hashes in progress.")
+        self.retry_after = retry_after
+
+
+def _argon2_hasher(method):
+    time_cost, memory_cost, parallelism = (
+        int(value) for value in method.split(":")[1:]
+    )
+    return argon2.PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+
+
+# These two run in the hashing processes, so they take only plain values
+
+
+def _hash(method, password):
+    if method.startswith("argon2:"):
+        return _argon2_hasher(method).hash(password)
+    return generate_password_hash(password, method=method)
+
+
+def _verify(password_hash, password):
+    if password_hash.startswith("$argon2"):
+        if argon2 is None:
+            return False
+        try:
+            return argon2.PasswordHasher().verify(password_hash, password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHash):
+            return False
+    return check_password_hash(password_hash, password)
+
+
+# One pool per worker count, shared by every app in the process
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(workers):
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+        return executor
+
+
+def _discard_executor(workers, executor):
+    with _executors_lock:
+        if _executors.get(workers) is executor:
+            del _executors[workers]
+    executor.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown_executors():
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+class PasswordPolicy:
+    """
+    How new password hashes are made, and which stored hashes are outdated.
+
+    `method` is a scheme name from DEFAULT_METHODS, optionally followed by
+    its cost parameters, e.g. "scrypt:16384:8:1". Hashes made with any
+    supported scheme can be verified; `needs_rehash` tells whether one was
+    made with a different scheme or cost than the policy's.
+
+    With `workers`, hashing and verifying run on a process pool of that
+    size, and the calling thread just waits for the result. At most
+    `max_pending` of them may be queued or running at once, in either mode;
+    beyond that PasswordHashingBusy is raised without doing any work.
+    """
+
+    def __init__(
+        self,
+        method=DEFAULT_PASSWORD_HASH,
+        workers=0,
+        max_pending=None,
+        retry_after=RETRY_AFTER,
+    ):
+        scheme = method.split(":", 1)[0]
+        if scheme not in DEFAULT_METHODS:
+            raise ValueError(f"Unknown password hash scheme: {scheme!r}")
+        default = DEFAULT_METHODS[scheme].split(":")
+        given = method.split(":")
+        if len(given) > len(default):
+            raise ValueError(f"Too many parameters in {method!r}")
+        self.method = ":".join(given + default[len(given) :])
+        self.scheme = scheme
+        self._argon2 = None
+        if scheme == "argon2":
+            if argon2 is None:
+                raise ValueError("The argon2 scheme needs the argon2-cffi package.")
+            self._argon2 = _argon2_hasher(self.method)
+        self.workers = workers
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending else None
+
+    def hash(self, password):
+        return self._run(_hash, self.method, password)
+
+    def verify(self, password_hash, password):
+        return self._run(_verify, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        if password_hash.startswith("$argon2"):
+            return self._argon2 is None or self._argon2.check_needs_rehash(
+                password_hash
+            )
+        return password_hash.split("$", 1)[0] != self.method
+
+    def _run(self, fn, *args):
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy(self.retry_after)
+        try:
+            if not self.workers:
+                return fn(*args)
+            executor = _get_executor(self.workers)
+            try:
+                # Waiting on the future leaves the GIL to the other threads
+                return executor.submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool next time
+                _discard_executor(self.workers, executor)
+                return fn(*args)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+
+_default_policy = PasswordPolicy()
+
+
+def password_hashing_busy(error):
+    """
+    Asks the client to retry a request that found the hashing queue full.
+    """
+    return ServiceUnavailable(
+        "Too many sign-ins at the moment. Please try again in a few seconds.",
+        retry_after=error.retry_after,
+    ).get_response()
+
+
+def init_password_policy(app):
+    """
+    Hashes passwords as PASSWORD_HASH says, pbkdf2:sha256:600000 by default.
+
+    Hashing runs in the request thread unless PASSWORD_HASH_WORKERS is set,
+    in which case it runs on that many processes, started on the first
+    hash. Production servers should set it to their number of CPUs; tests
+    and CLI commands keep the default of 0 and never start a pool. Once
+    PASSWORD_HASH_QUEUE_SIZE hashes are in progress, further requests get a
+    503 response. The queue holds 4 hashes per worker by default; inline
+    hashing has no queue, so it is only limited when the size is set.
+    """
+    workers = app.config.get("PASSWORD_HASH_WORKERS", 0)
+    app.extensions["password_policy"] = PasswordPolicy(
+        app.config.get("PASSWORD_HASH", DEFAULT_PASSWORD_HASH),
+        workers=workers,
+        max_pending=app.config.get("PASSWORD_HASH_QUEUE_SIZE", 4 * workers or None),
+        retry_after=app.config.get("PASSWORD_HASH_RETRY_AFTER", RETRY_AFTER),
+    )
+    app.register_error_handler(PasswordHashingBusy, password_hashing_busy)
+
+
+def get_password_policy():
+    """
+    The policy of the current application, or the default one outside it.
+    """
+    if has_app_context():
+        return current_app.extensions.get("password_policy", _default_policy)
+    return _default_policy
@@ -0,0 +1,367 @@
+import collections
+import html
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+import click
+from flask import current_app, g, request
+from flask.cli import AppGroup
+from itsdangerous import BadSignature, URLSafeSerializer
+
+# Requests carrying a token from `flask profile token` here are always profiled
+PROFILE_HEADER = "X-Profile"
+PROFILE_INTERVAL_MS = 5
+PROFILE_TOKEN_SECONDS = 3600
+FOLDED_SUFFIX = ".folded"
+
+# A sample counts towards the category of the innermost frame that matches one.
+# app.passwords covers requests waiting for the password hashing processes.
+CATEGORIES = (
+    ("password hashing", ("werkzeug.security:", "hashlib:", "app.passwords:")),
+    ("SQL", ("sqlalchemy.engine.", "sqlalchemy.pool.", "sqlite3")),
+    ("ORM", ("sqlalchemy.",)),
+    ("templates", ("jinja2.", "template:")),
+    ("app", ("app.", "app:")),
+)
+CATEGORY_COLORS = {
+    "password hashing": "#e15759",
+    "SQL": "#4e79a7",
+    "ORM": "#76b7b2",
+    "templates": "#59a14f",
+    "app": "#edc948",
+    "other": "#bab0ac",
+}
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    if code.co_filename.endswith((".html", ".txt", ".xml")):
+        # Compiled Jinja templates run as code "from" the template file
+        return f"template:{os.path.basename(code.co_filename)}:{code.co_name}"
+    # co_qualname is new in Python 3.11
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{frame.f_globals.get('__name__', '?')}:{name}"
+
+
+def collapse(frame):
+    """
+    The stack ending in `frame` as `root;...;leaf` frame names.
+    """
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame).replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Records the Python stack of registered threads every `interval` seconds.
+
+    One background thread samples all of them, and it only runs while at
+    least one thread is registered.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._targets = {}
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._targets[thread_id] = collections.Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="stack-sampler", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, thread_id):
+        """
+        Unregisters the thread and returns its stack counts.
+        """
+        with self._lock:
+            return self._targets.pop(thread_id, collections.Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._targets:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, stacks in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[collapse(frame)] += 1
+
+
+class Profiler:
+    """
+    Samples the stacks of selected requests and appends them per endpoint.
+
+    With PROFILING on, PROFILING_SAMPLE_RATE of the requests to
+    PROFILING_ENDPOINTS (all by default) are profiled. A request with a valid
+    token in the X-Profile header is profiled either way. Each endpoint's
+    stacks are appended to `<endpoint>.folded` in PROFILING_DIR.
+    """
+
+    def __init__(self, app):
+        self.enabled = app.config.get("PROFILING", False)
+        self.rate = app.config.get("PROFILING_SAMPLE_RATE", 1.0)
+        self.endpoints = set(app.config.get("PROFILING_ENDPOINTS") or ())
+        self.directory = app.config.get("PROFILING_DIR") or os.path.join(
+            app.instance_path, "profiles"
+        )
+        self.sampler = StackSampler(
+            app.config.get("PROFILING_INTERVAL_MS", PROFILE_INTERVAL_MS) / 1000
+        )
+        self.app = app
+
+    @property
+    def serializer(self):
+        return URLSafeSerializer(self.app.config["SECRET_KEY"], salt="profile")
+
+    def make_token(self, seconds=PROFILE_TOKEN_SECONDS):
+        return self.serializer.dumps({"expires": int(time.time() + seconds)})
+
+    def valid_token(self, token):
+        try:
+            payload = self.serializer.loads(token)
+        except BadSignature:
+            return False
+        return payload.get("expires", 0) > time.time()
+
+    def _selected(self):
+        token = request.headers.get(PROFILE_HEADER)
+        if token is not None:
+            return self.valid_token(token)
+        if not self.enabled:
+            return False
+        if self.endpoints and request.endpoint not in self.endpoints:
+            return False
+        return random.random() < self.rate
+
+    def start_request(self):
+        if self._selected():
+            g.profiled_thread = threading.get_ident()
+            self.sampler.start(g.profiled_thread)
+
+    def finish_request(self, exc):
+        thread_id = g.pop("profiled_thread", None)
+        if thread_id is None:
+            return
+        stacks = self.sampler.stop(thread_id)
+        if stacks:
+            self.save(request.endpoint or "unmatched", stacks)
+
+    def save(self, endpoint, stacks):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, _folded_filename(endpoint))
+        # A single append, so concurrent workers don't interleave lines
+        with open(path, "a") as f:
+            f.write("".join(f"{stack} {count}\n" for stack, count in stacks.items()))
+
+
+def _folded_filename(endpoint):
+    return re.sub(r"[^\w.-]", "_", endpoint) + FOLDED_SUFFIX
+
+
+def read_folded(path):
+    """
+    Sums the counts of a collapsed-stack file, which may repeat stacks.
+    """
+    stacks = collections.Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack and count.isdigit():
+                stacks[stack] += int(count)
+    return stacks
+
+
+def category(frame_names):
+    for name in reversed(frame_names):
+        for label, prefixes in CATEGORIES:
+            if name.startswith(prefixes):
+                return label
+    return "other"
+
+
+def summarise(stacks, top=10):
+    """
+    Returns (samples per category, samples per leaf frame) for a profile.
+    """
+    categories = collections.Counter()
+    leaves = collections.Counter()
+    for stack, count in stacks.items():
+        names = stack.split(";")
+        categories[category(names)] += count
+        leaves[names[-1]] += count
+    return categories.most_common(), leaves.most_common(top)
+
+
+def flame_graph_svg(stacks, title, width=1200, row_height=16):
+    """
+    Renders collapsed stacks as a standalone SVG flame graph.
+
+    Frames are coloured by category, and hovering one shows its samples.
+    """
+    root = {"count": 0, "children": {}}
+    depth = 0
+    for stack, count in stacks.items():
+        names = stack.split(";")
+        depth = max(depth, len(names))
+        node = root
+        node["count"] += count
+        for i, name in enumerate(names):
+            node = node["children"].setdefault(
+                name, {"count": 0, "children": {}, "category": category(names[: i + 1])}
+            )
+            node["count"] += count
+
+    total = root["count"] or 1
+    top = 30
+    height = top + (depth + 1) * row_height
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        'font-family="monospace" font-size="11">',
+        f'<text x="{width / 2}" y="18" text-anchor="middle" font-size="14">'
+        f"{html.escape(title)} ({root['count']} samples)</text>",
+    ]
+
+    def place(node, name, x, level):
+        w = node["count"] / total * width
+        if w < 0.5:
+            return
+        y = height - (level + 1) * row_height
+        label = f"{name} ({node['count']} samples, {node['count'] / total:.1%})"
+        color = CATEGORY_COLORS[node.get("category", "other")]
+        parts.append(
+            f"<g><title>{html.escape(label)}</title>"
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" '
+            f'fill="{color}" rx="2"/>'
+        )
+        # Roughly 7 pixels per character at this font size
+        fits = int((w - 6) / 7)
+        if fits >= 3:
+            text = name if len(name) <= fits else name[: fits - 2] + ".."
+            parts.append(
+                f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">'
+                f"{html.escape(text)}</text>"
+            )
+        parts.append("</g>")
+        for child_name, child in sorted(node["children"].items()):
+            place(child, child_name, x, level + 1)
+            x += child["count"] / total * width
+
+    place(root, "all", 0.0, 0)
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+profile_cli = AppGroup("profile", help="Inspect sampled request profiles.")
+
+
+def _profile_dir(directory):
+    profiler = current_app.extensions.get("profiler")
+    return directory or (profiler.directory if profiler else None)
+
+
+@profile_cli.command("report")
+@click.option("--dir", "directory", type=click.Path(file_okay=False))
+@click.option(
+    "--output",
+    type=click.Path(file_okay=False),
+    help="Where to write the flame graphs, <dir>/report by default.",
+)
+@click.option("--endpoint", "endpoints", multiple=True, help="Only these endpoints.")
+@click.option("--top", default=10, show_default=True, help="Hottest frames listed.")
+def report_command(directory, output, endpoints, top):
+    """
+    Summarises the profiles and writes a flame graph per endpoint.
+
+    Each endpoint gets <endpoint>.svg and a merged <endpoint>.folded, which
+    other tools such as flamegraph.pl or speedscope also read.
+    """
+    directory = _profile_dir(directory)
+    if not directory or not os.path.isdir(directory):
+        raise click.ClickException("No profiles recorded yet.")
+    output = output or os.path.join(directory, "report")
+    os.makedirs(output, exist_ok=True)
+
+    found = False
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(FOLDED_SUFFIX):
+            continue
+        endpoint = filename[: -len(FOLDED_SUFFIX)]
+        if endpoints and endpoint not in endpoints:
+            continue
+        found = True
+        stacks = read_folded(os.path.join(directory, filename))
+        total = sum(stacks.values()) or 1
+        categories, leaves = summarise(stacks, top)
+
+        click.echo(f"\n{endpoint}: {total} samples")
+        for label, count in categories:
+            click.echo(f"  {count / total:6.1%}  {label}")
+        click.echo("  hottest frames:")
+        for name, count in leaves:
+            click.echo(f"  {count / total:6.1%}  {name}")
+
+        with open(os.path.join(output, filename), "w") as f:
+            f.write("".join(f"{stack} {count}\n" for stack, count in stacks.items()))
+        with open(os.path.join(output, f"{endpoint}.svg"), "w") as f:
+            f.write(flame_graph_svg(stacks, endpoint))
+    if not found:
+        raise click.ClickException("No profiles recorded yet.")
+    click.echo(f"\nFlame graphs written to {output}")
+
+
+@profile_cli.command("token")
+@click.option(
+    "--seconds",
+    default=PROFILE_TOKEN_SECONDS,
+    show_default=True,
+    help="How long the token is valid.",
+)
+def token_command(seconds):
+    """
+    Prints an X-Profile header value that profiles any request sending it.
+    """
+    click.echo(current_app.extensions["profiler"].make_token(seconds))
+
+
+@profile_cli.command("clear")
+@click.option("--dir", "directory", type=click.Path(file_okay=False))
+def clear_command(directory):
+    """
+    Deletes the recorded profiles.
+    """
+    directory = _profile_dir(directory)
+    removed = 0
+    if directory and os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.endswith(FOLDED_SUFFIX):
+                os.remove(os.path.join(directory, filename))
+                removed += 1
+    click.echo(f"Removed {removed} profiles")
+
+
+def init_profiling(app):
+    """
+    Profiles requests selected by configuration or the X-Profile header.
+
+    Unselected requests cost one header lookup.
+    """
+    profiler = Profiler(app)
+    app.extensions["profiler"] = profiler
+    app.before_request(profiler.start_request)
+    app.teardown_request(profiler.finish_request)
+    app.cli.add_command(profile_cli)
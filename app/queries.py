@@ -0,0 +1,88 @@
+from sqlalchemy.orm import joinedload
+
+from app.models import Comment, Ticket, User
+
+
+def ticket_list_query():
+    """
+    Base query for the ticket list pages.
+
+    The list templates read `ticket.creator.name` and `ticket.assignee.name`
+    for every row, so both users are joined in up front, loading only their
+    names, instead of being lazy-loaded one row at a time.
+    """
+    return Ticket.query.options(
+        joinedload(Ticket.creator).load_only(User.name),
+        joinedload(Ticket.assignee).load_only(User.name),
+    )
+
+
+def all_tickets_query(user, query=None):
+    """
+    Tickets shown on the All Tickets page: everything for staff, own tickets otherwise.
+
+    The filter is applied to `query` if given, instead of the ticket list query.
+    """
+    if query is None:
+        query = ticket_list_query()
+    if user.role in ["admin", "support"]:
+        return query
+    return query.filter(Ticket.user_id == user.id)
+
+
+def active_tickets_query(user):
+    """
+    Open tickets raised by the user.
+    """
+    return ticket_list_query().filter(
+        Ticket.user_id == user.id, Ticket.status == "open"
+    )
+
+
+def closed_tickets_query(user, query=None):
+    """
+    Closed tickets visible to the user based on their role.
+
+    The filter is applied to `query` if given, instead of the ticket list query.
+    """
+    if query is None:
+        query = ticket_list_query()
+    query = query.filter(Ticket.status == "closed")
+    if user.role == "admin":
+        return query
+    if user.role == "support":
+        return query.filter(Ticket.assigned_to == user.id)
+    return query.filter(Ticket.user_id == user.id)
+
+
+def assigned_tickets_query(user):
+    """
+    Assigned, not yet closed tickets: the user's own for support, all for admins.
+    """
+    query = ticket_list_query().filter(Ticket.status != "closed")
+    if user.role == "support":
+        return query.filter(Ticket.assigned_to == user.id)
+    return query.filter(Ticket.assigned_to.isnot(None))
+
+
+def unassigned_tickets_query():
+    """
+    Tickets that have not been assigned to anyone yet.
+    """
+    return ticket_list_query().filter(Ticket.assigned_to.is_(None))
+
+
+def support_staff_query():
+    """
+    Users who can be assigned tickets.
+    """
+    return User.query.filter(User.role.in_(["admin", "support"]))
+
+
+def comment_timeline_query(ticket_id):
+    """
+    Comments on a ticket, with the name and avatar of each commenter joined in.
+    """
+    return Comment.query.filter(Comment.ticket_id == ticket_id).options(
+        joinedload(Comment.commenter).load_only(User.name, User.profile_image)
+    )
@@ -0,0 +1,235 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+from werkzeug.exceptions import TooManyRequests
+
+from app.kv import connect
+
+# (attempts, seconds): the bucket holds `attempts` and refills over `seconds`
+LOGIN_LIMIT_PER_IP = (100, 60)
+LOGIN_LIMIT_PER_EMAIL = (10, 300)
+# Seconds between sweeps for buckets that have refilled completely
+EVICT_INTERVAL = 60
+
+
+def take_token(state, capacity, rate, now):
+    """
+    Takes one token from a bucket in `state`, a (tokens, updated) pair or None.
+
+    Returns (tokens left, time the bucket will be full again, seconds to
+    wait). A wait of 0 means the token was taken.
+    """
+    if state is None:
+        tokens = capacity
+    else:
+        tokens, updated = state
+        tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        tokens -= 1
+        wait = 0.0
+    else:
+        wait = (1 - tokens) / rate
+    return tokens, now + (capacity - tokens) / rate, wait
+
+
+class MemoryBackend:
+    """
+    Token buckets in a dict, for a single process.
+
+    Each key holds one (tokens, updated, full at) tuple. Buckets that have
+    refilled are no different from missing ones, so they are dropped every
+    `evict_interval` seconds.
+    """
+
+    def __init__(self, evict_interval=EVICT_INTERVAL):
+        self.evict_interval = evict_interval
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._evicted_at = 0.0
+
+    def take(self, key, capacity, rate, now):
+        with self._lock:
+            if now - self._evicted_at >= self.evict_interval:
+                self._evict(now)
+            bucket = self._buckets.get(key)
+            tokens, full_at, wait = take_token(
+                bucket and bucket[:2], capacity, rate, now
+            )
+            self._buckets[key] = (tokens, now, full_at)
+            return wait
+
+    def _evict(self, now):
+        self._evicted_at = now
+        for key in [k for k, bucket in self._buckets.items() if bucket[2] <= now]:
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteBackend:
+    """
+    Token buckets in a SQLite file, shared by every process on the machine.
+
+    Each take is one short IMMEDIATE transaction, so concurrent processes
+    never lose an update.
+    """
+
+    def __init__(self, path, evict_interval=EVICT_INTERVAL):
+        self.path = path
+        self.evict_interval = evict_interval
+        self._local = threading.local()
+        self._evicted_at = 0.0
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+            "full_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_rate_limit_full_at ON rate_limit (full_at)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, capacity, rate, now):
+        connection = self._connection()
+        if now - self._evicted_at >= self.evict_interval:
+            self._evicted_at = now
+            connection.execute("DELETE FROM rate_limit WHERE full_at <= ?", (now,))
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            state = connection.execute(
+                "SELECT tokens, updated FROM rate_limit WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, full_at, wait = take_token(state, capacity, rate, now)
+            connection.execute(
+                "INSERT INTO rate_limit (key, tokens, updated, full_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "tokens = excluded.tokens, updated = excluded.updated, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, full_at),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+    def __len__(self):
+        return (
+            self._connection().execute("SELECT count(*) FROM rate_limit").fetchone()[0]
+        )
+
+
+class RedisBackend:
+    """
+    Token buckets as Redis hashes, shared by every process using the server.
+
+    Keys expire once their bucket would be full again, so Redis does the
+    eviction. The read and the write are separate commands, so processes
+    racing on one key may let an attempt or two more through.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def take(self, key, capacity, rate, now):
+        tokens, updated = self.client.hmget(key, ["tokens", "updated"])
+        state = None if tokens is None else (float(tokens), float(updated))
+        tokens, full_at, wait = take_token(state, capacity, rate, now)
+        self.client.hset(key, mapping={"tokens": tokens, "updated": now})
+        self.client.expire(key, max(1, math.ceil(full_at - now)))
+        return wait
+
+
+class LoginRateLimiter:
+    """
+    Limits login attempts per client IP, and per email address from each IP.
+
+    Every attempt takes a token from the bucket of its IP and then from the
+    bucket of its email at that IP. `limits` maps "ip" and "email" to
+    (attempts, seconds). A bucket per email alone would let anyone lock an
+    account out by guessing at it, whereas this way the owner can still
+    log in from their own address. Emails are hashed, so every key has the
+    same small size whatever a client sends.
+    """
+
+    def __init__(self, backend, limits, clock=time.time):
+        self.backend = backend
+        self.limits = limits
+        self.clock = clock
+
+    def hit(self, ip, email):
+        """
+        Records an attempt. Returns 0 if it may go ahead, else seconds to wait.
+        """
+        now = self.clock()
+        ip = ip or "unknown"
+        email_key = hashlib.blake2b(
+            f"{(email or '').strip().lower()}\0{ip}".encode(), digest_size=16
+        ).hexdigest()
+        for kind, value in (("ip", ip), ("email", email_key)):
+            attempts, seconds = self.limits[kind]
+            wait = self.backend.take(
+                f"login:{kind}:{value}", attempts, attempts / seconds, now
+            )
+            if wait:
+                return wait
+        return 0
+
+
+def make_backend(app):
+    kind = app.config.get("RATE_LIMIT_BACKEND", "memory")
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        path = app.config.get("RATE_LIMIT_SQLITE_PATH") or os.path.join(
+            app.instance_path, "rate_limit.db"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return SQLiteBackend(path)
+    if kind == "redis":
+        return RedisBackend(connect(app.config.get("RATE_LIMIT_REDIS_URL")))
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {kind!r}")
+
+
+def too_many_attempts(retry_after):
+    return TooManyRequests(
+        "Too many login attempts. Please wait before trying again.",
+        retry_after=math.ceil(retry_after),
+    ).get_response()
+
+
+def init_login_rate_limit(app):
+    """
+    Attaches a login rate limiter, unless LOGIN_RATE_LIMIT is False.
+
+    Buckets are keyed on `request.remote_addr`, so behind reverse proxies
+    TRUSTED_PROXIES must be set, see `create_app`.
+    """
+    if not app.config.get("LOGIN_RATE_LIMIT", True):
+        return
+    app.extensions["login_limiter"] = LoginRateLimiter(
+        make_backend(app),
+        {
+            "ip": app.config.get("LOGIN_LIMIT_PER_IP", LOGIN_LIMIT_PER_IP),
+            "email": app.config.get("LOGIN_LIMIT_PER_EMAIL", LOGIN_LIMIT_PER_EMAIL),
+        },
+    )
+
+
+def get_login_limiter():
+    return current_app.extensions.get("login_limiter")
@@ -1,19 +1,20 @@
 from flask import Blueprint
-from flask_login import LoginManager, login_manager
 
-from app.models import User
-from app.utils import inject_open_tickets_count
 from app.views.active_tickets_view import ActiveTicketsView
 from app.views.all_tickets_view import AllTicketsView
 from app.views.assign_ticket_view import AssignTicketView
 from app.views.assigned_tickets_view import AssignedTicketsView
+from app.views.bulk_tickets_view import BulkTicketsView
 from app.views.closed_tickets_view import ClosedTicketsView
 from app.views.create_ticket_view import CreateTicketView
 from app.views.delete_ticket_view import DeleteTicketView
+from app.views.export_view import ExportView
 from app.views.index_view import IndexView
 from app.views.login_view import LoginView
 from app.views.logout_view import LogoutView
 from app.views.register_view import RegisterView
+from app.views.search_view import SearchView
+from app.views.ticket_comments_view import TicketCommentsView
 from app.views.ticket_details_readonly_view import TicketDetailsReadonlyView
 from app.views.ticket_details_view import TicketDetailsView
 from app.views.unassigned_tickets_view import UnassignedTicketsView
@@ -46,6 +47,11 @@ bp.add_url_rule(
     view_func=TicketDetailsReadonlyView.as_view("ticket_details_readonly"),
     methods=["GET"],
 )
+bp.add_url_rule(
+    "/ticket/<int:ticket_id>/comments",
+    view_func=TicketCommentsView.as_view("ticket_comments"),
+    methods=["GET"],
+)
 bp.add_url_rule(
     "/unassigned_tickets",
     view_func=UnassignedTicketsView.as_view("unassigned_tickets"),
@@ -61,6 +67,11 @@ bp.add_url_rule(
     view_func=DeleteTicketView.as_view("delete_ticket"),
     methods=["POST"],
 )
+bp.add_url_rule(
+    "/tickets/bulk",
+    view_func=BulkTicketsView.as_view("bulk_tickets"),
+    methods=["POST"],
+)
 bp.add_url_rule(
     "/update_status/<int:ticket_id>",
     view_func=UpdateStatusView.as_view("update_status"),
@@ -75,22 +86,13 @@ bp.add_url_rule(
 bp.add_url_rule(
     "/active_tickets", view_func=ActiveTicketsView.as_view("active_tickets")
 )
+bp.add_url_rule("/search", view_func=SearchView.as_view("search"))
+bp.add_url_rule(
+    "/export/<any(tickets, comments):dataset>.<any(csv, ndjson):fmt>",
+    view_func=ExportView.as_view("export"),
+)
 bp.add_url_rule(
     "/update_profile",
     view_func=UpdateProfileView.as_view("update_profile"),
     methods=["GET", "POST"],
 )
-
-login_manager = LoginManager()
-login_manager.login_view = "main.login"
-
-
-@login_manager.user_loader
-def load_user(user_id):
-    print(f"load_user called with user_id: {user_id}")  # Debugging line
-    return User.query.get(int(user_id))
-
-
-@bp.context_processor
-def base_context():
-    return inject_open_tickets_count()
@@ -0,0 +1,336 @@
+import re
+from dataclasses import dataclass
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, func, text, union_all
+
+from app import db
+from app.models import Comment, Ticket
+from app.queries import all_tickets_query
+
+SEARCH_PAGE_SIZE = 20
+SNIPPET_WORDS = 24
+
+# Every indexed document has a number: a ticket's title and description are
+# ticket.id * 2, a comment is comment.id * 2 + 1. On SQLite it is the rowid in
+# the FTS5 table, so triggers can find their row without a lookup.
+SQLITE_TABLE = "search_index"
+# bm25() weights per column: title matches count ten times more than text
+SQLITE_WEIGHTS = "10.0, 1.0"
+# The FTS5 table is contentless, as the text already lives in ticket and
+# comment. Rows are removed with the 'delete' command and their old values.
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5(
+        title, body, content = '',
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_search_insert AFTER INSERT ON ticket BEGIN
+        INSERT INTO {SQLITE_TABLE} (rowid, title, body)
+        VALUES (new.id * 2, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_search_update
+    AFTER UPDATE OF title, description ON ticket BEGIN
+        INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}, rowid, title, body)
+        VALUES ('delete', old.id * 2, old.title, old.description);
+        INSERT INTO {SQLITE_TABLE} (rowid, title, body)
+        VALUES (new.id * 2, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ticket_search_delete AFTER DELETE ON ticket BEGIN
+        INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}, rowid, title, body)
+        VALUES ('delete', old.id * 2, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comment_search_insert AFTER INSERT ON comment BEGIN
+        INSERT INTO {SQLITE_TABLE} (rowid, title, body)
+        VALUES (new.id * 2 + 1, '', new.comment_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comment_search_update
+    AFTER UPDATE OF comment_text ON comment BEGIN
+        INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}, rowid, title, body)
+        VALUES ('delete', old.id * 2 + 1, '', old.comment_text);
+        INSERT INTO {SQLITE_TABLE} (rowid, title, body)
+        VALUES (new.id * 2 + 1, '', new.comment_text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comment_search_delete AFTER DELETE ON comment BEGIN
+        INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}, rowid, title, body)
+        VALUES ('delete', old.id * 2 + 1, '', old.comment_text);
+    END
+    """,
+]
+SQLITE_TRIGGERS = [
+    "ticket_search_insert",
+    "ticket_search_update",
+    "ticket_search_delete",
+    "comment_search_insert",
+    "comment_search_update",
+    "comment_search_delete",
+]
+SQLITE_REBUILD = [
+    f"INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}) VALUES ('delete-all')",
+    f"""
+    INSERT INTO {SQLITE_TABLE} (rowid, title, body)
+    SELECT id * 2, title, description FROM ticket
+    """,
+    f"""
+    INSERT INTO {SQLITE_TABLE} (rowid, title, body)
+    SELECT id * 2 + 1, '', comment_text FROM comment
+    """,
+]
+
+# PostgreSQL indexes expressions instead, so there is nothing to keep in sync.
+# The expressions must match `_ticket_vector` and `_comment_vector` exactly.
+POSTGRES_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_ticket_search ON ticket USING gin ((
+        setweight(to_tsvector('english', title), 'A')
+        || setweight(to_tsvector('english', description), 'B')
+    ))
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_comment_search ON comment
+    USING gin (to_tsvector('english', comment_text))
+    """,
+]
+
+
+@dataclass
+class SearchHit:
+    ticket: Ticket
+    score: float
+    snippet: Markup
+
+
+@dataclass
+class SearchResults:
+    hits: list
+    page: int
+    has_next: bool
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+
+def install_search_index(connection):
+    """
+    Creates the full-text index for the connection's database, if missing.
+
+    On SQLite a newly created index is filled from the existing rows.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (SQLITE_TABLE,)
+        ).first()
+        for statement in SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if not exists:
+            for statement in SQLITE_REBUILD:
+                connection.exec_driver_sql(statement)
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def drop_search_index(connection):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for trigger in SQLITE_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+    elif dialect == "postgresql":
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_comment_search")
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_ticket_search")
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    drop_search_index(connection)
+
+
+def search_terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def fts_query(query):
+    """
+    Turns free text into an FTS5 query that matches every word.
+
+    Words are quoted so FTS5 operators in the input are treated as text, and
+    the last word also matches as a prefix.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def make_snippet(content, terms, words=SNIPPET_WORDS):
+    """
+    Cuts the part of `content` around the first search term and marks the terms.
+
+    A word matches when it starts with a term, which also covers the prefix
+    match of the last term and most plurals.
+    """
+    # Words end up at the odd positions, with the separators around them
+    parts = re.split(r"(\w+)", content)
+    count = len(parts) // 2
+    matched = [parts[2 * k + 1].lower().startswith(terms) for k in range(count)]
+    first = matched.index(True) if True in matched else 0
+    lo = max(0, first - words // 4)
+    hi = min(count, lo + words)
+
+    snippet = Markup("…" if lo > 0 else "")
+    for k in range(lo, hi):
+        word = parts[2 * k + 1]
+        snippet += Markup("<mark>%s</mark>") % word if matched[k] else escape(word)
+        if k < hi - 1:
+            snippet += escape(parts[2 * k + 2])
+    if hi < count:
+        snippet += Markup("…")
+    return snippet
+
+
+def _sqlite_matches(query):
+    # The document number tells a ticket from a comment. The subquery keeps
+    # bm25() out of the aggregate, and LIMIT -1 keeps SQLite from flattening
+    # it. MIN() makes `doc` the best matching document of each ticket.
+    return (
+        text(f"""
+            SELECT ticket_id, MIN(score) AS score, doc FROM (
+                SELECT
+                    CASE rowid % 2
+                        WHEN 0 THEN rowid / 2
+                        ELSE (
+                            SELECT ticket_id FROM comment
+                            WHERE comment.id = {SQLITE_TABLE}.rowid / 2
+                        )
+                    END AS ticket_id,
+                    rowid AS doc,
+                    bm25({SQLITE_TABLE}, {SQLITE_WEIGHTS}) AS score
+                FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH :query LIMIT -1
+            ) GROUP BY ticket_id
+            """)
+        .bindparams(query=fts_query(query))
+        .columns(ticket_id=db.Integer, score=db.Float, doc=db.Integer)
+        .subquery("matches")
+    )
+
+
+def _ticket_vector():
+    return func.setweight(func.to_tsvector("english", Ticket.title), "A").op("||")(
+        func.setweight(func.to_tsvector("english", Ticket.description), "B")
+    )
+
+
+def _comment_vector():
+    return func.to_tsvector("english", Comment.comment_text)
+
+
+def _postgres_matches(query):
+    tsquery = func.websearch_to_tsquery("english", query)
+    ticket_hits = db.select(
+        Ticket.id.label("ticket_id"),
+        (Ticket.id * 2).label("doc"),
+        func.ts_rank_cd(_ticket_vector(), tsquery).label("rank"),
+    ).where(_ticket_vector().op("@@")(tsquery))
+    comment_hits = db.select(
+        Comment.ticket_id.label("ticket_id"),
+        (Comment.id * 2 + 1).label("doc"),
+        func.ts_rank_cd(_comment_vector(), tsquery).label("rank"),
+    ).where(_comment_vector().op("@@")(tsquery))
+    hits = union_all(ticket_hits, comment_hits).subquery("hits")
+    # Negated, so that lower is better on both databases like bm25()
+    return (
+        db.select(hits.c.ticket_id, (-hits.c.rank).label("score"), hits.c.doc)
+        .distinct(hits.c.ticket_id)
+        .order_by(hits.c.ticket_id, hits.c.rank.desc())
+        .subquery("matches")
+    )
+
+
+def _snippets(query, rows):
+    """
+    Builds a snippet for each ticket from its best matching document.
+    """
+    comment_ids = [doc // 2 for _, _, doc in rows if doc % 2]
+    comments = dict(
+        db.session.execute(
+            db.select(Comment.id, Comment.comment_text).where(
+                Comment.id.in_(comment_ids)
+            )
+        ).all()
+    )
+    terms = tuple(search_terms(query))
+    snippets = {}
+    for ticket, _, doc in rows:
+        content = comments.get(doc // 2, "") if doc % 2 else ticket.description
+        snippets[ticket.id] = make_snippet(content, terms)
+    return snippets
+
+
+def search_tickets(
+    user,
+    query,
+    status=None,
+    priority=None,
+    assignee=None,
+    page=1,
+    per_page=SEARCH_PAGE_SIZE,
+):
+    """
+    Full-text search over ticket titles, descriptions and comments.
+
+    Only tickets the user could see on the All Tickets page are returned,
+    best match first. `assignee` is a user ID, or "none" for unassigned
+    tickets. Each hit carries a highlighted snippet of its best matching text.
+    """
+    if not search_terms(query):
+        return SearchResults([], page, False)
+    if db.session.get_bind().dialect.name == "postgresql":
+        matches = _postgres_matches(query)
+    else:
+        matches = _sqlite_matches(query)
+
+    tickets = all_tickets_query(user).join(matches, matches.c.ticket_id == Ticket.id)
+    if status:
+        tickets = tickets.filter(Ticket.status == status)
+    if priority:
+        tickets = tickets.filter(Ticket.priority == priority)
+    if assignee == "none":
+        tickets = tickets.filter(Ticket.assigned_to.is_(None))
+    elif assignee:
+        tickets = tickets.filter(Ticket.assigned_to == int(assignee))
+
+    rows = (
+        tickets.add_columns(matches.c.score, matches.c.doc)
+        .order_by(matches.c.score, Ticket.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page + 1)
+        .all()
+    )
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    snippets = _snippets(query, rows)
+    hits = [SearchHit(ticket, score, snippets[ticket.id]) for ticket, score, _ in rows]
+    return SearchResults(hits, page, has_next)
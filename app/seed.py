@@ -0,0 +1,252 @@
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func
+
+from app import db
+from app.models import Comment, Ticket, User
+from app.passwords import get_password_policy
+from app.search import drop_search_index, install_search_index
+
+# (users, tickets, comments) for each --scale
+SCALES = {
+    "small": (1_000, 10_000, 50_000),
+    "medium": (10_000, 100_000, 1_000_000),
+    "large": (100_000, 1_000_000, 10_000_000),
+}
+SEED_PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+SEED_CHUNK_SIZE = 10_000
+# Dates are spread over the year before this, so a seed always gives the same data
+SEED_END = datetime(2025, 1, 1)
+SEED_DAYS = 365
+
+ROLE_WEIGHTS = {"admin": 1, "support": 9, "regular": 90}
+STATUS_WEIGHTS = {"open": 30, "in-progress": 20, "closed": 50}
+PRIORITY_WEIGHTS = {"low": 50, "medium": 35, "high": 15}
+# Share of open tickets that already have an assignee
+OPEN_ASSIGNED = 0.6
+
+FIRST_NAMES = (
+    "Ada Alan Barbara Claude Dennis Edsger Frances Grace Guido Hedy Ida Jean "
+    "John Ken Linus Margaret Niklaus Radia Sophie Tim"
+).split()
+LAST_NAMES = (
+    "Allen Babbage Cerf Dijkstra Easley Floyd Goldberg Hamilton Hopper Knuth "
+    "Kay Lamarr Liskov Lovelace Perlman Ritchie Rossum Thompson Turing Wirth"
+).split()
+SUBJECTS = (
+    "printer vpn laptop password email invoice report monitor wifi account "
+    "license backup calendar phone browser server keyboard update access"
+).split()
+PROBLEMS = [
+    "is not working",
+    "keeps crashing",
+    "is very slow",
+    "shows an error",
+    "needs to be set up",
+    "stopped syncing",
+    "was locked",
+]
+REPLIES = [
+    "I am looking into this now.",
+    "Could you send a screenshot of the error?",
+    "This should be fixed now, please try again.",
+    "Still happening on my side.",
+    "Escalated to the infrastructure team.",
+    "Thanks, that worked.",
+    "Closing as resolved.",
+]
+
+
+def _skewed_weights(count):
+    """
+    Zipf-like weights, so a few users raise or handle most of the tickets.
+    """
+    return list(itertools.accumulate(1 / (rank + 1) for rank in range(count)))
+
+
+def _chunks(rows, size):
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class SyntheticData:
+    """
+    Deterministic generator of users, tickets and comments.
+
+    The same seed and sizes always produce the same rows. Rows are produced
+    lazily as dicts of column values, ready for bulk Core inserts, and IDs
+    are assigned up front from `first_ids` so that foreign keys can be filled
+    in without reading anything back.
+    """
+
+    def __init__(self, users, tickets, comments, seed=42, first_ids=(1, 1, 1)):
+        self.counts = users, tickets, comments
+        self.seed = seed
+        self.first_user, self.first_ticket, self.first_comment = first_ids
+        self.password_hash = get_password_policy().hash(SEED_PASSWORD)
+        self.staff = []
+        self.customers = []
+        # Per ticket: (created_at, creator, assignee), needed by the comments
+        self.tickets = []
+
+    def user_rows(self):
+        rng = random.Random(f"{self.seed}-users")
+        roles = rng.choices(
+            list(ROLE_WEIGHTS), weights=ROLE_WEIGHTS.values(), k=self.counts[0]
+        )
+        # Every dataset has at least one of each role
+        roles[:3] = ["admin", "support", "regular"][: len(roles)]
+        for offset, role in enumerate(roles):
+            user_id = self.first_user + offset
+            (self.customers if role == "regular" else self.staff).append(user_id)
+            yield {
+                "id": user_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "email": f"{role}{user_id}@seed.example.com",
+                "password_hash": self.password_hash,
+                "role": role,
+                "profile_image": None,
+            }
+
+    def ticket_rows(self):
+        rng = random.Random(f"{self.seed}-tickets")
+        statuses = list(STATUS_WEIGHTS)
+        priorities = list(PRIORITY_WEIGHTS)
+        creator_weights = _skewed_weights(len(self.customers))
+        staff_weights = _skewed_weights(len(self.staff))
+        count = self.counts[1]
+        for offset in range(count):
+            # Later tickets are more likely, like a helpdesk that is growing
+            age = SEED_DAYS * (1 - rng.random() ** 0.5)
+            created_at = SEED_END - timedelta(days=age)
+            status = rng.choices(statuses, weights=STATUS_WEIGHTS.values())[0]
+            assignee = None
+            if status != "open" or rng.random() < OPEN_ASSIGNED:
+                assignee = rng.choices(self.staff, cum_weights=staff_weights)[0]
+            creator = rng.choices(self.customers, cum_weights=creator_weights)[0]
+            self.tickets.append((created_at, creator, assignee))
+            subject = rng.choice(SUBJECTS)
+            priority = rng.choices(priorities, weights=PRIORITY_WEIGHTS.values())[0]
+            yield {
+                "id": self.first_ticket + offset,
+                "title": f"{subject.capitalize()} {rng.choice(PROBLEMS)}",
+                "description": (
+                    f"My {subject} {rng.choice(PROBLEMS)} since "
+                    f"{created_at:%A}. {rng.choice(PROBLEMS).capitalize()} too."
+                ),
+                "status": status,
+                "priority": priority,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(hours=rng.expovariate(1 / 48)),
+                "user_id": creator,
+                "assigned_to": assignee,
+            }
+
+    def comment_rows(self):
+        rng = random.Random(f"{self.seed}-comments")
+        # Some tickets attract long threads, most get a handful of comments
+        ticket_weights = list(
+            itertools.accumulate(rng.paretovariate(1.5) for _ in self.tickets)
+        )
+        positions = range(len(self.tickets))
+        for offset in range(self.counts[2]):
+            position = rng.choices(positions, cum_weights=ticket_weights)[0]
+            created_at, creator, assignee = self.tickets[position]
+            author = assignee if assignee and rng.random() < 0.6 else creator
+            yield {
+                "id": self.first_comment + offset,
+                "ticket_id": self.first_ticket + position,
+                "user_id": author,
+                "comment_text": rng.choice(REPLIES),
+                "created_at": created_at
+                + timedelta(hours=rng.expovariate(1 / 24) + 0.1),
+            }
+
+
+def _next_id(model):
+    return (db.session.scalar(db.select(func.max(model.id))) or 0) + 1
+
+
+def seed_database(users, tickets, comments, seed=42, chunk_size=SEED_CHUNK_SIZE):
+    """
+    Adds synthetic users, tickets and comments with bulk Core inserts.
+
+    The full-text index is dropped while the rows go in and rebuilt once at
+    the end, which is much faster than keeping it in sync row by row.
+    Returns the seconds spent on each table.
+    """
+    if users < 3 and (tickets or comments):
+        raise ValueError("Tickets need at least 3 users: an admin, support, regular.")
+    if comments and not tickets:
+        raise ValueError("Comments need tickets.")
+    data = SyntheticData(
+        users,
+        tickets,
+        comments,
+        seed,
+        first_ids=(_next_id(User), _next_id(Ticket), _next_id(Comment)),
+    )
+    timings = {}
+    with db.engine.begin() as connection:
+        drop_search_index(connection)
+    try:
+        for name, table, rows in (
+            ("users", User.__table__, data.user_rows()),
+            ("tickets", Ticket.__table__, data.ticket_rows()),
+            ("comments", Comment.__table__, data.comment_rows()),
+        ):
+            start = time.perf_counter()
+            for chunk in _chunks(rows, chunk_size):
+                db.session.execute(table.insert(), chunk)
+                db.session.commit()
+            timings[name] = time.perf_counter() - start
+    finally:
+        start = time.perf_counter()
+        with db.engine.begin() as connection:
+            install_search_index(connection)
+        timings["search index"] = time.perf_counter() - start
+    return timings
+
+
+@click.command("seed")
+@click.option("--scale", type=click.Choice(list(SCALES)), help="Preset sizes.")
+@click.option("--users", type=click.IntRange(0), help="Overrides the preset.")
+@click.option("--tickets", type=click.IntRange(0), help="Overrides the preset.")
+@click.option("--comments", type=click.IntRange(0), help="Overrides the preset.")
+@click.option("--seed", default=42, show_default=True, help="Random seed.")
+@click.option("--chunk-size", default=SEED_CHUNK_SIZE, type=click.IntRange(1))
+@with_appcontext
+def seed_command(scale, users, tickets, comments, seed, chunk_size):
+    """
+    Adds a deterministic synthetic dataset for load testing.
+
+    Every user's password is the one in SEED_PASSWORD. Emails look like
+    admin1@seed.example.com, where the number is the user ID.
+    """
+    preset = SCALES[scale or "small"]
+    counts = [
+        preset[i] if given is None else given
+        for i, given in enumerate((users, tickets, comments))
+    ]
+    try:
+        timings = seed_database(*counts, seed=seed, chunk_size=chunk_size)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    for name, count in zip(("users", "tickets", "comments"), counts):
+        seconds = timings[name]
+        rate = count / seconds if seconds else 0
+        click.echo(f"{name}: {count} rows in {seconds:.1f}s ({rate:,.0f} rows/s)")
+    click.echo(f"search index: rebuilt in {timings['search index']:.1f}s")
+
+
+def init_seed(app):
+    """
+    Adds the `flask seed` command.
+    """
+    app.cli.add_command(seed_command)
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from flask.sessions import (
+    SecureCookieSession,
+    SessionInterface,
+    session_json_serializer,
+)
+
+from app.kv import connect
+
+# Seconds between sweeps for sessions idle longer than their lifetime
+SWEEP_INTERVAL = 300
+# Seconds a session may go without its expiry being pushed back
+REFRESH_INTERVAL = 60
+SESSION_CACHE_SIZE = 1024
+
+
+class ServerSession(SecureCookieSession):
+    """
+    Session data kept on the server, found by the opaque ID in the cookie.
+
+    `version` goes up with every save, and the cookie carries it next to
+    the ID, so a cached copy is only used if it is the latest one.
+    """
+
+    def __init__(self, initial=None, sid=None, version=0, touched=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.version = version
+        self.touched = touched
+        self.user_id = self.get("_user_id")
+        self.accessed = False
+
+    @property
+    def new(self):
+        return self.sid is None
+
+
+class SQLiteSessionStore:
+    """
+    Sessions in a SQLite file, shared by every process on the machine.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS session ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL, "
+            "touched REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_session_touched ON session (touched)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        return (
+            self._connection()
+            .execute("SELECT data, version, touched FROM session WHERE key = ?", (key,))
+            .fetchone()
+        )
+
+    def put(self, key, data, version, touched, lifetime):
+        self._connection().execute(
+            "INSERT INTO session (key, data, version, touched) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET data = excluded.data, "
+            "version = excluded.version, touched = excluded.touched",
+            (key, data, version, touched),
+        )
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM session WHERE key = ?", (key,))
+
+    def sweep(self, cutoff):
+        return (
+            self._connection()
+            .execute("DELETE FROM session WHERE touched <= ?", (cutoff,))
+            .rowcount
+        )
+
+    def __len__(self):
+        return self._connection().execute("SELECT count(*) FROM session").fetchone()[0]
+
+
+class KVSessionStore:
+    """
+    Sessions as keys in Redis or its local stand-in.
+
+    Each key expires when its session would, so the server sweeps them.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(f"session:{key}")
+        return None if value is None else tuple(json.loads(value))
+
+    def put(self, key, data, version, touched, lifetime):
+        self.client.set(
+            f"session:{key}",
+            json.dumps([data, version, touched]),
+            ex=max(1, int(lifetime)),
+        )
+
+    def delete(self, key):
+        self.client.delete(f"session:{key}")
+
+    def sweep(self, cutoff):
+        return 0
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Keeps session data in `store`, and only an opaque ID in the cookie.
+
+    The cookie holds "<id>.<version>"; the store is keyed by a hash of the
+    ID, so its contents cannot be used to take over a session. The last
+    `cache_size` sessions are kept in memory as well. A session expires
+    after `lifetime` seconds without requests; an unchanged session is
+    written back at most every REFRESH_INTERVAL seconds to push its expiry
+    back. The ID changes whenever the logged in user does.
+    """
+
+    serializer = session_json_serializer
+
+    def __init__(self, store, lifetime, cache_size=SESSION_CACHE_SIZE, clock=time.time):
+        self.store = store
+        self.lifetime = lifetime
+        self.cache_size = cache_size
+        self.clock = clock
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+    @staticmethod
+    def _key(sid):
+        return hashlib.sha256(sid.encode()).hexdigest()
+
+    def _cached(self, key, version):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[1] != version:
+                return None
+            self._cache.move_to_end(key)
+            return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def open_session(self, app, request):
+        sid, _, version = request.cookies.get(self.get_cookie_name(app), "").rpartition(
+            "."
+        )
+        if not sid or not version.isdigit():
+            return ServerSession()
+        key = self._key(sid)
+        now = self.clock()
+        entry = self._cached(key, int(version))
+        if entry is None or now - entry[2] >= self.lifetime:
+            # Another process may have pushed the expiry back
+            entry = self.store.get(key)
+        if entry is None:
+            return ServerSession()
+        data, version, touched = entry
+        if now - touched >= self.lifetime:
+            self._forget(key)
+            self.store.delete(key)
+            return ServerSession()
+        return ServerSession(self.serializer.loads(data), sid, version, touched)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+        now = self.clock()
+        self._sweep(now)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.sid is not None:
+                self._forget(self._key(session.sid))
+                self.store.delete(self._key(session.sid))
+                response.delete_cookie(
+                    name,
+                    domain=domain,
+                    path=path,
+                    secure=secure,
+                    samesite=samesite,
+                    httponly=httponly,
+                )
+                response.vary.add("Cookie")
+            return
+
+        if session.sid is not None and session.get("_user_id") != session.user_id:
+            # A new ID on login and logout, so a planted one is worthless
+            self._forget(self._key(session.sid))
+            self.store.delete(self._key(session.sid))
+            session.sid = None
+
+        modified = session.new or session.modified
+        if not modified and now - session.touched < REFRESH_INTERVAL:
+            return
+        sid = session.sid or secrets.token_urlsafe(32)
+        key = self._key(sid)
+        version = session.version + 1 if modified else session.version
+        entry = (self.serializer.dumps(dict(session)), version, now)
+        self.store.put(key, *entry, self.lifetime)
+        self._remember(key, entry)
+        if not modified and not session.permanent:
+            # The cookie has not changed and does not expire
+            return
+
+        response.set_cookie(
+            name,
+            f"{sid}.{version}",
+            expires=self.get_expiration_time(app, session),
+            httponly=httponly,
+            domain=domain,
+            path=path,
+            secure=secure,
+            samesite=samesite,
+        )
+        response.vary.add("Cookie")
+
+    def _sweep(self, now):
+        if now - self._swept_at < SWEEP_INTERVAL:
+            return
+        self._swept_at = now
+        self.sweep(now)
+
+    def sweep(self, now=None):
+        """
+        Deletes sessions idle for longer than their lifetime.
+        """
+        cutoff = (now or self.clock()) - self.lifetime
+        with self._lock:
+            for key in [k for k, entry in self._cache.items() if entry[2] <= cutoff]:
+                del self._cache[key]
+        return self.store.sweep(cutoff)
+
+
+sessions_cli = AppGroup("sessions", help="Manage server-side sessions.")
+
+
+@sessions_cli.command("sweep")
+def sweep_command():
+    """Delete expired server-side sessions."""
+    interface = current_app.session_interface
+    if not isinstance(interface, ServerSessionInterface):
+        raise click.ClickException("SESSION_BACKEND is not set to a server store.")
+    click.echo(f"Deleted {interface.sweep()} expired sessions.")
+
+
+def make_store(app):
+    kind = app.config.get("SESSION_BACKEND")
+    if kind == "sqlite":
+        path = app.config.get("SESSION_SQLITE_PATH") or os.path.join(
+            app.instance_path, "sessions.db"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return SQLiteSessionStore(path)
+    if kind == "kv":
+        return KVSessionStore(connect(app.config.get("SESSION_REDIS_URL")))
+    raise ValueError(f"Unknown SESSION_BACKEND: {kind!r}")
+
+
+def init_sessions(app):
+    """
+    Keeps sessions on the server if SESSION_BACKEND is "sqlite" or "kv".
+
+    Otherwise Flask's signed cookie sessions stay in place.
+    """
+    app.cli.add_command(sessions_cli)
+    if app.config.get("SESSION_BACKEND", "cookie") == "cookie":
+        return
+    lifetime = app.config.get("SESSION_IDLE_TIMEOUT", app.permanent_session_lifetime)
+    if isinstance(lifetime, timedelta):
+        lifetime = lifetime.total_seconds()
+    app.session_interface = ServerSessionInterface(
+        make_store(app),
+        lifetime,
+        cache_size=app.config.get("SESSION_CACHE_SIZE", SESSION_CACHE_SIZE),
+    )
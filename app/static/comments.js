@@ -0,0 +1,25 @@
+// Replaces a "Show older comments" link with the page of comments it points
+// to, which comes with its own link if there are more.
+document.addEventListener('click', function (event) {
+    const link = event.target.closest('[data-older-comments]');
+    if (!link) {
+        return;
+    }
+    event.preventDefault();
+    link.classList.add('disabled');
+
+    fetch(link.href, { headers: { 'X-Requested-With': 'fetch' } })
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(function (html) {
+            link.closest('li').outerHTML = html;
+            flask_moment_render_all();
+        })
+        .catch(function () {
+            link.classList.remove('disabled');
+        });
+});
@@ -0,0 +1,93 @@
+import logging
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache
+
+logger = logging.getLogger("app.templates")
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    Compiled templates in a directory shared by every worker.
+
+    Entries are keyed by template name and source checksum, and Jinja
+    rejects bytecode from another Python version, so an edited template or
+    an upgrade just compiles again. Files are written to a temporary name
+    and renamed, so workers never read half a file. A cache that cannot be
+    written only costs the compile time saved.
+    """
+
+    def dump_bytecode(self, bucket):
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as error:
+            logger.warning("Could not write template bytecode: %s", error)
+
+
+def precompile(app):
+    """
+    Loads every template of `app`, which compiles and caches the missing ones.
+
+    Returns the number of templates loaded.
+    """
+    names = app.jinja_env.list_templates(extensions=["html"])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+templates_cli = AppGroup("templates", help="Manage compiled templates.")
+
+
+@templates_cli.command("precompile")
+def precompile_command():
+    """Compile every template into the bytecode cache."""
+    cache = current_app.jinja_env.bytecode_cache
+    if cache is None:
+        raise click.ClickException("TEMPLATE_BYTECODE_CACHE is turned off.")
+    start = time.perf_counter()
+    count = precompile(current_app)
+    click.echo(
+        f"Compiled {count} templates into {cache.directory} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+
+@templates_cli.command("clear")
+def clear_command():
+    """Remove cached template bytecode."""
+    cache = current_app.jinja_env.bytecode_cache
+    if cache is None:
+        raise click.ClickException("TEMPLATE_BYTECODE_CACHE is turned off.")
+    cache.clear()
+    click.echo(f"Cleared {cache.directory}")
+
+
+def init_template_cache(app):
+    """
+    Caches compiled templates in TEMPLATE_CACHE_DIR (instance/jinja_cache).
+
+    Workers then load bytecode instead of parsing the templates on first
+    use, once `flask templates precompile` or an earlier worker has filled
+    the cache. TEMPLATE_BYTECODE_CACHE = False turns the cache off, and
+    TEMPLATE_PRELOAD = True also loads every template when the app starts.
+    """
+    app.cli.add_command(templates_cli)
+    if app.config.get("TEMPLATE_BYTECODE_CACHE", True):
+        directory = app.config.get("TEMPLATE_CACHE_DIR") or os.path.join(
+            app.instance_path, "jinja_cache"
+        )
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as error:
+            logger.warning("Template bytecode cache disabled: %s", error)
+        else:
+            # The environment may exist already, so set it rather than
+            # passing it through jinja_options
+            app.jinja_env.bytecode_cache = TemplateBytecodeCache(directory)
+    if app.config.get("TEMPLATE_PRELOAD", False):
+        precompile(app)
@@ -0,0 +1,199 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from app import db
+from app.models import Comment, Ticket, User
+
+STATUSES = ("open", "in-progress", "closed")
+PRIORITIES = ("low", "medium", "high")
+BULK_ACTIONS = ("assign", "status", "priority", "delete")
+# Keeps the IN (...) lists well below SQLite's bound parameter limit
+BULK_LIMIT = 500
+
+
+class TicketUpdate:
+    """
+    Changes to one ticket and the audit comment for each of them.
+
+    Nothing is written until the enclosing `update_ticket` block ends, so the
+    new field values and their comments are committed in the same transaction.
+    """
+
+    def __init__(self, ticket, author):
+        self.ticket = ticket
+        self.author_id = author.id
+        self.comments = []
+
+    @property
+    def changed(self):
+        return bool(self.comments)
+
+    def comment(self, text):
+        """
+        Adds a comment to the ticket as part of the update.
+        """
+        self.comments.append(text)
+
+    def set_status(self, status):
+        if self.ticket.status != status:
+            self.ticket.status = status
+            self.comment(f"Status changed to {status}.")
+
+    def set_priority(self, priority):
+        if self.ticket.priority != priority:
+            self.ticket.priority = priority
+            self.comment(f"Priority changed to {priority}.")
+
+    def assign(self, assignee, message="Assignee changed to {name}."):
+        """
+        Assigns the ticket to `assignee`, or unassigns it when it is None.
+
+        `message` is formatted with the assignee's name for the audit comment.
+        """
+        assignee_id = assignee.id if assignee else None
+        if self.ticket.assigned_to != assignee_id:
+            self.ticket.assigned_to = assignee_id
+            self.comment(
+                message.format(name=assignee.name if assignee else "Unassigned")
+            )
+
+    def _stage(self):
+        db.session.add_all(
+            Comment(comment_text=text, ticket_id=self.ticket.id, user_id=self.author_id)
+            for text in self.comments
+        )
+
+
+@contextmanager
+def update_ticket(ticket, author):
+    """
+    Collects changes to `ticket` made by `author` and commits them once.
+
+    The ticket row and every audit comment are flushed together when the
+    block ends. If the block raises, or the commit fails, the session is
+    rolled back and nothing is written.
+    """
+    update = TicketUpdate(ticket, author)
+    try:
+        yield update
+        update._stage()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+@dataclass
+class BulkResult:
+    updated: list = field(default_factory=list)
+    # Ticket ID -> reason it was left alone
+    skipped: dict = field(default_factory=dict)
+
+
+class BulkActionError(ValueError):
+    pass
+
+
+def can_bulk_update(user, action):
+    """
+    Role rules for bulk actions, matching the single-ticket views.
+
+    Only admins may assign or delete tickets; support staff may also change
+    status and priority.
+    """
+    if user.role == "admin":
+        return True
+    return user.role == "support" and action in ("status", "priority")
+
+
+def _bulk_change(action, value):
+    """
+    Returns the column values and audit comment for `action`, validating `value`.
+    """
+    if action == "status":
+        if value not in STATUSES:
+            raise BulkActionError("Invalid status.")
+        return {"status": value}, f"Status changed to {value}."
+    if action == "priority":
+        if value not in PRIORITIES:
+            raise BulkActionError("Invalid priority.")
+        return {"priority": value}, f"Priority changed to {value}."
+
+    assignee = db.session.get(User, int(value)) if str(value).isdigit() else None
+    if not assignee or assignee.role not in ["admin", "support"]:
+        raise BulkActionError("Invalid assignee selected.")
+    return {"assigned_to": assignee.id}, f"Ticket assigned to {assignee.name}."
+
+
+def bulk_update_tickets(user, ticket_ids, action, value=None):
+    """
+    Applies one action to many tickets with a single UPDATE or DELETE.
+
+    Each ticket is checked on its own: missing tickets, tickets the user may
+    not change and tickets that already have the new value are skipped and
+    reported in the result. Changed tickets get their audit comments in one
+    bulk insert, in the same transaction as the update.
+    """
+    if action not in BULK_ACTIONS:
+        raise BulkActionError("Unknown bulk action.")
+    ticket_ids = list(
+        dict.fromkeys(int(ticket_id) for ticket_id in ticket_ids if ticket_id.isdigit())
+    )
+    if not ticket_ids:
+        raise BulkActionError("No tickets selected.")
+    if len(ticket_ids) > BULK_LIMIT:
+        raise BulkActionError(f"Select at most {BULK_LIMIT} tickets at a time.")
+
+    values, comment_text = (
+        ({}, None) if action == "delete" else _bulk_change(action, value)
+    )
+    rows = db.session.execute(
+        db.select(Ticket.id, Ticket.status, Ticket.priority, Ticket.assigned_to).where(
+            Ticket.id.in_(ticket_ids)
+        )
+    ).all()
+    found = {row.id: row for row in rows}
+
+    result = BulkResult()
+    for ticket_id in ticket_ids:
+        row = found.get(ticket_id)
+        if row is None:
+            result.skipped[ticket_id] = "not found"
+        elif not can_bulk_update(user, action):
+            result.skipped[ticket_id] = "not permitted"
+        elif values and all(getattr(row, k) == v for k, v in values.items()):
+            result.skipped[ticket_id] = "unchanged"
+        else:
+            result.updated.append(ticket_id)
+    if not result.updated:
+        return result
+
+    try:
+        if action == "delete":
+            # Comments are kept and detached, as deleting one ticket does
+            db.session.execute(
+                db.update(Comment)
+                .where(Comment.ticket_id.in_(result.updated))
+                .values(ticket_id=None)
+            )
+            db.session.execute(db.delete(Ticket).where(Ticket.id.in_(result.updated)))
+        else:
+            db.session.execute(
+                db.update(Ticket).where(Ticket.id.in_(result.updated)).values(values)
+            )
+            db.session.execute(
+                db.insert(Comment),
+                [
+                    {
+                        "comment_text": comment_text,
+                        "ticket_id": ticket_id,
+                        "user_id": user.id,
+                    }
+                    for ticket_id in result.updated
+                ],
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import current_app
+from flask_login import UserMixin
+
+from app import db
+from app.models import User
+
+# Seconds a snapshot is used before the row is read again. Short, because
+# other worker processes never hear about changes to a user.
+USER_CACHE_TTL = 30
+
+
+@dataclass(frozen=True, eq=False)
+class UserSnapshot(UserMixin):
+    """
+    Read-only copy of the user columns needed to serve an authenticated request.
+
+    Views that change a user must load the `User` row itself.
+    """
+
+    id: int
+    name: str
+    email: str
+    role: str
+    profile_image: str = None
+
+
+class UserCache:
+    """
+    Bounded LRU cache of user snapshots whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize=1024, ttl=USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        """
+        Returns the cached snapshot for `user_id`, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            snapshot, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def set(self, snapshot):
+        """
+        Stores a snapshot, evicting the least recently used entry when full.
+        """
+        with self._lock:
+            self._entries[snapshot.id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """
+        Drops the snapshot for `user_id` so the next request reloads it.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def init_user_cache(app):
+    """
+    Attaches a user snapshot cache to the application.
+
+    The cache lives in each worker process, and `invalidate_user` only
+    clears the one that made the change. Other workers keep serving the old
+    snapshot until it expires, so for up to USER_CACHE_TTL seconds (30 by
+    default) they may still honour a role that was taken away, or a user
+    who was deleted. Lower the TTL, or set it to 0 to disable the cache,
+    where that matters more than the saved queries.
+    """
+    app.extensions["user_cache"] = UserCache(
+        maxsize=app.config.get("USER_CACHE_SIZE", 1024),
+        ttl=app.config.get("USER_CACHE_TTL", USER_CACHE_TTL),
+    )
+
+
+def invalidate_user(user_id):
+    """
+    Drops a user's cached snapshot after their row has been changed.
+    """
+    current_app.extensions["user_cache"].invalidate(int(user_id))
+
+
+def load_user(user_id):
+    """
+    Load a user by their user ID, serving repeat requests from the cache.
+    """
+    user_id = int(user_id)
+    cache = current_app.extensions["user_cache"]
+    snapshot = cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    # Select plain columns so a cache miss skips ORM identity map setup too
+    row = db.session.execute(
+        db.select(User.id, User.name, User.email, User.role, User.profile_image).where(
+            User.id == user_id
+        )
+    ).first()
+    if row is None:
+        return None
+
+    snapshot = UserSnapshot(*row)
+    cache.set(snapshot)
+    return snapshot
@@ -1,9 +1,9 @@
 from urllib.parse import urljoin, urlparse
 
-from flask import redirect, request, url_for
+from flask import g, redirect, request, url_for
 from flask_login import current_user
 
-from app.models import Ticket
+from app.counters import get_open_ticket_counter
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
 UPLOAD_FOLDER = "app/static/uploads/profile_images"
@@ -35,9 +35,15 @@ def redirect_based_on_role():
 
 
 def inject_open_tickets_count():
-    open_tickets_count = Ticket.query.filter(
-        Ticket.status.in_(["open", "in-progress"])
-    ).count()
+    """
+    Provides the active tickets badge to templates.
+
+    The count comes from the cached open-ticket counter and is looked up at
+    most once per request, however many templates are rendered.
+    """
+    if "open_tickets_count" not in g:
+        g.open_tickets_count = get_open_ticket_counter().get()
+    open_tickets_count = g.open_tickets_count
 
     # Determine the badge class based on the count
     if open_tickets_count > 10:
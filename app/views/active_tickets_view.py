@@ -2,12 +2,17 @@ from flask import render_template
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Ticket
+from app.database import replica_reads
+from app.pagination import paginate_tickets
+from app.queries import active_tickets_query
 
 
 class ActiveTicketsView(MethodView):
     decorators = [login_required]
 
+    @replica_reads
     def get(self):
-        tickets = Ticket.query.filter_by(user_id=current_user.id, status="open").all()
-        return render_template("all_tickets.html", tickets=tickets, view="active")
+        page = paginate_tickets(active_tickets_query(current_user))
+        return render_template(
+            "all_tickets.html", tickets=page.items, page=page, view="active"
+        )
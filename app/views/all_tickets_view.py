@@ -2,23 +2,29 @@ from flask import render_template
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Ticket
+from app.database import replica_reads
+from app.pagination import paginate_tickets
+from app.queries import all_tickets_query
 
 
 class AllTicketsView(MethodView):
     decorators = [login_required]
 
+    @replica_reads
     def get(self):
         """
         Renders a page displaying all tickets.
         """
         if current_user.role in ["admin", "support"]:
-            tickets = Ticket.query.all()
             view = "all"
         else:
-            tickets = Ticket.query.filter_by(user_id=current_user.id).all()
             view = "active"
 
+        page = paginate_tickets(all_tickets_query(current_user))
         return render_template(
-            "all_tickets.html", tickets=tickets, current_user=current_user, view=view
+            "all_tickets.html",
+            tickets=page.items,
+            page=page,
+            current_user=current_user,
+            view=view,
         )
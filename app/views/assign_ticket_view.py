@@ -2,7 +2,8 @@ from flask import flash, redirect, render_template, request, url_for
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Comment, Ticket, User, db
+from app.models import Ticket, User
+from app.tickets import update_ticket
 
 
 class AssignTicketView(MethodView):
@@ -44,16 +45,8 @@ class AssignTicketView(MethodView):
             flash("Invalid assignee selected.", "warning")
             return redirect(url_for("main.assign_ticket", ticket_id=ticket_id))
 
-        ticket.assigned_to = assigned_to_id
-        db.session.commit()
-
-        # Add a comment about the assignment
-        comment_text = f"Ticket assigned to {assignee.name}."
-        new_comment = Comment(
-            comment_text=comment_text, ticket_id=ticket.id, user_id=current_user.id
-        )
-        db.session.add(new_comment)
-        db.session.commit()
+        with update_ticket(ticket, current_user) as update:
+            update.assign(assignee, "Ticket assigned to {name}.")
 
         flash("Ticket assigned successfully.", "success")
         return redirect(url_for("main.all_tickets"))
@@ -2,34 +2,26 @@ from flask import flash, redirect, render_template, url_for
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Ticket, User
+from app.database import replica_reads
+from app.pagination import paginate_tickets
+from app.queries import assigned_tickets_query, support_staff_query
 
 
 class AssignedTicketsView(MethodView):
     decorators = [login_required]
 
+    @replica_reads
     def get(self):
         if current_user.role not in ["support", "admin"]:
             flash("Only support staff and admins can view this page.", "warning")
             return redirect(url_for("main.all_tickets"))
 
-        if current_user.role == "support":
-            assigned_tickets = (
-                Ticket.query.filter_by(assigned_to=current_user.id)
-                .filter(Ticket.status != "closed")
-                .all()
-            )
-        else:
-            assigned_tickets = (
-                Ticket.query.filter(Ticket.assigned_to.isnot(None))
-                .filter(Ticket.status != "closed")
-                .all()
-            )
-
-        support_staff = User.query.filter(User.role.in_(["admin", "support"])).all()
+        page = paginate_tickets(assigned_tickets_query(current_user))
+        support_staff = support_staff_query().all()
         return render_template(
             "assigned_tickets.html",
-            assigned_tickets=assigned_tickets,
+            assigned_tickets=page.items,
+            page=page,
             support_staff=support_staff,
             view="assigned",
         )
@@ -0,0 +1,41 @@
+from flask import flash, redirect, request, url_for
+from flask.views import MethodView
+from flask_login import current_user, login_required
+
+from app.tickets import BulkActionError, bulk_update_tickets
+from app.utils import is_safe_url
+
+
+class BulkTicketsView(MethodView):
+    decorators = [login_required]
+
+    def post(self):
+        """
+        Applies an action to every selected ticket at once.
+        """
+        next_url = request.form.get("next")
+        if not next_url or not is_safe_url(next_url):
+            next_url = url_for("main.all_tickets")
+
+        try:
+            result = bulk_update_tickets(
+                current_user,
+                request.form.getlist("ticket_ids"),
+                request.form.get("action"),
+                request.form.get("value"),
+            )
+        except BulkActionError as e:
+            flash(str(e), "warning")
+            return redirect(next_url)
+
+        if result.updated:
+            verb = "Deleted" if request.form.get("action") == "delete" else "Updated"
+            count = len(result.updated)
+            flash(f"{verb} {count} ticket{'s' if count != 1 else ''}.", "success")
+        if result.skipped:
+            reasons = sorted(set(result.skipped.values()))
+            flash(
+                f"Skipped {len(result.skipped)} ticket(s): {', '.join(reasons)}.",
+                "warning",
+            )
+        return redirect(next_url)
@@ -2,24 +2,20 @@ from flask import render_template
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Ticket
+from app.database import replica_reads
+from app.pagination import paginate_tickets
+from app.queries import closed_tickets_query
 
 
 class ClosedTicketsView(MethodView):
     decorators = [login_required]
 
+    @replica_reads
     def get(self):
-        if current_user.role == "admin":
-            closed_tickets = Ticket.query.filter_by(status="closed").all()
-        elif current_user.role == "support":
-            closed_tickets = Ticket.query.filter_by(
-                status="closed", assigned_to=current_user.id
-            ).all()
-        else:
-            closed_tickets = Ticket.query.filter_by(
-                status="closed", user_id=current_user.id
-            ).all()
-
+        page = paginate_tickets(closed_tickets_query(current_user))
         return render_template(
-            "closed_tickets.html", closed_tickets=closed_tickets, view="closed"
+            "closed_tickets.html",
+            closed_tickets=page.items,
+            page=page,
+            view="closed",
         )
@@ -0,0 +1,58 @@
+from flask import Response, abort, request, stream_with_context
+from flask.views import MethodView
+from flask_login import current_user, login_required
+
+from app.export import (
+    COMMENT_COLUMNS,
+    EXPORT_SCOPES,
+    TICKET_COLUMNS,
+    ExportError,
+    comment_export_query,
+    parse_date_range,
+    stream_csv,
+    stream_ndjson,
+    ticket_export_query,
+)
+
+DATASETS = {
+    "tickets": (ticket_export_query, list(TICKET_COLUMNS)),
+    "comments": (comment_export_query, list(COMMENT_COLUMNS)),
+}
+FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
+
+
+class ExportView(MethodView):
+    decorators = [login_required]
+
+    def get(self, dataset, fmt):
+        """
+        Streams every ticket or comment the user can see as CSV or NDJSON.
+
+        `scope` picks the role filter of the All or Closed Tickets page, and
+        `created_from`, `created_to`, `updated_from` and `updated_to` limit
+        the rows by date.
+        """
+        scope = request.args.get("scope", "all")
+        if scope not in EXPORT_SCOPES:
+            abort(400, description="Unknown export scope.")
+        try:
+            created = parse_date_range(
+                request.args.get("created_from"), request.args.get("created_to")
+            )
+            updated = parse_date_range(
+                request.args.get("updated_from"), request.args.get("updated_to")
+            )
+        except ExportError as e:
+            abort(400, description=str(e))
+
+        build_query, columns = DATASETS[dataset]
+        stream, mimetype = FORMATS[fmt]
+        query = build_query(current_user, scope, created, updated)
+        return Response(
+            stream_with_context(stream(query, columns)),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename={dataset}.{fmt}"},
+        )
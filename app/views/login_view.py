@@ -2,7 +2,10 @@ from flask import flash, render_template, request
 from flask.views import MethodView
 from flask_login import current_user, login_user
 
+from app import db
+from app.metrics import LOGINS
 from app.models import User
+from app.rate_limit import get_login_limiter, too_many_attempts
 from app.utils import redirect_based_on_role
 
 
@@ -13,16 +16,29 @@ class LoginView(MethodView):
         return render_template("login.html")
 
     def post(self):
+        email = request.form.get("email")
+        # Before anything else, so throttled attempts cost no queries or hashing
+        limiter = get_login_limiter()
+        if limiter is not None:
+            retry_after = limiter.hit(request.remote_addr, email)
+            if retry_after:
+                LOGINS.inc(result="throttled")
+                return too_many_attempts(retry_after)
+
         if current_user.is_authenticated:
             return redirect_based_on_role()
 
-        email = request.form.get("email")
         password = request.form.get("password")
         user = User.query.filter_by(email=email).first()
 
         if user and user.check_password(password):
+            if db.session.is_modified(user):
+                # The hash was made with an outdated scheme or cost
+                db.session.commit()
+            LOGINS.inc(result="success")
             login_user(user)
             return redirect_based_on_role()
         else:
+            LOGINS.inc(result="failure")
             flash("Login failed. Check your email and password.", "warning")
             return render_template("login.html")
@@ -1,13 +1,13 @@
-import os
 import re
 
 from flask import flash, render_template, request
 from flask.views import MethodView
 from flask_login import login_user
-from PIL import Image, ImageOps
 
+from app.images import get_image_pipeline
 from app.models import User, db
-from app.utils import UPLOAD_FOLDER, allowed_file, redirect_based_on_role
+from app.user_cache import invalidate_user
+from app.utils import allowed_file, redirect_based_on_role
 
 
 class RegisterView(MethodView):
@@ -76,32 +76,19 @@ class RegisterView(MethodView):
 
         db.session.add(new_user)
         db.session.commit()  # Commit to generate the new_user.id
+        invalidate_user(new_user.id)
 
-        # Handle profile image upload
+        # Handle profile image upload. The image is resized in the background,
+        # so the default avatar shows until it is ready.
         if profile_image and allowed_file(profile_image.filename):
             try:
-                # Generate a unique filename based on the new user's ID and the file extension
-                file_ext = profile_image.filename.rsplit(".", 1)[1].lower()
-                filename = f"user_{new_user.id}.{file_ext}"
-
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-
-                # Ensure the upload folder exists
-                if not os.path.exists(UPLOAD_FOLDER):
-                    os.makedirs(UPLOAD_FOLDER)
-
-                # Save the file
-                profile_image.save(file_path)
-
-                # Optionally resize or crop the image
-                img = Image.open(file_path)
-                img = ImageOps.fit(img, (200, 200), Image.Resampling.LANCZOS)
-                img.save(file_path)
-
-                # Update the new user's profile image field in the database
-                new_user.profile_image = filename
-                db.session.commit()
-
+                profile_image = get_image_pipeline().submit(
+                    new_user.id, profile_image, new_user.profile_image
+                )
+                if isinstance(profile_image, str):
+                    new_user.profile_image = profile_image
+                    db.session.commit()
+                    invalidate_user(new_user.id)
             except Exception as e:
                 flash(f"An error occurred while uploading the image: {e}", "danger")
 
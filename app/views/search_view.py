@@ -0,0 +1,47 @@
+from flask import current_app, render_template, request
+from flask.views import MethodView
+from flask_login import current_user, login_required
+
+from app.database import replica_reads
+from app.queries import support_staff_query
+from app.search import SEARCH_PAGE_SIZE, search_tickets
+
+
+class SearchView(MethodView):
+    decorators = [login_required]
+
+    @replica_reads
+    def get(self):
+        """
+        Searches the tickets visible to the user, with optional filters.
+        """
+        query = request.args.get("q", "").strip()
+        filters = {
+            "status": request.args.get("status", ""),
+            "priority": request.args.get("priority", ""),
+            "assignee": request.args.get("assignee", ""),
+        }
+        if (
+            filters["assignee"] not in ("", "none")
+            and not filters["assignee"].isdigit()
+        ):
+            filters["assignee"] = ""
+        page = max(request.args.get("page", 1, type=int), 1)
+
+        results = None
+        if query:
+            results = search_tickets(
+                current_user,
+                query,
+                page=page,
+                per_page=current_app.config.get("SEARCH_PAGE_SIZE", SEARCH_PAGE_SIZE),
+                **filters,
+            )
+
+        return render_template(
+            "search.html",
+            query=query,
+            filters=filters,
+            results=results,
+            support_staff=support_staff_query().all(),
+        )
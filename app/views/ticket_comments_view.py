@@ -0,0 +1,22 @@
+from flask import render_template
+from flask.views import MethodView
+from flask_login import login_required
+
+from app.database import replica_reads
+from app.models import Ticket
+from app.pagination import paginate_comments
+from app.queries import comment_timeline_query
+
+
+class TicketCommentsView(MethodView):
+    decorators = [login_required]
+
+    @replica_reads
+    def get(self, ticket_id):
+        """
+        Renders the page of comments older than the `after` cursor as an HTML
+        fragment for the ticket pages to insert.
+        """
+        ticket = Ticket.query.get_or_404(ticket_id)
+        comments = paginate_comments(comment_timeline_query(ticket.id))
+        return render_template("_comments.html", ticket_id=ticket.id, comments=comments)
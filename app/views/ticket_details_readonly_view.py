@@ -2,18 +2,22 @@ from flask import render_template
 from flask.views import MethodView
 from flask_login import login_required
 
-from ..models import Comment, Ticket
+from ..database import replica_reads
+from ..models import Ticket
+from ..pagination import paginate_comments
+from ..queries import comment_timeline_query
 
 
 class TicketDetailsReadonlyView(MethodView):
     decorators = [login_required]
 
+    @replica_reads
     def get(self, ticket_id):
         """
         Displays the read-only details of a specific ticket without any interactivity.
         """
         ticket = Ticket.query.get_or_404(ticket_id)
-        comments = Comment.query.filter_by(ticket_id=ticket.id).all()
+        comments = paginate_comments(comment_timeline_query(ticket.id))
         return render_template(
             "ticket_details_readonly.html", ticket=ticket, comments=comments
         )
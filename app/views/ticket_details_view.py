@@ -1,16 +1,21 @@
-from flask import redirect, render_template, request, url_for
+from flask import flash, redirect, render_template, request, url_for
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Comment, Ticket, User, db
+from app.database import replica_reads
+from app.models import Ticket, User, db
+from app.pagination import paginate_comments
+from app.queries import comment_timeline_query
+from app.tickets import update_ticket
 
 
 class TicketDetailsView(MethodView):
     decorators = [login_required]
 
+    @replica_reads
     def get(self, ticket_id):
         ticket = Ticket.query.get_or_404(ticket_id)
-        comments = Comment.query.filter_by(ticket_id=ticket.id).all()
+        comments = paginate_comments(comment_timeline_query(ticket.id))
         users = User.query.filter(User.role.in_(["admin", "support"])).all()
 
         return render_template(
@@ -20,53 +25,29 @@ class TicketDetailsView(MethodView):
     def post(self, ticket_id):
         ticket = Ticket.query.get_or_404(ticket_id)
 
-        if "comment_text" in request.form:
-            comment_text = request.form.get("comment_text")
-            new_comment = Comment(
-                comment_text=comment_text, ticket_id=ticket.id, user_id=current_user.id
-            )
-            db.session.add(new_comment)
+        # Checked before anything changes, so a bad assignee writes nothing
+        assignee = None
+        new_assignee_id = request.form.get("assignee")
+        if new_assignee_id:
+            if not new_assignee_id.isdigit():
+                flash("Invalid assignee selected.", "warning")
+                return redirect(url_for("main.ticket_details", ticket_id=ticket_id))
+            assignee = db.session.get(User, int(new_assignee_id))
+            if assignee is None:
+                flash("The selected user does not exist.", "warning")
+                return redirect(url_for("main.ticket_details", ticket_id=ticket_id))
 
-        if "status" in request.form:
-            status = request.form.get("status")
-            if ticket.status != status:
-                ticket.status = status
-                status_comment_text = f"Status changed to {status}."
-                status_comment = Comment(
-                    comment_text=status_comment_text,
-                    ticket_id=ticket.id,
-                    user_id=current_user.id,
-                )
-                db.session.add(status_comment)
+        with update_ticket(ticket, current_user) as update:
+            if "comment_text" in request.form:
+                update.comment(request.form.get("comment_text"))
 
-        if "priority" in request.form:
-            priority = request.form.get("priority")
-            if ticket.priority != priority:
-                ticket.priority = priority
-                priority_comment_text = f"Priority changed to {priority}."
-                priority_comment = Comment(
-                    comment_text=priority_comment_text,
-                    ticket_id=ticket.id,
-                    user_id=current_user.id,
-                )
-                db.session.add(priority_comment)
+            if "status" in request.form:
+                update.set_status(request.form.get("status"))
 
-        if "assignee" in request.form:
-            new_assignee_id = request.form.get("assignee")
-            if ticket.assigned_to != new_assignee_id:
-                ticket.assigned_to = new_assignee_id
-                assignee_name = (
-                    User.query.get(new_assignee_id).name
-                    if new_assignee_id
-                    else "Unassigned"
-                )
-                assignee_comment_text = f"Assignee changed to {assignee_name}."
-                assignee_comment = Comment(
-                    comment_text=assignee_comment_text,
-                    ticket_id=ticket.id,
-                    user_id=current_user.id,
-                )
-                db.session.add(assignee_comment)
+            if "priority" in request.form:
+                update.set_priority(request.form.get("priority"))
+
+            if "assignee" in request.form:
+                update.assign(assignee)
 
-        db.session.commit()
         return redirect(url_for("main.ticket_details", ticket_id=ticket_id))
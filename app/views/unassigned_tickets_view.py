@@ -2,57 +2,62 @@ from flask import flash, redirect, render_template, request, url_for
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Comment, Ticket, User, db
+from app.database import replica_reads
+from app.models import Ticket, User, db
+from app.pagination import paginate_tickets
+from app.queries import support_staff_query, unassigned_tickets_query
+from app.tickets import update_ticket
 
 
 class UnassignedTicketsView(MethodView):
     decorators = [login_required]
 
+    @replica_reads
     def get(self):
         if current_user.role not in ["support", "admin"]:
             flash("Only support staff and admins can view this page.", "warning")
             return redirect(url_for("main.all_tickets"))
 
-        unassigned_tickets = Ticket.query.filter_by(assigned_to=None).all()
-        support_staff = User.query.filter(User.role.in_(["admin", "support"])).all()
+        page = paginate_tickets(unassigned_tickets_query())
+        support_staff = support_staff_query().all()
 
         return render_template(
             "unassigned_tickets.html",
-            unassigned_tickets=unassigned_tickets,
+            unassigned_tickets=page.items,
+            page=page,
             support_staff=support_staff,
             view="unassigned",
         )
 
     def post(self):
-        ticket_id = request.form.get("ticket_id")
-        ticket = Ticket.query.get(ticket_id)
-
         if current_user.role == "support":
-            ticket.assigned_to = current_user.id
-            comment_text = f"Ticket assigned to {current_user.name}."
+            assignee = current_user
         elif current_user.role == "admin":
             assigned_to_id = request.form.get("assigned_to")
-            print(f"Assigned to ID: {assigned_to_id}")  # Debugging line
             if not assigned_to_id:
                 flash("No assignee selected.", "warning")
                 return redirect(url_for("main.unassigned_tickets"))
 
-            assignee = User.query.get(assigned_to_id)
-
+            assignee = (
+                db.session.get(User, int(assigned_to_id))
+                if assigned_to_id.isdigit()
+                else None
+            )
             if assignee is None:
                 flash("The selected user does not exist.", "warning")
                 return redirect(url_for("main.unassigned_tickets"))
+        else:
+            flash("Only support staff and admins can assign tickets.", "warning")
+            return redirect(url_for("main.all_tickets"))
 
-            ticket.assigned_to = assigned_to_id
-            comment_text = f"Ticket assigned to {assignee.name}."
-
-        db.session.commit()
+        ticket_id = request.form.get("ticket_id", "")
+        ticket = db.session.get(Ticket, int(ticket_id)) if ticket_id.isdigit() else None
+        if ticket is None:
+            flash("The selected ticket does not exist.", "warning")
+            return redirect(url_for("main.unassigned_tickets"))
 
-        new_comment = Comment(
-            comment_text=comment_text, ticket_id=ticket.id, user_id=current_user.id
-        )
-        db.session.add(new_comment)
-        db.session.commit()
+        with update_ticket(ticket, current_user) as update:
+            update.assign(assignee, "Ticket assigned to {name}.")
 
         flash("Ticket assigned successfully.", "success")
         return redirect(url_for("main.unassigned_tickets"))
@@ -1,13 +1,13 @@
-import os
 import re
 
 from flask import flash, redirect, render_template, request, url_for
 from flask.views import MethodView
 from flask_login import current_user, login_required
-from PIL import Image, ImageOps
 
+from app.images import get_image_pipeline
 from app.models import User, db
-from app.utils import UPLOAD_FOLDER, allowed_file, is_safe_url
+from app.user_cache import invalidate_user
+from app.utils import allowed_file, is_safe_url
 
 
 class UpdateProfileView(MethodView):
@@ -33,6 +33,9 @@ class UpdateProfileView(MethodView):
         password_confirm = request.form.get("password_confirm")
         file = request.files.get("profile_image")
 
+        # current_user is a read-only snapshot, so changes go to the row itself
+        user = db.session.get(User, current_user.id)
+
         # Validate name
         if not name.strip():
             flash("Name cannot be empty.", "warning")
@@ -99,34 +102,18 @@ class UpdateProfileView(MethodView):
                 )
 
             # Set new password
-            current_user.set_password(password)
+            user.set_password(password)
 
-        # Handle profile image upload
+        # Handle profile image upload. The image is resized in the background,
+        # so the current avatar shows until the new one is ready.
         if file and allowed_file(file.filename):
             try:
-                # Generate a unique filename based on the user's ID
-                file_ext = file.filename.rsplit(".", 1)[1].lower()
-                filename = f"user_{current_user.id}.{file_ext}"
-
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-
-                # Ensure the upload folder exists
-                if not os.path.exists(UPLOAD_FOLDER):
-                    os.makedirs(UPLOAD_FOLDER)
-
-                # Save the file
-                file.save(file_path)
-
-                # Optionally resize or crop the image
-                img = Image.open(file_path)
-                img = ImageOps.fit(img, (200, 200), Image.Resampling.LANCZOS)
-                img.save(file_path)
-
-                # Update the user's profile image in the database
-                current_user.profile_image = filename
-                db.session.commit()  # Save the new filename in the database
-
-                flash("Profile image updated successfully!", "success")
+                profile_image = get_image_pipeline().submit(
+                    user.id, file, user.profile_image
+                )
+                if isinstance(profile_image, str):
+                    user.profile_image = profile_image
+                flash("Profile image uploaded successfully!", "success")
             except Exception as e:
                 flash(f"An error occurred while uploading the image: {e}", "danger")
         else:
@@ -137,9 +124,10 @@ class UpdateProfileView(MethodView):
                 )
 
         # Update user profile and save to database
-        current_user.name = name
-        current_user.email = email
+        user.name = name
+        user.email = email
         db.session.commit()
+        invalidate_user(user.id)
 
         flash("Your profile has been updated.", "success")
         return redirect(next_url)
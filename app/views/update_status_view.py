@@ -2,7 +2,8 @@ from flask import flash, redirect, request, url_for
 from flask.views import MethodView
 from flask_login import current_user, login_required
 
-from app.models import Ticket, db
+from app.models import Ticket
+from app.tickets import update_ticket
 
 
 class UpdateStatusView(MethodView):
@@ -16,7 +17,7 @@ class UpdateStatusView(MethodView):
 
         status = request.form.get("status")
         if status:
-            ticket.status = status
-            db.session.commit()
+            with update_ticket(ticket, current_user) as update:
+                update.set_status(status)
             flash("Status has been updated.", "success")
         return redirect(url_for("main.ticket_details", ticket_id=ticket.id))
@@ -0,0 +1,105 @@
+"""
+Measures export throughput and peak memory as the ticket table grows.
+
+Each scale builds a fresh database file, then downloads /export/tickets.csv
+and /export/tickets.ndjson through the test client, reading the streamed
+body chunk by chunk. Peak memory is the largest Python allocation total seen
+by tracemalloc while the export runs, so it should stay flat across scales.
+
+Usage:
+    python -m benchmarks.bench_export --scales 10000 100000 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models import Ticket, User
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+def build_app(path, tickets):
+    """Creates a database file holding `tickets` tickets and an admin user."""
+    app = create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        admin = User(name="Admin", email="admin@bench.local", role="admin")
+        admin.set_password(PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+
+        base = datetime(2024, 1, 1)
+        for offset in range(0, tickets, 10_000):
+            db.session.execute(
+                Ticket.__table__.insert(),
+                [
+                    {
+                        "title": f"Ticket {i}",
+                        "description": "Benchmark ticket description " * 4,
+                        "status": ("open", "in-progress", "closed")[i % 3],
+                        "priority": ("low", "medium", "high")[i % 3],
+                        "created_at": base + timedelta(seconds=i),
+                        "updated_at": base + timedelta(seconds=i),
+                        "user_id": admin.id,
+                    }
+                    for i in range(offset, min(offset + 10_000, tickets))
+                ],
+            )
+        db.session.commit()
+    return app
+
+
+def download(app, url):
+    """Streams `url` and returns (seconds, bytes, peak MiB)."""
+    client = app.test_client()
+    with app.app_context():
+        client.post("/login", data={"email": "admin@bench.local", "password": PASSWORD})
+    with app.app_context():
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.get(url, buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, size, peak / 2**20
+
+
+def run(scales):
+    print(
+        f"{'tickets':>9} {'format':>7} {'seconds':>8} {'rows/s':>9} "
+        f"{'MiB out':>8} {'peak MiB':>9}"
+    )
+    for tickets in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = build_app(os.path.join(tmp, "bench.db"), tickets)
+            for fmt in ("csv", "ndjson"):
+                elapsed, size, peak = download(app, f"/export/tickets.{fmt}")
+                print(
+                    f"{tickets:>9} {fmt:>7} {elapsed:>8.2f} "
+                    f"{tickets / elapsed:>9,.0f} {size / 2**20:>8.1f} {peak:>9.2f}"
+                )
+            with app.app_context():
+                db.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+    run(args.scales)
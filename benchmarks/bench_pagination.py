@@ -0,0 +1,102 @@
+"""
+Measures list-view latency as the ticket table grows.
+
+With keyset pagination the first and the deep pages should stay flat
+regardless of how many tickets exist.
+
+Usage:
+    python -m benchmarks.bench_pagination --scales 1000 10000 100000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models import Ticket, User
+from app.pagination import encode_cursor
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+def build_app(path, scale):
+    """Creates an app backed by a fresh SQLite file holding `scale` tickets."""
+    app = create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        admin = User(name="Bench Admin", email="admin@bench.local", role="admin")
+        admin.set_password(PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+
+        base = datetime(2024, 1, 1)
+        rows = [
+            {
+                "title": f"Ticket {i}",
+                "description": "Benchmark ticket description",
+                "status": ("open", "in-progress", "closed")[i % 3],
+                "priority": ("low", "medium", "high")[i % 3],
+                "created_at": base + timedelta(seconds=i),
+                "updated_at": base + timedelta(seconds=i),
+                "user_id": admin.id,
+                "assigned_to": admin.id if i % 2 else None,
+            }
+            for i in range(scale)
+        ]
+        for start in range(0, scale, 10_000):
+            db.session.execute(Ticket.__table__.insert(), rows[start : start + 10_000])
+        db.session.commit()
+    return app
+
+
+def time_requests(client, url, repeat):
+    """Returns per-request latencies in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    return timings
+
+
+def run(scales, repeat):
+    print(f"{'tickets':>10} {'first p50 ms':>14} {'deep p50 ms':>13}")
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = build_app(os.path.join(tmp, "bench.db"), scale)
+            client = app.test_client()
+            client.post(
+                "/login", data={"email": "admin@bench.local", "password": PASSWORD}
+            )
+
+            with app.app_context():
+                middle = db.session.get(Ticket, scale // 2)
+                deep_url = f"/all_tickets?after={encode_cursor(middle)}"
+
+            first = time_requests(client, "/all_tickets", repeat)
+            deep = time_requests(client, deep_url, repeat)
+            print(
+                f"{scale:>10} {statistics.median(first):>14.2f} "
+                f"{statistics.median(deep):>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.scales, args.repeat)
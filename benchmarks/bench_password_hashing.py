@@ -0,0 +1,190 @@
+"""
+Measures password hashes per second per core for each hashing policy.
+
+Each policy from app/passwords.py is timed in one process and then in one
+process per core, which shows how well hashing scales across workers. A
+login verifies one hash, so hashes/s per core is roughly the login rate one
+worker process can sustain. The end-to-end column posts to /login through
+the test client with that policy, so it adds the rest of the request.
+
+With --storm, several threads keep logging in while another one times a
+page that needs no hashing, first with hashing in the request threads and
+then on the process pool. It shows how responsive the rest of the app stays
+and how many logins were turned away with 503.
+
+Usage:
+    python -m benchmarks.bench_password_hashing --duration 3
+    python -m benchmarks.bench_password_hashing --method scrypt:16384:8:1
+    python -m benchmarks.bench_password_hashing --storm 16
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from app import create_app, db
+from app.models import User
+from app.passwords import DEFAULT_METHODS, PasswordPolicy, argon2
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+METHODS = [
+    "pbkdf2:sha256:260000",
+    DEFAULT_METHODS["pbkdf2"],
+    "scrypt:16384:8:1",
+    DEFAULT_METHODS["scrypt"],
+]
+if argon2 is not None:
+    METHODS += ["argon2:2:19456:1", DEFAULT_METHODS["argon2"]]
+
+
+def verify_for(method, duration):
+    """Verifies one hash repeatedly and returns the number of checks."""
+    policy = PasswordPolicy(method)
+    password_hash = policy.hash(PASSWORD)
+    checks = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        assert policy.verify(password_hash, PASSWORD)
+        checks += 1
+    return checks
+
+
+def make_app(path, method, **config):
+    app = create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "PASSWORD_HASH": method,
+            "LOGIN_RATE_LIMIT": False,
+            **config,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        user = User(name="Bench", email="bench@bench.local", role="regular")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def log_in(app):
+    with app.app_context():
+        return app.test_client().post(
+            "/login", data={"email": "bench@bench.local", "password": PASSWORD}
+        )
+
+
+def logins_per_sec(method, duration):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"{tmp}/bench.db", method, PASSWORD_HASH_WORKERS=0)
+        logins = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            assert log_in(app).status_code == 302
+            logins += 1
+        with app.app_context():
+            db.engine.dispose()
+    return logins / duration
+
+
+def storm(method, workers, threads, duration):
+    """
+    Logs in from `threads` threads while timing GET /login in another one.
+
+    Returns (logins/s, rejected logins, page p50 ms, page p95 ms).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(f"{tmp}/bench.db", method, PASSWORD_HASH_WORKERS=workers)
+        deadline = time.perf_counter() + duration
+        statuses = []
+        page_ms = []
+
+        def keep_logging_in():
+            while time.perf_counter() < deadline:
+                statuses.append(log_in(app).status_code)
+
+        def keep_loading_page():
+            client = app.test_client()
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                with app.app_context():
+                    client.get("/login")
+                page_ms.append((time.perf_counter() - start) * 1000)
+                time.sleep(0.01)
+
+        pool = [threading.Thread(target=keep_logging_in) for _ in range(threads)]
+        pool.append(threading.Thread(target=keep_loading_page))
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        with app.app_context():
+            db.engine.dispose()
+
+    page_ms.sort()
+    return (
+        statuses.count(302) / duration,
+        statuses.count(503),
+        statistics.median(page_ms),
+        page_ms[int(len(page_ms) * 0.95)],
+    )
+
+
+def run(methods, duration, processes):
+    print(f"{processes} cores")
+    print(
+        f"{'method':<24} {'ms/hash':>8} {'hashes/s':>9} {'all cores':>10} "
+        f"{'per core':>9} {'logins/s':>9}"
+    )
+    for method in methods:
+        single = verify_for(method, duration) / duration
+        with multiprocessing.Pool(processes) as pool:
+            checks = pool.starmap(verify_for, [(method, duration)] * processes)
+        parallel = sum(checks) / duration
+        logins = logins_per_sec(method, duration)
+        print(
+            f"{method:<24} {1000 / single:>8.1f} {single:>9.1f} {parallel:>10.1f} "
+            f"{parallel / processes:>9.1f} {logins:>9.1f}"
+        )
+
+
+def run_storm(method, threads, duration, processes):
+    print(f"{threads} threads logging in with {method}")
+    print(
+        f"{'hashing':<16} {'logins/s':>9} {'503s':>6} {'page p50':>9} "
+        f"{'page p95':>9}"
+    )
+    for label, workers in (
+        ("request thread", 0),
+        (f"{processes} processes", processes),
+    ):
+        logins, rejected, p50, p95 = storm(method, workers, threads, duration)
+        print(f"{label:<16} {logins:>9.1f} {rejected:>6} {p50:>9.1f} {p95:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--method",
+        dest="methods",
+        action="append",
+        help="A PASSWORD_HASH value to time; may be repeated.",
+    )
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--storm", type=int, metavar="THREADS", help="Run the login storm instead."
+    )
+    args = parser.parse_args()
+    if args.storm:
+        method = (args.methods or [DEFAULT_METHODS["pbkdf2"]])[0]
+        run_storm(method, args.storm, args.duration, args.processes)
+    else:
+        run(args.methods or METHODS, args.duration, args.processes)
@@ -0,0 +1,313 @@
+"""
+Benchmarks every route of the main blueprint per data scale and role.
+
+For each scale a database is filled by the synthetic generator in
+app/seed.py. Then every rule registered on the `main` blueprint is requested
+while logged in as an admin, a support user and a regular user. Each
+(scale, role, endpoint) records p50/p95 latency, the number of SQL
+statements and the peak Python memory of one request.
+
+Results can be saved as a JSON baseline. A later run with --compare fails
+when a route got slower, allocates more memory or runs more SQL than the
+baseline allows.
+
+Latency and memory depend on the machine, so a baseline is only useful on
+the machine that recorded it. SQL counts and status codes do not, and
+--sql-only compares just those.
+
+Usage:
+    python -m benchmarks.bench_routes --scales small medium --save baseline.json
+    python -m benchmarks.bench_routes --scales small --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Ticket, User
+from app.seed import SCALES, SEED_PASSWORD, seed_database
+
+ROLES = ("admin", "support", "regular")
+
+
+@dataclass
+class RouteRequest:
+    """
+    How to request one endpoint. Rules with GET are requested with GET.
+
+    `setup` runs before every request and may return URL values to use,
+    `teardown` runs after it. Neither is timed.
+    """
+
+    query: dict = None
+    data: dict = None
+    setup: object = None
+    teardown: object = None
+
+
+def _throwaway_ticket(bench):
+    with bench.app.app_context():
+        ticket = Ticket(
+            title="Benchmark ticket",
+            description="Deleted by the benchmark",
+            status="open",
+            priority="low",
+            user_id=bench.users["regular"],
+        )
+        db.session.add(ticket)
+        db.session.commit()
+        return {"ticket_id": ticket.id}
+
+
+def _login_again(bench):
+    bench.login(bench.role)
+
+
+# Every endpoint of the blueprint needs an entry, so new routes can't be
+# left out of the benchmark by accident
+ROUTES = {
+    "main.home": RouteRequest(),
+    "main.index": RouteRequest(),
+    "main.login": RouteRequest(),
+    "main.register": RouteRequest(),
+    "main.logout": RouteRequest(teardown=_login_again),
+    "main.all_tickets": RouteRequest(),
+    "main.active_tickets": RouteRequest(),
+    "main.assigned_tickets": RouteRequest(),
+    "main.unassigned_tickets": RouteRequest(),
+    "main.closed_tickets": RouteRequest(),
+    "main.create_ticket": RouteRequest(),
+    "main.ticket_details": RouteRequest(),
+    "main.ticket_details_readonly": RouteRequest(),
+    "main.ticket_comments": RouteRequest(),
+    "main.assign_ticket": RouteRequest(),
+    "main.update_profile": RouteRequest(),
+    "main.search": RouteRequest(query={"q": "printer not working"}),
+    "main.export": RouteRequest(query={"created_from": "2024-12-01"}),
+    "main.update_status": RouteRequest(data={"status": "in-progress"}),
+    "main.delete_ticket": RouteRequest(setup=_throwaway_ticket),
+    "main.bulk_tickets": RouteRequest(
+        data={"ticket_ids": ["1", "2", "3"], "action": "priority", "value": "high"}
+    ),
+}
+# Values for the variable parts of the rules
+URL_VALUES = {"dataset": "tickets", "fmt": "csv"}
+
+
+class RouteBench:
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+        self.role = None
+        self.statements = 0
+        with app.app_context():
+            self.users = {
+                role: db.session.scalar(
+                    db.select(User.id).filter_by(role=role).order_by(User.id)
+                )
+                for role in ROLES
+            }
+            self.emails = {
+                role: db.session.get(User, user_id).email
+                for role, user_id in self.users.items()
+            }
+            # A ticket every role can open: raised by the regular user
+            self.ticket_id = db.session.scalar(
+                db.select(Ticket.id)
+                .filter_by(user_id=self.users["regular"])
+                .order_by(Ticket.id)
+            )
+            event.listen(db.engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.statements += 1
+
+    def login(self, role):
+        self.role = role
+        self.client.get("/logout")
+        response = self.client.post(
+            "/login", data={"email": self.emails[role], "password": SEED_PASSWORD}
+        )
+        assert response.status_code == 302, f"{role} could not log in"
+
+    def rules(self):
+        rules = [
+            r for r in self.app.url_map.iter_rules() if r.endpoint.startswith("main.")
+        ]
+        missing = {r.endpoint for r in rules} - ROUTES.keys()
+        if missing:
+            raise SystemExit(f"No benchmark request for: {', '.join(sorted(missing))}")
+        return sorted(rules, key=lambda r: r.endpoint)
+
+    def _request(self, rule, spec):
+        values = {"ticket_id": self.ticket_id, **URL_VALUES}
+        if spec.setup:
+            values.update(spec.setup(self) or {})
+        adapter = self.app.url_map.bind("localhost")
+        path = adapter.build(
+            rule.endpoint, {arg: values[arg] for arg in rule.arguments}
+        )
+        method = "GET" if "GET" in rule.methods else "POST"
+        start = time.perf_counter()
+        response = self.client.open(
+            path, method=method, query_string=spec.query, data=spec.data
+        )
+        response.get_data()
+        elapsed = (time.perf_counter() - start) * 1000
+        if spec.teardown:
+            spec.teardown(self)
+        return elapsed, response.status_code
+
+    def measure(self, rule, repeat):
+        spec = ROUTES[rule.endpoint]
+        # Warm-up, which also fills the per-process caches
+        self._request(rule, spec)
+
+        timings = []
+        for _ in range(repeat):
+            elapsed, status = self._request(rule, spec)
+            timings.append(elapsed)
+
+        self.statements = 0
+        self._request(rule, spec)
+        statements = self.statements
+
+        tracemalloc.start()
+        self._request(rule, spec)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        return {
+            "status": status,
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(
+                timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3
+            ),
+            "sql": statements,
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+
+def build_app(path, scale):
+    app = create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            # Logout is timed by logging in again after every request
+            "LOGIN_RATE_LIMIT": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        seed_database(*SCALES[scale])
+    return app
+
+
+def run(scales, roles, repeat):
+    results = {}
+    print(
+        f"{'scale':>7} {'role':>8} {'endpoint':<30} {'status':>6} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'sql':>4} {'peak KiB':>9}"
+    )
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = build_app(os.path.join(tmp, "bench.db"), scale)
+            bench = RouteBench(app)
+            for role in roles:
+                bench.login(role)
+                for rule in bench.rules():
+                    stats = bench.measure(rule, repeat)
+                    results[f"{scale}/{role}/{rule.endpoint}"] = stats
+                    print(
+                        f"{scale:>7} {role:>8} {rule.endpoint:<30} "
+                        f"{stats['status']:>6} {stats['p50_ms']:>8.2f} "
+                        f"{stats['p95_ms']:>8.2f} {stats['sql']:>4} "
+                        f"{stats['peak_kib']:>9.1f}"
+                    )
+            with app.app_context():
+                db.engine.dispose()
+    return results
+
+
+def regressions(results, baseline, tolerance, min_ms, sql_only=False):
+    """
+    Lists the results that are worse than the baseline.
+
+    Latency and memory may grow by `tolerance` (a fraction) before they
+    count, and latency also by `min_ms`, so that noise on fast routes is
+    ignored. Any extra SQL statement counts, as does a changed status code.
+    """
+    found = []
+    for key, stats in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if stats["sql"] > base["sql"]:
+            found.append(f"{key}: {base['sql']} -> {stats['sql']} SQL statements")
+        if stats["status"] != base["status"]:
+            found.append(f"{key}: status {base['status']} -> {stats['status']}")
+        if sql_only:
+            continue
+        limit = base["p50_ms"] * (1 + tolerance) + min_ms
+        if stats["p50_ms"] > limit:
+            found.append(f"{key}: p50 {base['p50_ms']:.2f} -> {stats['p50_ms']:.2f} ms")
+        if stats["peak_kib"] > base["peak_kib"] * (1 + tolerance) + 64:
+            found.append(
+                f"{key}: peak {base['peak_kib']:.0f} -> {stats['peak_kib']:.0f} KiB"
+            )
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small"])
+    parser.add_argument("--roles", nargs="+", choices=ROLES, default=list(ROLES))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON.")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="Fail if results regressed from FILE."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed growth of latency and memory, as a fraction.",
+    )
+    parser.add_argument(
+        "--min-ms", type=float, default=2.0, help="Latency growth always allowed."
+    )
+    parser.add_argument(
+        "--sql-only",
+        action="store_true",
+        help="Only compare SQL counts and status codes.",
+    )
+    args = parser.parse_args()
+
+    results = run(args.scales, args.roles, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        found = regressions(
+            results, baseline, args.tolerance, args.min_ms, args.sql_only
+        )
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
@@ -0,0 +1,164 @@
+"""
+Measures /search latency over a large synthetic comment corpus.
+
+The corpus is written with bulk inserts, so the time to build it includes
+keeping the FTS5 index in sync through its triggers. Queries cover rare and
+common words, filters and a regular user's narrower view, and are compared
+with a LIKE scan of the same columns.
+
+Usage:
+    python -m benchmarks.bench_search --comments 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.search import search_tickets
+
+# A small vocabulary drawn with a skewed distribution, so some words appear in
+# most documents and others in only a handful
+WORDS = (
+    "printer login password network screen email account laptop vpn update "
+    "error slow crash install license server backup keyboard mouse monitor "
+    "access report invoice meeting calendar phone battery wifi browser cache "
+    "toner cartridge firmware driver permission folder sync outlook teams"
+).split()
+QUERIES = [
+    ("common word", "printer", {}),
+    ("rare word", "teams", {}),
+    ("two words", "printer toner", {}),
+    ("prefix", "netw", {}),
+    ("filtered", "printer", {"status": "open", "priority": "high"}),
+]
+
+
+def sentence(rng, length):
+    return " ".join(rng.choices(WORDS, weights=range(len(WORDS), 0, -1), k=length))
+
+
+def build_app(path, comments, tickets_per_comment):
+    """Creates a database with `comments` comments spread over tickets."""
+    app = create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        }
+    )
+    rng = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        for role in ("admin", "regular"):
+            user = User(name=role, email=f"{role}@bench.local", role=role)
+            user.password_hash = "unused"
+            db.session.add(user)
+        db.session.commit()
+
+        tickets = max(int(comments * tickets_per_comment), 1)
+        base = datetime(2024, 1, 1)
+        start = time.perf_counter()
+        for offset in range(0, tickets, 10_000):
+            db.session.execute(
+                Ticket.__table__.insert(),
+                [
+                    {
+                        "title": sentence(rng, 4),
+                        "description": sentence(rng, 30),
+                        "status": ("open", "in-progress", "closed")[i % 3],
+                        "priority": ("low", "medium", "high")[i % 3],
+                        "created_at": base + timedelta(seconds=i),
+                        "updated_at": base + timedelta(seconds=i),
+                        "user_id": 1 + i % 2,
+                    }
+                    for i in range(offset, min(offset + 10_000, tickets))
+                ],
+            )
+        for offset in range(0, comments, 10_000):
+            db.session.execute(
+                Comment.__table__.insert(),
+                [
+                    {
+                        "ticket_id": rng.randint(1, tickets),
+                        "user_id": 1,
+                        "comment_text": sentence(rng, 20),
+                        "created_at": base + timedelta(seconds=i),
+                    }
+                    for i in range(offset, min(offset + 10_000, comments))
+                ],
+            )
+        db.session.commit()
+        elapsed = time.perf_counter() - start
+        print(
+            f"Indexed {tickets} tickets and {comments} comments in {elapsed:.1f}s "
+            f"({(tickets + comments) / elapsed:,.0f} rows/s)"
+        )
+    return app
+
+
+def like_search(term):
+    pattern = f"%{term}%"
+    matching_comments = db.select(Comment.ticket_id).where(
+        Comment.comment_text.like(pattern)
+    )
+    return (
+        Ticket.query.filter(
+            Ticket.title.like(pattern)
+            | Ticket.description.like(pattern)
+            | Ticket.id.in_(matching_comments)
+        )
+        .limit(20)
+        .all()
+    )
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def run(comments, tickets_per_comment, repeat, like):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), comments, tickets_per_comment)
+        with app.app_context():
+            users = {u.role: u for u in User.query.all()}
+            header = f"{'query':>12} {'user':>8} {'p50 ms':>9} {'p95 ms':>9}"
+            print(header + (f" {'LIKE ms':>9}" if like else ""))
+            for label, query, filters in QUERIES:
+                for role in ("admin", "regular"):
+                    p50, p95 = timed(
+                        lambda: search_tickets(users[role], query, **filters), repeat
+                    )
+                    line = f"{label:>12} {role:>8} {p50:>9.2f} {p95:>9.2f}"
+                    if like and role == "admin" and not filters:
+                        like_p50, _ = timed(lambda: like_search(query.split()[0]), 1)
+                        line += f" {like_p50:>9.2f}"
+                    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=1_000_000)
+    parser.add_argument(
+        "--tickets-per-comment",
+        type=float,
+        default=0.02,
+        help="Tickets to create per comment, 0.02 is 50 comments per ticket.",
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--like", action="store_true", help="Also time a LIKE scan for comparison."
+    )
+    args = parser.parse_args()
+    run(args.comments, args.tickets_per_comment, args.repeat, args.like)
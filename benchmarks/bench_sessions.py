@@ -0,0 +1,121 @@
+"""
+Compares signed cookie sessions with the server-side session stores.
+
+Each backend gets a fresh app, and --clients test clients log in to it.
+The clients then take turns requesting a page that only reads the session,
+as Flask-Login does on every request, and a page that flashes three
+messages followed by one that shows them. Both pages skip the database and templates,
+so the times are mostly session handling. With more clients than
+SESSION_CACHE_SIZE, the server stores serve some sessions from the store
+rather than the in-memory cache. The cookie column is the size of the
+session cookie the browser sends back while messages are pending.
+
+Usage:
+    python -m benchmarks.bench_sessions --clients 100 --requests 5000
+    python -m benchmarks.bench_sessions --clients 5000 --cache-size 1024
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from flask import flash, get_flashed_messages, session
+
+from app import create_app, db
+from app.models import User
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+BACKENDS = ["cookie", "sqlite", "kv"]
+MESSAGES = [
+    "Ticket created successfully!",
+    "The ticket has been assigned to Support User.",
+    "Your profile has been updated.",
+]
+
+
+def build_app(tmp, backend, cache_size):
+    app = create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "PASSWORD_HASH": "pbkdf2:sha256:1000",
+            "PASSWORD_HASH_WORKERS": 0,
+            "LOGIN_RATE_LIMIT": False,
+            "SESSION_BACKEND": backend,
+            "SESSION_SQLITE_PATH": f"{tmp}/sessions.db",
+            "SESSION_CACHE_SIZE": cache_size,
+        }
+    )
+
+    @app.route("/_bench/read")
+    def read():
+        return session.get("_user_id", "")
+
+    @app.route("/_bench/flash")
+    def flash_messages():
+        for message in MESSAGES:
+            flash(message, "success")
+        return ""
+
+    @app.route("/_bench/show")
+    def show():
+        return " ".join(get_flashed_messages())
+
+    with app.app_context():
+        db.create_all()
+        user = User(name="Bench", email="bench@bench.local", role="regular")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def timed(client, url, samples):
+    start = time.perf_counter()
+    client.get(url)
+    samples.append((time.perf_counter() - start) * 1e6)
+
+
+def run_backend(backend, clients, requests, cache_size):
+    """Returns (read µs p50, flash and show µs p50, cookie bytes)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(tmp, backend, cache_size)
+        pool = [app.test_client() for _ in range(clients)]
+        with app.app_context():
+            for client in pool:
+                client.post(
+                    "/login", data={"email": "bench@bench.local", "password": PASSWORD}
+                )
+            reads, writes = [], []
+            for n in range(requests):
+                timed(pool[n % clients], "/_bench/read", reads)
+            for n in range(requests // 2):
+                client = pool[n % clients]
+                start = time.perf_counter()
+                client.get("/_bench/flash")
+                cookie = len(client.get_cookie("session").value)
+                client.get("/_bench/show")
+                writes.append((time.perf_counter() - start) * 1e6)
+            db.engine.dispose()
+    return statistics.median(reads), statistics.median(writes), cookie
+
+
+def run(backends, clients, requests, cache_size):
+    print(f"{clients} clients, {requests} requests, session cache of {cache_size}")
+    print(f"{'backend':<8} {'read µs':>8} {'flash+show µs':>14} {'cookie B':>9}")
+    for backend in backends:
+        read, write, cookie = run_backend(backend, clients, requests, cache_size)
+        print(f"{backend:<8} {read:>8.0f} {write:>14.0f} {cookie:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", dest="backends", action="append")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+    run(args.backends or BACKENDS, args.clients, args.requests, args.cache_size)
@@ -0,0 +1,163 @@
+"""
+Compares SQLite throughput with and without the connection tuning profile.
+
+Several worker processes share one database file. Each runs a mix of ticket
+list reads and comment writes for a fixed time, and the totals are reported
+for the default SQLite settings and for the profile in app/database.py.
+
+Usage:
+    python -m benchmarks.bench_sqlite_concurrency --workers 8 --write-ratio 0.2
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.pagination import paginate_keyset
+from app.queries import ticket_list_query
+
+
+def make_app(path, tuned):
+    return create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "SQLITE_TUNING": tuned,
+        }
+    )
+
+
+def build_database(path, tuned, tickets):
+    """Creates a database file holding `tickets` tickets and one user."""
+    app = make_app(path, tuned)
+    with app.app_context():
+        db.create_all()
+        user = User(name="Bench User", email="user@bench.local", role="admin")
+        user.password_hash = "unused"
+        db.session.add(user)
+        db.session.commit()
+
+        base = datetime(2024, 1, 1)
+        db.session.execute(
+            Ticket.__table__.insert(),
+            [
+                {
+                    "title": f"Ticket {i}",
+                    "description": "Benchmark ticket description",
+                    "status": ("open", "in-progress", "closed")[i % 3],
+                    "priority": "medium",
+                    "created_at": base + timedelta(seconds=i),
+                    "updated_at": base + timedelta(seconds=i),
+                    "user_id": user.id,
+                }
+                for i in range(tickets)
+            ],
+        )
+        db.session.commit()
+        db.engine.dispose()
+
+
+def worker(path, tuned, tickets, write_ratio, duration, seed):
+    """Runs the mixed workload and returns (reads, writes, errors, latencies)."""
+    rng = random.Random(seed)
+    app = make_app(path, tuned)
+    reads = writes = errors = 0
+    latencies = []
+    with app.app_context():
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    ticket_id = rng.randint(1, tickets)
+                    db.session.add(
+                        Comment(
+                            comment_text="Benchmark comment",
+                            ticket_id=ticket_id,
+                            user_id=1,
+                        )
+                    )
+                    db.session.execute(
+                        db.update(Ticket)
+                        .where(Ticket.id == ticket_id)
+                        .values(updated_at=datetime.utcnow())
+                    )
+                    db.session.commit()
+                    writes += 1
+                else:
+                    page = paginate_keyset(ticket_list_query(), per_page=25)
+                    assert len(page.items) == 25
+                    db.session.commit()
+                    reads += 1
+            except OperationalError:
+                # Typically "database is locked" once busy waiting gives up
+                db.session.rollback()
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+        db.engine.dispose()
+    return reads, writes, errors, latencies
+
+
+def run_profile(tuned, workers, tickets, write_ratio, duration):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        build_database(path, tuned, tickets)
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(
+                worker,
+                [
+                    (path, tuned, tickets, write_ratio, duration, seed)
+                    for seed in range(workers)
+                ],
+            )
+
+    reads = sum(r[0] for r in results)
+    writes = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    latencies = sorted(ms for r in results for ms in r[3])
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else float("nan")
+    median = statistics.median(latencies) if latencies else float("nan")
+    return {
+        "ops_per_sec": (reads + writes) / duration,
+        "reads": reads,
+        "writes": writes,
+        "errors": errors,
+        "p50_ms": median,
+        "p95_ms": p95,
+    }
+
+
+def run(workers, tickets, write_ratio, duration):
+    print(
+        f"{'profile':>8} {'ops/s':>9} {'reads':>8} {'writes':>8} "
+        f"{'errors':>7} {'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for label, tuned in (("default", False), ("tuned", True)):
+        stats = run_profile(tuned, workers, tickets, write_ratio, duration)
+        print(
+            f"{label:>8} {stats['ops_per_sec']:>9.1f} {stats['reads']:>8} "
+            f"{stats['writes']:>8} {stats['errors']:>7} "
+            f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--tickets", type=int, default=10_000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    run(args.workers, args.tickets, args.write_ratio, args.duration)
@@ -0,0 +1,162 @@
+"""
+Measures first-request latency per template with and without the bytecode cache.
+
+Every page is requested from a fresh app, as a new worker would after a
+deploy: first with templates compiled from source, then with bytecode from a
+cache filled by `flask templates precompile`, and then with the templates
+preloaded when the app is created. The warm column is the second request to
+the same app, when every template is in memory. The first request also pays
+for other one-off work, such as compiling its SQL, so compare the columns
+with each other rather than with zero. The last line is the time create_app
+takes in each mode.
+
+Usage:
+    python -m benchmarks.bench_templates --repeat 5
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.template_cache import precompile
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+# (template, role to log in as or None, URL)
+PAGES = [
+    ("login.html", None, "/login"),
+    ("register.html", None, "/register"),
+    ("index.html", None, "/index"),
+    ("all_tickets.html", "admin", "/all_tickets"),
+    ("unassigned_tickets.html", "admin", "/unassigned_tickets"),
+    ("closed_tickets.html", "admin", "/closed_tickets"),
+    ("create_ticket.html", "admin", "/create_ticket"),
+    ("ticket_details.html", "admin", "/ticket/1"),
+    ("ticket_details_readonly.html", "admin", "/ticket/1/readonly"),
+    ("assign_ticket.html", "admin", "/assign_ticket/1"),
+    ("search.html", "admin", "/search?q=printer"),
+    ("update_profile.html", "admin", "/update_profile"),
+    ("assigned_tickets.html", "support", "/assigned_tickets"),
+]
+MODES = {
+    "compile": {"TEMPLATE_BYTECODE_CACHE": False},
+    "bytecode": {},
+    "preload": {"TEMPLATE_PRELOAD": True},
+}
+
+
+def make_app(tmp, **config):
+    return create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "PASSWORD_HASH": "pbkdf2:sha256:1000",
+            "PASSWORD_HASH_WORKERS": 0,
+            "LOGIN_RATE_LIMIT": False,
+            "TEMPLATE_CACHE_DIR": f"{tmp}/jinja_cache",
+            **config,
+        }
+    )
+
+
+def build_database(tmp):
+    """A few users, tickets and comments, enough for every page to render."""
+    app = make_app(tmp)
+    with app.app_context():
+        db.create_all()
+        users = {}
+        for role in ("admin", "support", "regular"):
+            users[role] = User(
+                name=role.title(), email=f"{role}@bench.local", role=role
+            )
+            users[role].set_password(PASSWORD)
+            db.session.add(users[role])
+        db.session.flush()
+        base = datetime(2024, 1, 1)
+        for i in range(20):
+            ticket = Ticket(
+                title=f"Printer problem {i}",
+                description="The printer on the second floor is not working.",
+                status=("open", "in-progress", "closed")[i % 3],
+                priority=("low", "medium", "high")[i % 3],
+                created_at=base + timedelta(hours=i),
+                updated_at=base + timedelta(hours=i),
+                user_id=users["regular"].id,
+                assigned_to=users["support"].id if i % 2 else None,
+            )
+            db.session.add(ticket)
+            db.session.flush()
+            for j in range(3):
+                db.session.add(
+                    Comment(
+                        comment_text=f"Comment {j} on ticket {i}",
+                        ticket_id=ticket.id,
+                        user_id=users["support"].id,
+                    )
+                )
+        db.session.commit()
+        db.engine.dispose()
+
+
+def first_request(tmp, config, role, url):
+    """Returns (create_app ms, first request ms, second request ms)."""
+    start = time.perf_counter()
+    app = make_app(tmp, **config)
+    startup = time.perf_counter() - start
+    client = app.test_client()
+    with app.app_context():
+        if role:
+            client.post(
+                "/login", data={"email": f"{role}@bench.local", "password": PASSWORD}
+            )
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200, f"{url}: {response.status_code}"
+        db.engine.dispose()
+    return startup * 1000, timings[0] * 1000, timings[1] * 1000
+
+
+def run(repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        build_database(tmp)
+        precompile(make_app(tmp))
+
+        print(f"median of {repeat} fresh apps, ms")
+        print(
+            f"{'template':<30} "
+            + " ".join(f"{mode:>9}" for mode in MODES)
+            + f" {'warm':>9}"
+        )
+        startups = {mode: [] for mode in MODES}
+        for template, role, url in PAGES:
+            firsts = []
+            warm = []
+            for mode, config in MODES.items():
+                samples = [first_request(tmp, config, role, url) for _ in range(repeat)]
+                startups[mode] += [startup for startup, _, _ in samples]
+                firsts.append(statistics.median(first for _, first, _ in samples))
+                warm += [second for _, _, second in samples]
+            print(
+                f"{template:<30} "
+                + " ".join(f"{first:>9.1f}" for first in firsts)
+                + f" {statistics.median(warm):>9.1f}"
+            )
+        print(
+            f"{'create_app':<30} "
+            + " ".join(f"{statistics.median(startups[mode]):>9.1f}" for mode in MODES)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.repeat)
@@ -0,0 +1,177 @@
+"""
+Measures ticket assignment throughput with one commit versus two per change.
+
+Several worker processes share one database file and keep reassigning random
+tickets for a fixed time. The "two commits" flow commits the assignment and
+then its audit comment, as the assignment views used to. The "one commit"
+flow goes through `update_ticket` in app/tickets.py.
+
+Usage:
+    python -m benchmarks.bench_ticket_writes --workers 4 --duration 5
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.tickets import update_ticket
+
+STAFF = 10
+
+
+def make_app(path, tuned):
+    return create_app(
+        {
+            "SECRET_KEY": "benchmark-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "SQLITE_TUNING": tuned,
+        }
+    )
+
+
+def build_database(path, tuned, tickets):
+    """Creates a database file with `tickets` tickets and a few support users."""
+    app = make_app(path, tuned)
+    with app.app_context():
+        db.create_all()
+        for i in range(STAFF):
+            user = User(
+                name=f"Agent {i}", email=f"agent{i}@bench.local", role="support"
+            )
+            user.password_hash = "unused"
+            db.session.add(user)
+        db.session.commit()
+
+        base = datetime(2024, 1, 1)
+        db.session.execute(
+            Ticket.__table__.insert(),
+            [
+                {
+                    "title": f"Ticket {i}",
+                    "description": "Benchmark ticket description",
+                    "status": "open",
+                    "priority": "medium",
+                    "created_at": base + timedelta(seconds=i),
+                    "updated_at": base + timedelta(seconds=i),
+                    "user_id": 1,
+                }
+                for i in range(tickets)
+            ],
+        )
+        db.session.commit()
+        db.engine.dispose()
+
+
+def assign_two_commits(ticket, assignee, author):
+    ticket.assigned_to = assignee.id
+    db.session.commit()
+    db.session.add(
+        Comment(
+            comment_text=f"Ticket assigned to {assignee.name}.",
+            ticket_id=ticket.id,
+            user_id=author.id,
+        )
+    )
+    db.session.commit()
+
+
+def assign_one_commit(ticket, assignee, author):
+    with update_ticket(ticket, author) as update:
+        update.assign(assignee, "Ticket assigned to {name}.")
+
+
+FLOWS = {"two commits": assign_two_commits, "one commit": assign_one_commit}
+
+
+def worker(path, tuned, flow, tickets, duration, seed):
+    """Reassigns random tickets and returns (writes, errors, latencies)."""
+    rng = random.Random(seed)
+    assign = FLOWS[flow]
+    app = make_app(path, tuned)
+    writes = errors = 0
+    latencies = []
+    with app.app_context():
+        staff = User.query.all()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                ticket = db.session.get(Ticket, rng.randint(1, tickets))
+                assignee = rng.choice(
+                    [user for user in staff if user.id != ticket.assigned_to]
+                )
+                assign(ticket, assignee, staff[0])
+                writes += 1
+            except OperationalError:
+                # Typically "database is locked" once busy waiting gives up
+                db.session.rollback()
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+        db.session.remove()
+        db.engine.dispose()
+    return writes, errors, latencies
+
+
+def run_flow(flow, tuned, workers, tickets, duration):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        build_database(path, tuned, tickets)
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(
+                worker,
+                [
+                    (path, tuned, flow, tickets, duration, seed)
+                    for seed in range(workers)
+                ],
+            )
+
+    writes = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    latencies = sorted(ms for r in results for ms in r[2])
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else float("nan")
+    median = statistics.median(latencies) if latencies else float("nan")
+    return {
+        "writes_per_sec": writes / duration,
+        "writes": writes,
+        "errors": errors,
+        "p50_ms": median,
+        "p95_ms": p95,
+    }
+
+
+def run(workers, tickets, duration, tuned):
+    print(
+        f"{'flow':>12} {'writes/s':>9} {'writes':>8} {'errors':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8}"
+    )
+    for flow in FLOWS:
+        stats = run_flow(flow, tuned, workers, tickets, duration)
+        print(
+            f"{flow:>12} {stats['writes_per_sec']:>9.1f} {stats['writes']:>8} "
+            f"{stats['errors']:>7} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--tickets", type=int, default=10_000)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument(
+        "--default-sqlite",
+        action="store_true",
+        help="Use SQLite's default settings instead of the tuning profile.",
+    )
+    args = parser.parse_args()
+    run(args.workers, args.tickets, args.duration, not args.default_sqlite)
@@ -5,3 +5,18 @@ SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///helpdesk.db')
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 DEBUG = True
+
+# Connection pragmas for SQLite, see app/database.py. Set SQLITE_TUNING = False
+# to use SQLite's defaults, or override single values with SQLITE_PRAGMAS.
+SQLITE_TUNING = True
+
+# Read-only pages are served from this replica when it is set, see
+# app/database.py. For a local stand-in, point it at a second SQLite file and
+# run `flask replicate` to copy the primary over it every second.
+if os.getenv('DATABASE_REPLICA_URL'):
+    SQLALCHEMY_BINDS = {'replica': os.getenv('DATABASE_REPLICA_URL')}
+    REPLICA_STICKY_SECONDS = 10
+
+# Password hashing runs on this many processes, see app/passwords.py. 0 hashes
+# in the request thread; servers should set it to their number of CPUs.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '0'))
@@ -0,0 +1,28 @@
+"""Added full-text search index
+
+Revision ID: 9b7e3d5a1c20
+Revises: 4f1a8c2d9e73
+Create Date: 2026-10-17 23:02:17.284690
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.search import drop_search_index, install_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '9b7e3d5a1c20'
+down_revision = '4f1a8c2d9e73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite gets an FTS5 table kept in sync by triggers and filled from the
+    # existing rows, PostgreSQL gets GIN indexes on tsvector expressions
+    install_search_index(op.get_bind())
+
+
+def downgrade():
+    drop_search_index(op.get_bind())
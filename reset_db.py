@@ -1,9 +1,11 @@
+import argparse
 import os
 from sqlite3 import IntegrityError
 
 import logging
 from app import create_app, db
 from app.models import User, Ticket, Comment
+from app.seed import SCALES, seed_database
 from datetime import datetime, timedelta
 import random
 
@@ -291,15 +293,34 @@ def populate_database():
             logging.error(f"An unexpected error occurred: {e}")
 
 
-def reset_database():
+def populate_synthetic_data(scale, seed):
+    """Adds a synthetic load-test dataset, the same as `flask seed --scale`."""
+    with app.app_context():
+        print(f"Generating the {scale} synthetic dataset (seed {seed})...")
+        timings = seed_database(*SCALES[scale], seed=seed)
+        for name, seconds in timings.items():
+            print(f"  {name}: {seconds:.1f}s")
+
+
+def reset_database(scale=None, seed=42):
     """Resets the database by performing all necessary steps."""
     drop_database()
     initialise_database()
     create_migration()
     apply_migration()
     populate_database()
+    if scale:
+        populate_synthetic_data(scale, seed)
     print("Database reset complete.")
 
 
 if __name__ == "__main__":
-    reset_database()
+    parser = argparse.ArgumentParser(description="Reset and populate the database.")
+    parser.add_argument(
+        "--scale",
+        choices=list(SCALES),
+        help="Also add a synthetic dataset of this size for load testing.",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    args = parser.parse_args()
+    reset_database(args.scale, args.seed)
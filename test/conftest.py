@@ -1,10 +1,32 @@
 import pytest
+from flask import Flask
+from werkzeug.datastructures import ImmutableDict
 from app import create_app, db
 from app.models import User
 from werkzeug.security import generate_password_hash
 from test.test_config import TestConfig  # Import your test configuration
 
 
+@pytest.fixture(scope="session", autouse=True)
+def test_defaults(tmp_path_factory):
+    """
+    Defaults for every app the tests create, before their own config.
+
+    The slow query log goes to a temporary directory rather than the
+    instance folder of the checkout, and templates are not compiled into a
+    bytecode cache unless a test turns it on.
+    """
+    directory = tmp_path_factory.mktemp("instance")
+    defaults = {
+        "SLOW_QUERY_LOG": str(directory / "slow_queries.log"),
+        "TEMPLATE_BYTECODE_CACHE": False,
+    }
+    original = Flask.default_config
+    Flask.default_config = ImmutableDict({**original, **defaults})
+    yield directory
+    Flask.default_config = original
+
+
 @pytest.fixture
 def app():
     """
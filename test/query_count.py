@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import db
+
+
+class QueryCounter:
+    """
+    Records every SQL statement executed on the app's engine while active.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+
+@contextmanager
+def count_queries():
+    """
+    Counts the SQL statements executed inside the block.
+
+    Must be used inside an application context.
+    """
+    counter = QueryCounter()
+    event.listen(db.engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(db.engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_query_count(expected):
+    """
+    Fails if the block does not execute exactly `expected` SQL statements.
+    """
+    with count_queries() as counter:
+        yield counter
+    assert (
+        counter.count == expected
+    ), f"Expected {expected} queries, got {counter.count}:\n" + "\n".join(
+        counter.statements
+    )
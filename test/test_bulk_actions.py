@@ -0,0 +1,163 @@
+import pytest
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.tickets import BULK_LIMIT, BulkActionError, bulk_update_tickets
+from test.query_count import count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app with staff users and a few tickets."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        for role in ["admin", "support", "regular"]:
+            user = User(email=f"{role}@example.com", name=f"{role} user", role=role)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+        for i in range(4):
+            db.session.add(
+                Ticket(
+                    title=f"Ticket {i}",
+                    description="Bulk action ticket",
+                    status="open",
+                    priority="low" if i else "high",
+                    user_id=3,
+                )
+            )
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def user(role):
+    return User.query.filter_by(role=role).one()
+
+
+def tickets():
+    db.session.expire_all()
+    return Ticket.query.order_by(Ticket.id).all()
+
+
+def audit_comments():
+    return [(c.ticket_id, c.comment_text) for c in Comment.query.order_by(Comment.id)]
+
+
+def test_set_priority_in_one_statement(app):
+    with count_queries() as queries:
+        result = bulk_update_tickets(
+            user("support"), ["1", "2", "3", "99"], "priority", "high"
+        )
+
+    assert result.updated == [2, 3]
+    assert result.skipped == {1: "unchanged", 99: "not found"}
+    assert [t.priority for t in tickets()] == ["high", "high", "high", "low"]
+    assert audit_comments() == [
+        (2, "Priority changed to high."),
+        (3, "Priority changed to high."),
+    ]
+    updates = [s for s in queries.statements if s.startswith("UPDATE ticket")]
+    assert len(updates) == 1 and "IN" in updates[0]
+
+
+def test_assign_uses_assignment_rules(app):
+    support = user("support")
+    result = bulk_update_tickets(user("admin"), ["1", "2"], "assign", str(support.id))
+
+    assert result.updated == [1, 2]
+    assert [t.assigned_to for t in tickets()] == [support.id, support.id, None, None]
+    assert audit_comments() == [
+        (1, "Ticket assigned to support user."),
+        (2, "Ticket assigned to support user."),
+    ]
+
+    with pytest.raises(BulkActionError):
+        bulk_update_tickets(user("admin"), ["3"], "assign", str(user("regular").id))
+
+
+def test_support_cannot_assign_or_delete(app):
+    result = bulk_update_tickets(user("support"), ["1", "2"], "delete")
+    assert result.updated == []
+    assert result.skipped == {1: "not permitted", 2: "not permitted"}
+    assert len(tickets()) == 4
+
+
+def test_delete_keeps_comments_detached(app):
+    db.session.add(Comment(comment_text="Keep me", ticket_id=1, user_id=1))
+    db.session.commit()
+
+    result = bulk_update_tickets(user("admin"), ["1", "3"], "delete")
+
+    assert result.updated == [1, 3]
+    assert [t.id for t in tickets()] == [2, 4]
+    assert audit_comments() == [(None, "Keep me")]
+
+
+def test_invalid_requests_are_rejected(app):
+    admin = user("admin")
+    with pytest.raises(BulkActionError):
+        bulk_update_tickets(admin, ["1"], "archive")
+    with pytest.raises(BulkActionError):
+        bulk_update_tickets(admin, ["1"], "status", "resolved")
+    with pytest.raises(BulkActionError):
+        bulk_update_tickets(admin, [], "status", "closed")
+    with pytest.raises(BulkActionError):
+        bulk_update_tickets(
+            admin, [str(i) for i in range(BULK_LIMIT + 1)], "status", "closed"
+        )
+
+
+def test_bulk_endpoint(app):
+    client = app.test_client()
+    client.post("/login", data={"email": "admin@example.com", "password": PASSWORD})
+
+    with app.app_context():
+        page = client.get("/unassigned_tickets").get_data(as_text=True)
+    assert 'name="ticket_ids"' in page
+
+    with app.app_context():
+        response = client.post(
+            "/tickets/bulk",
+            data={
+                "ticket_ids": ["2", "3"],
+                "action": "status",
+                "value": "closed",
+                "next": "/unassigned_tickets",
+            },
+            follow_redirects=True,
+        )
+    assert response.request.path == "/unassigned_tickets"
+    assert b"Updated 2 tickets." in response.data
+    assert [t.status for t in tickets()] == ["open", "closed", "closed", "open"]
+
+
+def test_bulk_endpoint_ignores_external_next(app):
+    client = app.test_client()
+    client.post("/login", data={"email": "regular@example.com", "password": PASSWORD})
+
+    with app.app_context():
+        response = client.post(
+            "/tickets/bulk",
+            data={
+                "ticket_ids": ["1"],
+                "action": "status",
+                "value": "closed",
+                "next": "https://example.org/",
+            },
+        )
+    assert response.headers["Location"] == "/all_tickets"
+    assert tickets()[0].status == "open"
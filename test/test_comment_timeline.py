@@ -0,0 +1,139 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from test.query_count import count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+PER_PAGE = 3
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app with a ticket and a small comment page size."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "COMMENTS_PER_PAGE": PER_PAGE,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="admin@example.com", name="Admin", role="admin")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        db.session.add(
+            Ticket(
+                title="Busy ticket",
+                description="A ticket with a long history",
+                status="open",
+                priority="low",
+                user_id=user.id,
+            )
+        )
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post("/login", data={"email": "admin@example.com", "password": PASSWORD})
+    return client
+
+
+def add_comments(count, distinct_users=False):
+    """Adds `count` comments, a minute apart, numbered from oldest to newest."""
+    base = datetime(2024, 1, 1)
+    start = Comment.query.count()
+    for i in range(start, start + count):
+        user_id = 1
+        if distinct_users:
+            user = User(
+                email=f"commenter{i}@example.com",
+                name=f"Commenter {i}",
+                role="support",
+                password_hash="unused",
+            )
+            db.session.add(user)
+            db.session.flush()
+            user_id = user.id
+        db.session.add(
+            Comment(
+                comment_text=f"Comment {i}",
+                ticket_id=1,
+                user_id=user_id,
+                created_at=base + timedelta(minutes=i),
+            )
+        )
+    db.session.commit()
+
+
+def shown_comments(html):
+    return [int(n) for n in re.findall(r"Comment (\d+)", html)]
+
+
+def older_link(html):
+    match = re.search(r'href="([^"]+)"\s+class="btn btn-link btn-sm" data-older', html)
+    return match.group(1).replace("&amp;", "&") if match else None
+
+
+@pytest.mark.parametrize("url", ["/ticket/1", "/ticket/1/readonly"])
+def test_ticket_pages_show_newest_comments_oldest_first(app, client, url):
+    add_comments(7)
+
+    html = client.get(url).get_data(as_text=True)
+    assert shown_comments(html) == [4, 5, 6]
+    assert older_link(html).startswith("/ticket/1/comments?after=")
+
+
+def test_older_pages_come_from_fragment_endpoint(app, client):
+    add_comments(7)
+    link = older_link(client.get("/ticket/1/readonly").get_data(as_text=True))
+
+    pages = []
+    while link:
+        response = client.get(link)
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        assert "<html" not in html
+        pages.append(shown_comments(html))
+        link = older_link(html)
+
+    assert pages == [[1, 2, 3], [0]]
+
+
+def test_ticket_without_comments_has_no_older_link(app, client):
+    html = client.get("/ticket/1/readonly").get_data(as_text=True)
+    assert shown_comments(html) == []
+    assert older_link(html) is None
+
+
+def test_fragment_for_missing_ticket_is_not_found(app, client):
+    assert client.get("/ticket/99/comments").status_code == 404
+
+
+def test_commenters_are_loaded_with_the_comments(app, client):
+    add_comments(2, distinct_users=True)
+    # The first request also loads per-process state, like the open ticket count
+    with app.app_context():
+        client.get("/ticket/1/readonly")
+    with app.app_context(), count_queries() as few:
+        client.get("/ticket/1/readonly")
+
+    add_comments(PER_PAGE, distinct_users=True)
+    with app.app_context(), count_queries() as many:
+        client.get("/ticket/1/readonly")
+
+    assert many.count == few.count
@@ -0,0 +1,160 @@
+import pytest
+from sqlalchemy import update
+
+from app import create_app, db
+from app.counters import get_open_ticket_counter
+from app.models import Ticket, User
+from test.query_count import count_queries
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app instance for testing."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="testuser@example.com", name="Test User", role="admin")
+        user.set_password("gyjvo9-kewvoh-Vurmuj!")
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def add_ticket(status="open"):
+    ticket = Ticket(
+        title="Counter Ticket",
+        description="A counted test ticket",
+        status=status,
+        priority="low",
+        user_id=1,
+    )
+    db.session.add(ticket)
+    db.session.commit()
+    return ticket
+
+
+def set_status(ticket_id, status):
+    """Loads the ticket and changes its status, as the views do."""
+    ticket = Ticket.query.get_or_404(ticket_id)
+    ticket.status = status
+    db.session.commit()
+
+
+def assert_cached_count(expected):
+    """The counter returns `expected` without touching the database."""
+    with count_queries() as counter:
+        assert get_open_ticket_counter().get() == expected
+    assert counter.count == 0
+
+
+def test_counter_follows_inserts_updates_and_deletes(app):
+    counter = get_open_ticket_counter()
+    assert counter.get() == 0
+
+    ticket_id = add_ticket().id
+    add_ticket("closed")
+    assert_cached_count(1)
+
+    set_status(ticket_id, "in-progress")
+    assert_cached_count(1)
+
+    set_status(ticket_id, "closed")
+    assert_cached_count(0)
+
+    set_status(ticket_id, "open")
+    assert_cached_count(1)
+
+    db.session.delete(Ticket.query.get_or_404(ticket_id))
+    db.session.commit()
+    assert_cached_count(0)
+
+
+def test_status_change_on_expired_ticket_forces_a_recount(app):
+    ticket = add_ticket()
+    assert get_open_ticket_counter().get() == 1
+
+    # The commit expired the ticket, so its previous status is unknown
+    ticket.status = "closed"
+    db.session.commit()
+
+    assert get_open_ticket_counter().get() == 0
+
+
+def test_rolled_back_changes_are_not_counted(app):
+    assert get_open_ticket_counter().get() == 0
+
+    db.session.add(
+        Ticket(
+            title="Rolled back",
+            description="Never saved",
+            status="open",
+            priority="low",
+        )
+    )
+    db.session.flush()
+    db.session.rollback()
+
+    assert_cached_count(0)
+
+
+def test_bulk_update_forces_a_recount(app):
+    add_ticket()
+    add_ticket()
+    assert get_open_ticket_counter().get() == 2
+
+    db.session.execute(update(Ticket).values(status="closed"))
+    db.session.commit()
+
+    assert get_open_ticket_counter().get() == 0
+
+
+def test_counter_reconciles_after_interval(app):
+    counter = get_open_ticket_counter()
+    counter.reconcile_interval = 0
+    add_ticket()
+
+    # Simulate a write from another process that this one never saw
+    db.session.execute(Ticket.__table__.delete())
+    with db.engine.begin() as conn:
+        conn.execute(
+            Ticket.__table__.insert(),
+            [
+                {
+                    "title": "Elsewhere",
+                    "description": "x",
+                    "status": "open",
+                    "priority": "low",
+                }
+            ]
+            * 3,
+        )
+
+    assert counter.get() == 3
+
+
+def test_badge_is_counted_at_most_once_per_request(app, client):
+    client.post(
+        "/login",
+        data={"email": "testuser@example.com", "password": "gyjvo9-kewvoh-Vurmuj!"},
+    )
+    get_open_ticket_counter().invalidate()
+
+    with count_queries() as counter:
+        response = client.get("/all_tickets")
+    assert response.status_code == 200
+    assert sum("count(" in s for s in counter.statements) == 1
+
+    with count_queries() as counter:
+        client.get("/all_tickets")
+    assert not any("count(" in s for s in counter.statements)
@@ -0,0 +1,62 @@
+import pytest
+
+from app import create_app, db
+from app.database import SQLITE_PRAGMAS
+
+
+def make_app(uri, **config):
+    return create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": uri,
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            **config,
+        }
+    )
+
+
+def pragma(name):
+    with db.engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "tuning.db"
+
+
+def test_connections_use_tuning_profile(db_path):
+    app = make_app(f"sqlite:///{db_path}")
+    with app.app_context():
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("cache_size") == SQLITE_PRAGMAS["cache_size"]
+        assert pragma("temp_store") == 2  # MEMORY
+        assert pragma("busy_timeout") == SQLITE_PRAGMAS["busy_timeout"]
+        db.engine.dispose()
+
+
+def test_pragmas_can_be_overridden(db_path):
+    app = make_app(f"sqlite:///{db_path}", SQLITE_PRAGMAS={"busy_timeout": 250})
+    with app.app_context():
+        assert pragma("busy_timeout") == 250
+        assert pragma("journal_mode") == "wal"
+        db.engine.dispose()
+
+
+def test_tuning_can_be_disabled(db_path):
+    app = make_app(f"sqlite:///{db_path}", SQLITE_TUNING=False)
+    with app.app_context():
+        assert pragma("journal_mode") == "delete"
+        assert pragma("synchronous") == 2  # FULL
+        db.engine.dispose()
+
+
+def test_in_memory_database_still_works():
+    app = make_app("sqlite:///:memory:")
+    with app.app_context():
+        db.create_all()
+        assert pragma("journal_mode") == "memory"
+        assert pragma("temp_store") == 2
@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app import create_app, db
+from app.export import parse_date_range, stream_csv, ticket_export_query
+from app.models import Comment, Ticket, User
+from test.query_count import count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app with tickets spread over a few months."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        for role in ["admin", "support", "regular"]:
+            user = User(email=f"{role}@example.com", name=f"{role} user", role=role)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+        for i, (status, owner) in enumerate(
+            [("open", 3), ("closed", 3), ("closed", 1), ("in-progress", 1)]
+        ):
+            when = datetime(2024, i + 1, 15, 12)
+            db.session.add(
+                Ticket(
+                    title=f"=Ticket {i}" if i == 3 else f"Ticket {i}",
+                    description=f"Description {i}",
+                    status=status,
+                    priority="low",
+                    user_id=owner,
+                    assigned_to=2 if status == "closed" and owner == 3 else None,
+                    created_at=when,
+                    updated_at=when,
+                )
+            )
+        db.session.commit()
+        db.session.add_all(
+            [
+                Comment(comment_text="On a regular ticket", ticket_id=1, user_id=2),
+                Comment(comment_text="On an admin ticket", ticket_id=3, user_id=1),
+            ]
+        )
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def export(app, role, url):
+    client = app.test_client()
+    with app.app_context():
+        client.post(
+            "/login", data={"email": f"{role}@example.com", "password": PASSWORD}
+        )
+    with app.app_context():
+        return client.get(url)
+
+
+def csv_rows(response):
+    return list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+
+def test_csv_export_streams_all_tickets(app):
+    response = export(app, "admin", "/export/tickets.csv")
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    assert "filename=tickets.csv" in response.headers["Content-Disposition"]
+    rows = csv_rows(response)
+    assert [row["id"] for row in rows] == ["1", "2", "3", "4"]
+    assert rows[1]["assignee_email"] == "support@example.com"
+    assert rows[0]["created_at"] == "2024-01-15T12:00:00"
+    # Cells that spreadsheets would evaluate are escaped
+    assert rows[3]["title"] == "'=Ticket 3"
+
+
+def test_ndjson_export_follows_role_filters(app):
+    response = export(app, "regular", "/export/tickets.ndjson")
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    tickets = [json.loads(line) for line in lines]
+    assert [t["id"] for t in tickets] == [1, 2]
+    assert tickets[0]["creator"] == "regular user"
+
+    closed = export(app, "support", "/export/tickets.ndjson?scope=closed")
+    assert [
+        json.loads(line)["id"] for line in closed.get_data(as_text=True).splitlines()
+    ] == [2]
+
+
+def test_date_ranges(app):
+    response = export(
+        app,
+        "admin",
+        "/export/tickets.csv?created_from=2024-02-01&created_to=2024-03-15",
+    )
+    assert [row["id"] for row in csv_rows(response)] == ["2", "3"]
+
+    response = export(app, "admin", "/export/tickets.csv?updated_from=2024-04-01")
+    assert [row["id"] for row in csv_rows(response)] == ["4"]
+
+    assert export(app, "admin", "/export/tickets.csv?created_to=May").status_code == 400
+    assert export(app, "admin", "/export/tickets.csv?scope=mine").status_code == 400
+
+
+def test_comment_export_only_includes_visible_tickets(app):
+    response = export(app, "regular", "/export/comments.csv")
+    rows = csv_rows(response)
+    assert [(row["ticket_id"], row["author"]) for row in rows] == [
+        ("1", "support user")
+    ]
+
+    rows = csv_rows(export(app, "admin", "/export/comments.csv"))
+    assert len(rows) == 2
+
+
+def test_empty_export_has_header_only(app):
+    response = export(app, "admin", "/export/tickets.csv?created_from=2030-01-01")
+    assert response.get_data(as_text=True).strip() == (
+        "id,title,description,status,priority,created_at,updated_at,"
+        "creator,creator_email,assignee,assignee_email"
+    )
+
+
+def test_rows_are_fetched_in_batches(app):
+    admin = User.query.filter_by(role="admin").one()
+    query = ticket_export_query(admin)
+
+    with count_queries() as queries:
+        chunks = list(stream_csv(query, ["id"] * 11, batch_size=3))
+
+    # One statement, read three rows at a time, written out per batch
+    assert queries.count == 1
+    assert len(chunks) == 2
+    assert chunks[0].count("\n") == 4
+
+
+def test_parse_date_range_includes_whole_end_day():
+    assert parse_date_range("2024-01-01", "2024-01-31") == (
+        datetime(2024, 1, 1),
+        datetime(2024, 2, 1),
+    )
+    assert parse_date_range(None, "2024-01-31T08:00") == (
+        None,
+        datetime(2024, 1, 31, 8),
+    )
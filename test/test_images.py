@@ -0,0 +1,290 @@
+import io
+import os
+import re
+import time
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image
+from sqlalchemy import event
+from werkzeug.datastructures import FileStorage
+
+from app import create_app, db
+from app.images import (
+    AVATAR_PREFIX,
+    AVATAR_SIZES,
+    ImagePipeline,
+    avatar_sources,
+    get_image_pipeline,
+)
+from app.models import User
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+PROFILE_JPG = os.path.join(os.path.dirname(__file__), "test_files", "profile.jpg")
+
+
+@pytest.fixture
+def upload_folder(tmp_path, monkeypatch):
+    """Redirects profile image uploads to a temporary folder."""
+    monkeypatch.setattr("app.images.UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr("app.images.ORIGINALS_FOLDER", str(tmp_path / "originals"))
+    monkeypatch.setattr("app.images.AVATAR_FOLDER", str(tmp_path / "avatars"))
+    return tmp_path
+
+
+def make_app(uri, workers):
+    return create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": uri,
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "IMAGE_PROCESSING_WORKERS": workers,
+        }
+    )
+
+
+@pytest.fixture
+def app(upload_folder):
+    """Fixture to create a Flask app that processes images inline."""
+    app = make_app("sqlite:///:memory:", workers=0)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def profile_upload():
+    return FileStorage(
+        stream=open(PROFILE_JPG, "rb"), filename="profile.jpg", name="profile_image"
+    )
+
+
+def test_register_stores_original_and_avatar_variants(app, client, upload_folder):
+    response = client.post(
+        "/register",
+        data={
+            "name": "Image User",
+            "email": "image@example.com",
+            "password": PASSWORD,
+            "role": "regular",
+            "profile_image": profile_upload(),
+        },
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 302
+
+    user = User.query.filter_by(email="image@example.com").first()
+    assert user.profile_image.startswith(AVATAR_PREFIX)
+    key = user.profile_image[len(AVATAR_PREFIX) :]
+    for size in AVATAR_SIZES:
+        for ext in ("jpg", "webp"):
+            with Image.open(upload_folder / "avatars" / f"{key}-{size}.{ext}") as img:
+                assert img.size == (size, size)
+    # The original is only kept until its variants are built
+    assert os.listdir(upload_folder / "originals") == []
+
+
+def test_same_image_reuses_existing_variants(app, upload_folder):
+    first = User(name="First", email="first@example.com", role="regular")
+    second = User(name="Second", email="second@example.com", role="regular")
+    first.password_hash = second.password_hash = "unused"
+    db.session.add_all([first, second])
+    db.session.commit()
+
+    pipeline = get_image_pipeline()
+    first_image = pipeline.submit(first.id, profile_upload())
+    built = os.stat(next((upload_folder / "avatars").iterdir())).st_mtime_ns
+    second_image = pipeline.submit(second.id, profile_upload())
+
+    assert first_image == second_image
+    assert first_image.startswith(AVATAR_PREFIX)
+    assert os.stat(next((upload_folder / "avatars").iterdir())).st_mtime_ns == built
+
+
+def test_avatar_sources_pick_smallest_fitting_variant(app):
+    with app.test_request_context():
+        sources = avatar_sources("avatars/abc", 40)
+        assert sources["src"].endswith("/avatars/abc-64.jpg")
+        assert sources["webp_srcset"].endswith("/avatars/abc-100.webp 2x")
+
+        assert avatar_sources("avatars/abc", 16)["src"].endswith("abc-32.jpg")
+        assert avatar_sources(None, 40) == {
+            "src": "/static/uploads/profile_images/default.jpg"
+        }
+
+
+def test_avatar_variants_are_cached_immutably(app, client):
+    avatar_folder = os.path.join(app.static_folder, "uploads/profile_images/avatars")
+    os.makedirs(avatar_folder, exist_ok=True)
+    path = os.path.join(avatar_folder, "test-cache-header-32.jpg")
+    Image.new("RGB", (32, 32)).save(path)
+    try:
+        response = client.get(
+            "/static/uploads/profile_images/avatars/test-cache-header-32.jpg"
+        )
+        assert response.status_code == 200
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 365 * 24 * 60 * 60
+        response.close()
+
+        response = client.get("/static/uploads/profile_images/default.jpg")
+        assert not response.cache_control.immutable
+        response.close()
+    finally:
+        os.remove(path)
+
+
+def test_full_queue_falls_back_to_inline_processing(app, upload_folder):
+    user = User(name="Queue User", email="queue@example.com", role="regular")
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+
+    pipeline = ImagePipeline(app, max_workers=1, max_pending=1)
+    pipeline._slots.acquire()  # Occupy the only queue slot
+
+    assert pipeline.submit(user.id, profile_upload()).startswith(AVATAR_PREFIX)
+    assert pipeline._executor is None
+
+
+def test_process_pool_updates_user_when_done(tmp_path, upload_folder):
+    app = make_app(f"sqlite:///{tmp_path / 'images.db'}", workers=1)
+    with app.app_context():
+        db.create_all()
+        user = User(name="Pool User", email="pool@example.com", role="regular")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+        pipeline = get_image_pipeline()
+        try:
+            future = pipeline.submit(user_id, profile_upload())
+            assert future is not None
+            profile_image = future.result(timeout=30)
+            assert profile_image.startswith(AVATAR_PREFIX)
+
+            # The column is updated by the completion callback
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                db.session.expire_all()
+                if db.session.get(User, user_id).profile_image:
+                    break
+                time.sleep(0.05)
+            assert db.session.get(User, user_id).profile_image == profile_image
+        finally:
+            pipeline.shutdown()
+            db.session.remove()
+
+
+class HeldExecutor:
+    """Stands in for the process pool, finishing jobs only when told to."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        self.futures.append(Future())
+        return self.futures[-1]
+
+
+def colour_upload(colour):
+    data = io.BytesIO()
+    Image.new("RGB", (8, 8), colour).save(data, "PNG")
+    data.seek(0)
+    return FileStorage(stream=data, filename="avatar.png", name="profile_image")
+
+
+def profile_image_of(user_id):
+    db.session.expire_all()
+    return db.session.get(User, user_id).profile_image
+
+
+def test_older_upload_finishing_last_does_not_win(app):
+    user = User(name="Race User", email="race@example.com", role="regular")
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+
+    pipeline = ImagePipeline(app, max_workers=1)
+    executor = pipeline._executor = HeldExecutor()
+    pipeline.submit(user.id, colour_upload("red"), user.profile_image)
+    pipeline.submit(user.id, colour_upload("blue"), user.profile_image)
+    older, newer = executor.futures
+
+    newer.set_result(AVATAR_PREFIX + "blue")
+    assert profile_image_of(user.id) == AVATAR_PREFIX + "blue"
+    older.set_result(AVATAR_PREFIX + "red")
+    assert profile_image_of(user.id) == AVATAR_PREFIX + "blue"
+    assert pipeline._latest == {}
+
+
+def test_finished_job_keeps_an_image_saved_since(app):
+    user = User(name="Race User", email="race@example.com", role="regular")
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+
+    pipeline = ImagePipeline(app, max_workers=1)
+    executor = pipeline._executor = HeldExecutor()
+    pipeline.submit(user.id, colour_upload("red"), user.profile_image)
+    # Another worker process saves a newer image in the meantime
+    user.profile_image = AVATAR_PREFIX + "blue"
+    db.session.commit()
+
+    executor.futures[0].set_result(AVATAR_PREFIX + "red")
+    assert profile_image_of(user.id) == AVATAR_PREFIX + "blue"
+
+
+def test_profile_update_commits_image_with_other_changes(app, client):
+    user = User(name="Old Name", email="profile@example.com", role="regular")
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+    client.post("/login", data={"email": "profile@example.com", "password": PASSWORD})
+
+    commits = []
+
+    def record_commit(session):
+        commits.append(session)
+
+    event.listen(db.session, "after_commit", record_commit)
+    try:
+        response = client.post(
+            "/update_profile",
+            data={
+                "name": "New Name",
+                "email": "profile@example.com",
+                "profile_image": profile_upload(),
+            },
+            content_type="multipart/form-data",
+        )
+    finally:
+        event.remove(db.session, "after_commit", record_commit)
+    assert response.status_code == 302
+    assert len(commits) == 1
+
+    db.session.expire_all()
+    user = db.session.get(User, user.id)
+    assert user.name == "New Name"
+    assert user.profile_image.startswith(AVATAR_PREFIX)
+
+
+def test_navbar_and_profile_page_get_100px_avatars(app, client):
+    user = User(name="Avatar User", email="avatar@example.com", role="regular")
+    user.set_password(PASSWORD)
+    user.profile_image = AVATAR_PREFIX + "abc"
+    db.session.add(user)
+    db.session.commit()
+    client.post("/login", data={"email": "avatar@example.com", "password": PASSWORD})
+
+    page = client.get("/update_profile").text
+    for slot in ("logo-circle", "profile-circle"):
+        img = re.search(rf'<img [^>]*class="{slot}"[^>]*>', page).group(0)
+        assert 'src="/static/uploads/profile_images/avatars/abc-100.jpg"' in img
+        assert "abc-100.jpg 1x, " in img
+        assert "abc-200.jpg 2x" in img
@@ -0,0 +1,253 @@
+import json
+
+import pytest
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+USERS_CSV = """name,email,role,password_hash
+Old Admin,Admin@Old.Example,admin,pbkdf2:sha256:1$salt$hash
+Old Agent,agent@old.example,support,
+Old Customer,customer@old.example,,
+"""
+
+TICKETS = [
+    {
+        "id": 10 + i,
+        "title": f"Imported ticket {i}",
+        "description": "Migrated from the old helpdesk",
+        "status": "closed" if i % 2 else "open",
+        "priority": "medium",
+        "created_at": f"2023-0{i + 1}-01T09:00:00",
+        "creator_email": "customer@old.example",
+        "assignee_email": "agent@old.example" if i % 2 else None,
+    }
+    for i in range(5)
+]
+
+COMMENTS_CSV = """ticket_id,author_email,created_at,comment_text
+10,agent@old.example,2023-01-02T10:00:00,Looking into it
+11,admin@old.example,2023-02-02T10:00:00,Closed as fixed
+12,nobody@old.example,,From a deleted account
+"""
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Fixture to create a Flask app with an empty database."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'import.db'}",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def files(tmp_path):
+    users = tmp_path / "users.csv"
+    users.write_text(USERS_CSV)
+    tickets = tmp_path / "tickets.ndjson"
+    tickets.write_text("".join(json.dumps(t) + "\n" for t in TICKETS))
+    comments = tmp_path / "comments.csv"
+    comments.write_text(COMMENTS_CSV)
+    return users, tickets, comments
+
+
+def run_import(app, tmp_path, *args):
+    return app.test_cli_runner().invoke(
+        args=["import", "--state-file", str(tmp_path / "state.json"), *args]
+    )
+
+
+def test_import_resolves_users_by_email(app, tmp_path, files):
+    users, tickets, comments = files
+    result = run_import(
+        app,
+        tmp_path,
+        "--users",
+        str(users),
+        "--tickets",
+        str(tickets),
+        "--comments",
+        str(comments),
+        "--chunk-size",
+        "2",
+    )
+    assert result.exit_code == 0, result.output
+    assert "tickets: 5 records, 5 inserted" in result.output
+    assert "rows/s" in result.output
+    assert "1 emails matched no user" in result.output
+
+    agent = User.query.filter_by(email="agent@old.example").one()
+    assert agent.role == "support"
+    assert not agent.check_password("anything")
+    assert User.query.filter_by(email="customer@old.example").one().role == "regular"
+
+    ticket = db.session.get(Ticket, 11)
+    assert ticket.title == "Imported ticket 1"
+    assert ticket.creator.email == "customer@old.example"
+    assert ticket.assignee == agent
+    assert ticket.updated_at == ticket.created_at
+
+    comments = Comment.query.order_by(Comment.id).all()
+    assert [(c.ticket_id, c.commenter and c.commenter.name) for c in comments] == [
+        (10, "Old Agent"),
+        (11, "Old Admin"),
+        (12, None),
+    ]
+
+
+def test_failed_import_resumes_where_it_stopped(app, tmp_path, files):
+    users, tickets, _ = files
+    bad = [dict(t) for t in TICKETS]
+    bad[3]["created_at"] = "last spring"
+    tickets.write_text("".join(json.dumps(t) + "\n" for t in bad))
+
+    result = run_import(
+        app,
+        tmp_path,
+        "--users",
+        str(users),
+        "--tickets",
+        str(tickets),
+        "--chunk-size",
+        "2",
+    )
+    assert result.exit_code == 1
+    assert "record 4: created_at is not an ISO 8601 date" in result.output
+    assert Ticket.query.count() == 2
+
+    tickets.write_text("".join(json.dumps(t) + "\n" for t in TICKETS))
+    result = run_import(app, tmp_path, "--tickets", str(tickets), "--chunk-size", "2")
+    assert result.exit_code == 0, result.output
+    assert "resuming" in result.output
+    assert "tickets: 3 records, 3 inserted" in result.output
+    assert Ticket.query.count() == 5
+
+
+def test_reimporting_skips_rows_already_present(app, tmp_path, files):
+    users, tickets, _ = files
+    run_import(app, tmp_path, "--users", str(users), "--tickets", str(tickets))
+
+    result = run_import(
+        app, tmp_path, "--restart", "--users", str(users), "--tickets", str(tickets)
+    )
+    assert result.exit_code == 0, result.output
+    assert "tickets: 5 records, 0 inserted, 5 already present" in result.output
+    assert Ticket.query.count() == 5
+    assert User.query.count() == 3
+
+
+def test_conflicting_ids_are_refused(app, tmp_path, files):
+    users, tickets, comments = files
+    db.session.add(
+        Ticket(id=12, title="Unrelated", description="", status="open", priority="low")
+    )
+    db.session.commit()
+
+    result = run_import(
+        app,
+        tmp_path,
+        "--users",
+        str(users),
+        "--tickets",
+        str(tickets),
+        "--comments",
+        str(comments),
+    )
+    assert result.exit_code == 1
+    assert "ticket 12 already exists and is not from this import" in result.output
+    assert db.session.get(Ticket, 12).title == "Unrelated"
+    assert Comment.query.count() == 0
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [("status", "pending"), ("priority", "urgent")],
+)
+def test_unknown_choices_are_refused(app, tmp_path, files, field, value):
+    _, tickets, _ = files
+    bad = [dict(t) for t in TICKETS]
+    bad[1][field] = value
+    tickets.write_text("".join(json.dumps(t) + "\n" for t in bad))
+
+    result = run_import(app, tmp_path, "--tickets", str(tickets))
+    assert result.exit_code == 1
+    assert f"record 2: {field} must be one of" in result.output
+    assert Ticket.query.count() == 0
+
+
+def test_unknown_roles_are_refused(app, tmp_path, files):
+    users, _, _ = files
+    users.write_text(USERS_CSV + "Root,root@old.example,superuser,\n")
+
+    result = run_import(app, tmp_path, "--users", str(users))
+    assert result.exit_code == 1
+    assert "record 4: role must be one of" in result.output
+
+
+def test_csv_export_imports_unchanged(app, tmp_path):
+    admin = User(email="admin@example.com", name="Admin", role="admin")
+    admin.set_password(PASSWORD)
+    db.session.add(admin)
+    db.session.commit()
+    texts = ["-1 still broken", "=SUM(A1:A3)", "+44 20 7946 0000", "@support"]
+    for text in texts:
+        ticket = Ticket(
+            title=text,
+            description=text,
+            status="open",
+            priority="low",
+            user_id=admin.id,
+        )
+        db.session.add(ticket)
+        db.session.flush()
+        db.session.add(
+            Comment(comment_text=text, ticket_id=ticket.id, user_id=admin.id)
+        )
+    db.session.commit()
+
+    client = app.test_client()
+    with app.app_context():
+        client.post("/login", data={"email": admin.email, "password": PASSWORD})
+        for dataset in ("tickets", "comments"):
+            response = client.get(f"/export/{dataset}.csv")
+            (tmp_path / f"{dataset}.csv").write_bytes(response.data)
+    Comment.query.delete()
+    Ticket.query.delete()
+    db.session.commit()
+
+    result = run_import(
+        app,
+        tmp_path,
+        "--tickets",
+        str(tmp_path / "tickets.csv"),
+        "--comments",
+        str(tmp_path / "comments.csv"),
+    )
+    assert result.exit_code == 0, result.output
+    tickets = Ticket.query.order_by(Ticket.id).all()
+    assert [(t.title, t.description, t.creator) for t in tickets] == [
+        (text, text, admin) for text in texts
+    ]
+    comments = Comment.query.order_by(Comment.id).all()
+    assert [c.comment_text for c in comments] == texts
+
+
+def test_import_needs_a_file(app, tmp_path):
+    result = run_import(app, tmp_path)
+    assert result.exit_code != 0
+    assert "at least one of" in result.output
@@ -0,0 +1,146 @@
+import multiprocessing
+import re
+
+import pytest
+
+from app import create_app, db
+from app.metrics import MetricsRegistry
+from app.models import User
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def make_app():
+    """Fixture to create apps with metrics settings and one admin."""
+
+    def make_app(**config):
+        app = create_app(
+            {
+                "TESTING": True,
+                "SECRET_KEY": "test-secret-key",
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+                "WTF_CSRF_ENABLED": False,
+                **config,
+            }
+        )
+        with app.app_context():
+            db.create_all()
+            user = User(email="admin@example.com", name="Admin", role="admin")
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+        return app
+
+    return make_app
+
+
+def sample(text, name, **labels):
+    """Value of one sample in the exposition text, 0 if it is missing."""
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf"^{name}\{{{re.escape(wanted)}\}} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else 0
+
+
+def metrics(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    return response.get_data(as_text=True)
+
+
+def test_requests_are_measured_per_endpoint(make_app):
+    app = make_app()
+    client = app.test_client()
+    before = metrics(client)
+    with app.app_context():
+        client.get("/login")
+    after = metrics(client)
+
+    labels = {"endpoint": "main.login", "method": "GET"}
+    count = sample(after, "helpdesk_request_duration_seconds_count", **labels)
+    assert (
+        count == sample(before, "helpdesk_request_duration_seconds_count", **labels) + 1
+    )
+    inf = {**labels, "le": "+Inf"}
+    assert sample(after, "helpdesk_request_duration_seconds_bucket", **inf) == count
+    for name, labels in [
+        ("helpdesk_request_db_seconds_count", {"endpoint": "main.login"}),
+        ("helpdesk_response_size_bytes_count", {"endpoint": "main.login"}),
+        (
+            "helpdesk_template_render_seconds_count",
+            {"endpoint": "main.login", "template": "login.html"},
+        ),
+    ]:
+        assert sample(after, name, **labels) == sample(before, name, **labels) + 1
+
+
+def test_logins_are_counted_by_result(make_app):
+    app = make_app()
+    client = app.test_client()
+    before = metrics(client)
+    with app.app_context():
+        client.post("/login", data={"email": "admin@example.com", "password": "x"})
+    with app.app_context():
+        client.post("/login", data={"email": "admin@example.com", "password": PASSWORD})
+    after = metrics(client)
+
+    for result in ("success", "failure"):
+        assert sample(after, "helpdesk_logins_total", result=result) == (
+            sample(before, "helpdesk_logins_total", result=result) + 1
+        )
+
+
+def test_metrics_need_the_token_when_one_is_set(make_app):
+    client = make_app(METRICS_TOKEN="s3cret").test_client()
+    assert client.get("/metrics").status_code == 401
+    wrong = {"Authorization": "Bearer guess"}
+    assert client.get("/metrics", headers=wrong).status_code == 401
+    right = {"Authorization": "Bearer s3cret"}
+    assert client.get("/metrics", headers=right).status_code == 200
+
+
+def test_metrics_are_hidden_from_remote_clients_without_a_token(make_app):
+    client = make_app().test_client()
+    remote = client.get("/metrics", environ_base={"REMOTE_ADDR": "10.1.2.3"})
+    assert remote.status_code == 404
+    proxied = client.get("/metrics", headers={"X-Forwarded-For": "10.1.2.3"})
+    assert proxied.status_code == 404
+
+
+def test_trusted_proxies_pass_on_the_client_address_to_metrics(make_app):
+    client = make_app(TRUSTED_PROXIES=1).test_client()
+    remote = client.get("/metrics", headers={"X-Forwarded-For": "10.1.2.3"})
+    assert remote.status_code == 404
+    # The proxy appends the local client; the address the client sent is ignored
+    local = client.get("/metrics", headers={"X-Forwarded-For": "10.1.2.3, 127.0.0.1"})
+    assert local.status_code == 200
+
+
+def _observe_in_child(registry):
+    registry._reset()
+    registry.metrics["latency"].observe(0.3, endpoint="main.index")
+    registry.metrics["latency"].observe(7, endpoint="main.index")
+    registry.flush(force=True)
+
+
+def test_processes_are_summed_through_the_directory(tmp_path):
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency", "Latency.", ("endpoint",), (0.1, 1))
+    registry.directory = str(tmp_path)
+
+    child = multiprocessing.get_context("fork").Process(
+        target=_observe_in_child, args=(registry,)
+    )
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    latency.observe(0.05, endpoint="main.index")
+
+    text = registry.render()
+    assert 'latency_bucket{endpoint="main.index",le="0.1"} 1' in text
+    assert 'latency_bucket{endpoint="main.index",le="1"} 2' in text
+    assert 'latency_bucket{endpoint="main.index",le="+Inf"} 3' in text
+    assert 'latency_count{endpoint="main.index"} 3' in text
+    assert sample(text, "latency_sum", endpoint="main.index") == pytest.approx(7.35)
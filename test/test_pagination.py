@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app import create_app, db
+from app.models import Ticket, User
+from app.pagination import decode_cursor, encode_cursor, paginate_keyset
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app instance for testing."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "TICKETS_PER_PAGE": 3,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def tickets(app):
+    """Creates an admin and seven tickets, two of which share a creation time."""
+    user = User(email="testuser@example.com", name="Test User", role="admin")
+    user.set_password("gyjvo9-kewvoh-Vurmuj!")
+    db.session.add(user)
+    db.session.commit()
+
+    base = datetime(2024, 9, 1, 12, 0, 0)
+    created = [base + timedelta(minutes=i) for i in range(6)] + [
+        base + timedelta(minutes=5)
+    ]
+    for i, created_at in enumerate(created):
+        db.session.add(
+            Ticket(
+                title=f"Ticket {i}",
+                description="A paginated test ticket",
+                status="open",
+                priority="low",
+                user_id=user.id,
+                created_at=created_at,
+            )
+        )
+    db.session.commit()
+    return user
+
+
+def login_user(client):
+    """Helper function to log in the admin user."""
+    response = client.post(
+        "/login",
+        data={"email": "testuser@example.com", "password": "gyjvo9-kewvoh-Vurmuj!"},
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    return response
+
+
+def find_page_link(soup, label):
+    """Returns the pagination link with the given label, if it is rendered."""
+    for link in soup.find_all("a", class_="page-link"):
+        if label in link.get_text():
+            return link
+    return None
+
+
+def test_cursor_round_trip(app, tickets):
+    ticket = Ticket.query.first()
+    assert decode_cursor(encode_cursor(ticket)) == (ticket.created_at, ticket.id)
+
+
+@pytest.mark.parametrize("token", [None, "", "not-a-cursor", "bm8tcGlwZQ"])
+def test_decode_cursor_rejects_malformed_tokens(token):
+    assert decode_cursor(token) is None
+
+
+def test_pages_walk_forward_and_back_without_gaps(app, tickets):
+    expected = [
+        t.id for t in Ticket.query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    ]
+
+    seen = []
+    pages = []
+    page = paginate_keyset(Ticket.query, per_page=3)
+    while True:
+        pages.append(page)
+        seen.extend(t.id for t in page.items)
+        if not page.has_next:
+            break
+        page = paginate_keyset(
+            Ticket.query, after=decode_cursor(page.next_cursor), per_page=3
+        )
+
+    assert seen == expected
+    assert [len(p.items) for p in pages] == [3, 3, 1]
+    assert not pages[0].has_prev
+
+    # Stepping back from the last page returns the middle page unchanged
+    previous = paginate_keyset(
+        Ticket.query, before=decode_cursor(pages[-1].prev_cursor), per_page=3
+    )
+    assert [t.id for t in previous.items] == [t.id for t in pages[1].items]
+    assert previous.has_prev and previous.has_next
+
+
+def test_all_tickets_view_renders_cursor_links(client, tickets):
+    login_user(client)
+
+    response = client.get("/all_tickets")
+    soup = BeautifulSoup(response.data, "html.parser")
+    rows = soup.find("tbody").find_all("tr")
+    assert len(rows) == 3
+
+    older = find_page_link(soup, "Older")
+    assert older is not None and "after=" in older["href"]
+
+    response = client.get(older["href"])
+    soup = BeautifulSoup(response.data, "html.parser")
+    newer = find_page_link(soup, "Newer")
+    assert newer is not None and "before=" in newer["href"]
+
+
+def test_per_page_is_clamped(client, tickets):
+    login_user(client)
+
+    response = client.get("/all_tickets?per_page=1000")
+    soup = BeautifulSoup(response.data, "html.parser")
+    assert len(soup.find("tbody").find_all("tr")) == 7
+
+    response = client.get("/all_tickets?per_page=0")
+    soup = BeautifulSoup(response.data, "html.parser")
+    assert len(soup.find("tbody").find_all("tr")) == 1
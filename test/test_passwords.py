@@ -0,0 +1,170 @@
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app, db, passwords
+from app.models import User
+from app.passwords import PasswordHashingBusy, PasswordPolicy, argon2
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+# Low costs keep the tests fast
+OLD_METHOD = "pbkdf2:sha256:1000"
+NEW_METHOD = "scrypt:1024:8:1"
+
+
+@pytest.fixture
+def app():
+    """Fixture to create an app hashing with scrypt and a user with a pbkdf2 hash."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "PASSWORD_HASH": NEW_METHOD,
+            "PASSWORD_HASH_WORKERS": 1,
+            "PASSWORD_HASH_QUEUE_SIZE": 1,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="user@example.com", name="User", role="regular")
+        user.password_hash = PasswordPolicy(OLD_METHOD).hash(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def stored_hash():
+    db.session.expire_all()
+    return User.query.filter_by(email="user@example.com").one().password_hash
+
+
+def log_in(app, password):
+    with app.app_context():
+        return app.test_client().post(
+            "/login", data={"email": "user@example.com", "password": password}
+        )
+
+
+def test_missing_cost_parameters_get_defaults():
+    assert PasswordPolicy("pbkdf2").method == "pbkdf2:sha256:600000"
+    assert PasswordPolicy("pbkdf2:sha512").method == "pbkdf2:sha512:600000"
+    assert PasswordPolicy("scrypt:16384").method == "scrypt:16384:8:1"
+    with pytest.raises(ValueError):
+        PasswordPolicy("md5")
+    with pytest.raises(ValueError):
+        PasswordPolicy("scrypt:16384:8:1:1")
+
+
+@pytest.mark.parametrize("method", [OLD_METHOD, NEW_METHOD])
+def test_hashes_verify_under_any_policy(method):
+    password_hash = PasswordPolicy(method).hash(PASSWORD)
+    assert password_hash.startswith(method + "$")
+    for policy in (PasswordPolicy(OLD_METHOD), PasswordPolicy(NEW_METHOD)):
+        assert policy.verify(password_hash, PASSWORD)
+        assert not policy.verify(password_hash, PASSWORD + "x")
+    assert not PasswordPolicy().verify("!", PASSWORD)
+
+
+def test_only_hashes_with_other_parameters_need_rehashing():
+    policy = PasswordPolicy(NEW_METHOD)
+    assert not policy.needs_rehash(policy.hash(PASSWORD))
+    assert policy.needs_rehash(PasswordPolicy("scrypt:2048:8:1").hash(PASSWORD))
+    assert policy.needs_rehash(PasswordPolicy(OLD_METHOD).hash(PASSWORD))
+
+
+def test_login_upgrades_an_outdated_hash(app):
+    assert log_in(app, PASSWORD).status_code == 302
+    upgraded = stored_hash()
+    assert upgraded.startswith(NEW_METHOD + "$")
+
+    # The new hash works, and is not replaced again
+    assert log_in(app, PASSWORD).status_code == 302
+    assert stored_hash() == upgraded
+
+
+def test_failed_login_keeps_the_hash(app):
+    before = stored_hash()
+    assert log_in(app, "Wrong-password-1!").status_code == 200
+    assert stored_hash() == before
+
+
+def test_new_passwords_use_the_configured_policy(app):
+    user = User(email="new@example.com", name="New", role="regular")
+    user.set_password(PASSWORD)
+    assert user.password_hash.startswith(NEW_METHOD + "$")
+
+
+def test_hashing_can_run_inline_or_on_processes():
+    for workers in (0, 1):
+        policy = PasswordPolicy(NEW_METHOD, workers=workers)
+        password_hash = policy.hash(PASSWORD)
+        assert policy.verify(password_hash, PASSWORD)
+        assert not policy.verify(password_hash, PASSWORD + "x")
+
+
+def test_apps_hash_inline_unless_workers_are_configured():
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    policy = app.extensions["password_policy"]
+    assert policy.workers == 0
+    # There is no queue to protect, so concurrent logins are never refused
+    assert policy._slots is None
+    with patch.object(passwords, "_get_executor", side_effect=AssertionError):
+        assert policy.verify(PasswordPolicy(OLD_METHOD).hash(PASSWORD), PASSWORD)
+
+
+def test_queue_size_follows_the_workers():
+    def queue_size(**config):
+        app = create_app(
+            {"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", **config}
+        )
+        slots = app.extensions["password_policy"]._slots
+        return slots and slots._initial_value
+
+    assert queue_size(PASSWORD_HASH_WORKERS=2) == 8
+    assert queue_size(PASSWORD_HASH_WORKERS=2, PASSWORD_HASH_QUEUE_SIZE=3) == 3
+    assert queue_size(PASSWORD_HASH_QUEUE_SIZE=3) == 3
+
+
+def test_full_queue_rejects_without_hashing():
+    policy = PasswordPolicy(NEW_METHOD, max_pending=1, retry_after=5)
+    policy._slots.acquire()
+    with pytest.raises(PasswordHashingBusy) as raised:
+        policy.hash(PASSWORD)
+    assert raised.value.retry_after == 5
+    policy._slots.release()
+    assert policy.hash(PASSWORD)
+
+
+def test_login_gets_503_while_hashing_is_saturated(app):
+    slots = app.extensions["password_policy"]._slots
+    slots.acquire()
+    try:
+        response = log_in(app, PASSWORD)
+    finally:
+        slots.release()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert log_in(app, PASSWORD).status_code == 302
+
+
+@pytest.mark.skipif(argon2 is None, reason="argon2-cffi is not installed")
+def test_argon2_hashes_verify_and_upgrade():
+    policy = PasswordPolicy("argon2:1:8192:1")
+    password_hash = policy.hash(PASSWORD)
+    assert password_hash.startswith("$argon2")
+    assert policy.verify(password_hash, PASSWORD)
+    assert not policy.needs_rehash(password_hash)
+    assert PasswordPolicy("argon2:2:8192:1").needs_rehash(password_hash)
+    assert PasswordPolicy(NEW_METHOD).needs_rehash(password_hash)
+
+
+@pytest.mark.skipif(argon2 is not None, reason="argon2-cffi is installed")
+def test_argon2_needs_its_package():
+    with pytest.raises(ValueError, match="argon2-cffi"):
+        PasswordPolicy("argon2")
@@ -0,0 +1,116 @@
+import sys
+
+import pytest
+
+from app import create_app, db
+from app.models import User
+from app.profiling import (
+    PROFILE_HEADER,
+    collapse,
+    flame_graph_svg,
+    read_folded,
+    summarise,
+)
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Fixture to create apps with profiling settings and one admin."""
+
+    def make_app(**config):
+        app = create_app(
+            {
+                "TESTING": True,
+                "SECRET_KEY": "test-secret-key",
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+                "WTF_CSRF_ENABLED": False,
+                "PROFILING_DIR": str(tmp_path / "profiles"),
+                "PROFILING_INTERVAL_MS": 1,
+                **config,
+            }
+        )
+        with app.app_context():
+            db.create_all()
+            user = User(email="admin@example.com", name="Admin", role="admin")
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+        return app
+
+    return make_app
+
+
+def log_in(app, client, headers=None):
+    with app.app_context():
+        return client.post(
+            "/login",
+            data={"email": "admin@example.com", "password": PASSWORD},
+            headers=headers,
+        )
+
+
+def test_requests_are_not_profiled_by_default(make_app, tmp_path):
+    app = make_app()
+    log_in(app, app.test_client())
+    assert not (tmp_path / "profiles").exists()
+
+
+def test_profiled_login_shows_password_hashing(make_app, tmp_path):
+    app = make_app(PROFILING=True)
+    log_in(app, app.test_client())
+
+    stacks = read_folded(tmp_path / "profiles" / "main.login.folded")
+    assert stacks
+    assert any("app.views.login_view:LoginView.post" in s for s in stacks)
+    categories = dict(summarise(stacks)[0])
+    assert categories.get("password hashing", 0) > 0
+
+
+def test_profiling_can_be_limited_to_endpoints(make_app, tmp_path):
+    app = make_app(PROFILING=True, PROFILING_ENDPOINTS=["main.all_tickets"])
+    log_in(app, app.test_client())
+    assert not (tmp_path / "profiles" / "main.login.folded").exists()
+
+
+def test_signed_header_profiles_a_single_request(make_app, tmp_path):
+    app = make_app()
+    token = app.extensions["profiler"].make_token()
+
+    log_in(app, app.test_client(), headers={PROFILE_HEADER: token + "x"})
+    assert not (tmp_path / "profiles").exists()
+
+    log_in(app, app.test_client(), headers={PROFILE_HEADER: token})
+    assert (tmp_path / "profiles" / "main.login.folded").exists()
+
+
+def test_expired_tokens_are_ignored(make_app, tmp_path):
+    app = make_app()
+    token = app.extensions["profiler"].make_token(seconds=-1)
+    log_in(app, app.test_client(), headers={PROFILE_HEADER: token})
+    assert not (tmp_path / "profiles").exists()
+
+
+def test_report_summarises_and_draws_flame_graphs(make_app, tmp_path):
+    app = make_app(PROFILING=True)
+    log_in(app, app.test_client())
+
+    result = app.test_cli_runner().invoke(args=["profile", "report"])
+    assert result.exit_code == 0, result.output
+    assert "main.login:" in result.output
+    assert "password hashing" in result.output
+    svg = (tmp_path / "profiles" / "report" / "main.login.svg").read_text()
+    assert svg.startswith("<svg")
+    assert "LoginView.post" in svg
+
+
+def test_collapsed_stacks_and_flame_graph():
+    stack = collapse(sys._getframe())
+    assert stack.endswith(";test.test_profiling:test_collapsed_stacks_and_flame_graph")
+
+    svg = flame_graph_svg({"a:main;b:slow": 3, "a:main;c:fast": 1}, "demo")
+    assert "demo (4 samples)" in svg
+    assert "b:slow (3 samples, 75.0%)" in svg
+    assert "c:fast (1 samples, 25.0%)" in svg
@@ -0,0 +1,118 @@
+import pytest
+
+from app import create_app, db
+from app.models import Ticket, User
+from test.query_count import assert_query_count, count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+# Statements per page load: the ticket page itself and, on the staff pages,
+# the support staff dropdown. The logged in user and the open-tickets badge
+# are served from the caches warmed by the first request.
+EXPECTED_QUERIES = {
+    ("admin", "/all_tickets"): 1,
+    ("regular", "/all_tickets"): 1,
+    ("regular", "/active_tickets"): 1,
+    ("admin", "/closed_tickets"): 1,
+    ("support", "/closed_tickets"): 1,
+    ("admin", "/assigned_tickets"): 2,
+    ("support", "/assigned_tickets"): 2,
+    ("admin", "/unassigned_tickets"): 2,
+}
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app instance for testing."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        for role in ["admin", "support", "regular"]:
+            user = User(email=f"{role}@example.com", name=f"{role} user", role=role)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def add_tickets(count):
+    """
+    Adds tickets, each with its own creator and assignee, covering every list.
+    """
+    regular = User.query.filter_by(role="regular").first()
+    support = User.query.filter_by(role="support").first()
+    for i in range(count):
+        creator = User(
+            email=f"creator{i}-{count}@example.com", name="C", role="regular"
+        )
+        assignee = User(
+            email=f"assignee{i}-{count}@example.com", name="A", role="support"
+        )
+        creator.password_hash = assignee.password_hash = "unused"
+        db.session.add_all([creator, assignee])
+        db.session.flush()
+        for status in ["open", "in-progress", "closed"]:
+            db.session.add_all(
+                [
+                    Ticket(
+                        title="Assigned",
+                        description="Query count ticket",
+                        status=status,
+                        priority="low",
+                        user_id=creator.id,
+                        assigned_to=assignee.id,
+                    ),
+                    Ticket(
+                        title="Unassigned",
+                        description="Query count ticket",
+                        status=status,
+                        priority="low",
+                        user_id=creator.id,
+                    ),
+                    Ticket(
+                        title="Own",
+                        description="Query count ticket",
+                        status=status,
+                        priority="low",
+                        user_id=regular.id,
+                        assigned_to=support.id,
+                    ),
+                ]
+            )
+    db.session.commit()
+
+
+def measure(app, client, url):
+    """Returns the statement count for one page load."""
+    # A fresh app context gives the request its own session and login state,
+    # as a separate request in production would have
+    with app.app_context(), count_queries() as counter:
+        response = client.get(url)
+        assert response.status_code == 200
+    return counter.count
+
+
+@pytest.mark.parametrize("role, url", list(EXPECTED_QUERIES))
+def test_list_view_query_count_is_fixed(app, client, role, url):
+    client.post("/login", data={"email": f"{role}@example.com", "password": PASSWORD})
+    measure(app, client, url)
+
+    add_tickets(2)
+    assert measure(app, client, url) == EXPECTED_QUERIES[(role, url)]
+
+    # More rows with more distinct users must not add any statements
+    add_tickets(5)
+    with app.app_context(), assert_query_count(EXPECTED_QUERIES[(role, url)]):
+        response = client.get(url)
+        assert response.status_code == 200
@@ -0,0 +1,177 @@
+import re
+
+import pytest
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.pagination import encode_cursor
+from test.query_count import count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+# Matches a plan step that seeks a table's rows through an index. Every
+# other SCAN or SEARCH step, including "SCAN ticket USING INDEX ..." which
+# walks a whole index and "USING AUTOMATIC INDEX" which builds one per
+# query, reads the whole table. Older SQLite writes "SEARCH TABLE ticket".
+INDEXED = re.compile(
+    r"^SEARCH (TABLE )?\S+ USING ((COVERING )?INDEX \w+|INTEGER PRIMARY KEY) "
+)
+# Scans that are fine, by plan step and a part of the statement they are in
+ALLOWED_SCANS = {
+    # Newest-first pages walk this index in order and stop after one page
+    "SCAN ticket USING INDEX ix_ticket_created_at_id": (
+        "ORDER BY ticket.created_at DESC, ticket.id DESC LIMIT"
+    ),
+    # The assignee list reads the few staff users, and user has no role index
+    "SCAN user": "WHERE user.role IN",
+}
+
+PAGES = {
+    "admin": [
+        "/all_tickets",
+        "/all_tickets?after={cursor}",
+        "/closed_tickets",
+        "/closed_tickets?after={cursor}",
+        "/assigned_tickets",
+        "/unassigned_tickets",
+        "/ticket/1",
+        "/ticket/1/readonly",
+        "/ticket/1/comments?after={cursor}",
+    ],
+    "support": ["/all_tickets", "/closed_tickets", "/assigned_tickets"],
+    "regular": ["/all_tickets", "/active_tickets", "/closed_tickets"],
+}
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app instance for testing."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        users = {}
+        for role in PAGES:
+            users[role] = User(email=f"{role}@example.com", name=role, role=role)
+            users[role].set_password(PASSWORD)
+        db.session.add_all(users.values())
+        db.session.commit()
+
+        for i, status in enumerate(["open", "in-progress", "closed"] * 3):
+            ticket = Ticket(
+                title=f"Ticket {i}",
+                description="A query plan test ticket",
+                status=status,
+                priority="low",
+                user_id=users["regular"].id,
+                assigned_to=users["support"].id if i % 2 else None,
+            )
+            db.session.add(ticket)
+            db.session.flush()
+            db.session.add(
+                Comment(
+                    comment_text="A comment",
+                    ticket_id=ticket.id,
+                    user_id=users["admin"].id,
+                )
+            )
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def newest_cursor():
+    """Cursor just past the newest ticket, so the keyset predicate is planned too."""
+    return encode_cursor(
+        Ticket.query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).first()
+    )
+
+
+def is_full_scan(detail, statement):
+    if not detail.startswith(("SCAN", "SEARCH")) or INDEXED.match(detail):
+        return False
+    allowed = ALLOWED_SCANS.get(re.sub(r"^(SCAN|SEARCH) TABLE ", r"\1 ", detail))
+    return allowed is None or allowed not in " ".join(statement.split())
+
+
+def full_scans(statements, parameters):
+    """Returns the plan steps that read a table without seeking an index."""
+    scans = []
+    with db.engine.connect() as conn:
+        for statement, params in zip(statements, parameters):
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", params
+            ).fetchall()
+            scans.extend(
+                (statement, row[-1]) for row in plan if is_full_scan(row[-1], statement)
+            )
+    return scans
+
+
+@pytest.mark.parametrize(
+    "role, url", [(role, url) for role, urls in PAGES.items() for url in urls]
+)
+def test_page_queries_use_indexes(app, client, role, url):
+    client.post("/login", data={"email": f"{role}@example.com", "password": PASSWORD})
+    url = url.format(cursor=newest_cursor())
+
+    with app.app_context(), count_queries() as counter:
+        response = client.get(url)
+        assert response.status_code == 200
+        scans = full_scans(counter.statements, counter.parameters)
+
+    assert not scans, "Full table scans:\n" + "\n".join(
+        f"{detail}: {statement}" for statement, detail in scans
+    )
+
+
+def test_duplicate_ticket_check_uses_index(app, client):
+    client.post("/login", data={"email": "regular@example.com", "password": PASSWORD})
+    form = {
+        "title": "Duplicate check",
+        "description": "Checking the duplicate lookup plan",
+        "priority": "low",
+    }
+    client.post("/create_ticket", data=form)
+
+    with app.app_context(), count_queries() as counter:
+        client.post("/create_ticket", data=form)
+        scans = full_scans(counter.statements, counter.parameters)
+
+    assert not scans, scans
+
+
+def test_open_ticket_count_uses_index(app):
+    with count_queries() as counter:
+        Ticket.query.filter(Ticket.status.in_(["open", "in-progress"])).count()
+    assert not full_scans(counter.statements, counter.parameters)
+
+
+@pytest.mark.parametrize(
+    "detail, scan",
+    [
+        ("SEARCH ticket USING INDEX ix_ticket_status_created_at_id (status=?)", False),
+        ("SEARCH TABLE ticket USING COVERING INDEX ix_ticket_status (status=?)", False),
+        ("SEARCH user_1 USING INTEGER PRIMARY KEY (rowid=?) LEFT-JOIN", False),
+        ("USE TEMP B-TREE FOR ORDER BY", False),
+        ("SCAN ticket", True),
+        ("SCAN TABLE comment", True),
+        ("SCAN ticket USING INDEX ix_ticket_status_created_at_id", True),
+        ("SCAN ticket USING COVERING INDEX ix_ticket_status_created_at_id", True),
+        ("SEARCH comment USING AUTOMATIC COVERING INDEX (ticket_id=?)", True),
+        ("SCAN user", True),
+    ],
+)
+def test_only_index_seeks_pass_the_plan_check(detail, scan):
+    assert is_full_scan(detail, "SELECT ticket.id FROM ticket") is scan
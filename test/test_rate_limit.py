@@ -0,0 +1,160 @@
+import pytest
+
+from app import create_app, db
+from app.kv import LocalRedis
+from app.models import User
+from app.rate_limit import (
+    LoginRateLimiter,
+    MemoryBackend,
+    RedisBackend,
+    SQLiteBackend,
+)
+from test.query_count import count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemoryBackend(evict_interval=10)
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "rate_limit.db"), evict_interval=10)
+    return RedisBackend(LocalRedis(evict_interval=10, clock=clock))
+
+
+@pytest.fixture
+def app(request):
+    """Fixture to create an app allowing 3 attempts per email and 5 per IP."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "PASSWORD_HASH_WORKERS": 0,
+            "LOGIN_LIMIT_PER_IP": (5, 60),
+            "LOGIN_LIMIT_PER_EMAIL": (3, 60),
+            "TRUSTED_PROXIES": getattr(request, "param", 0),
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="user@example.com", name="User", role="regular")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def log_in(app, email, password, ip="10.0.0.1", forwarded_for=None):
+    with app.app_context():
+        return app.test_client().post(
+            "/login",
+            data={"email": email, "password": password},
+            environ_base={"REMOTE_ADDR": ip},
+            headers={"X-Forwarded-For": forwarded_for} if forwarded_for else {},
+        )
+
+
+def test_buckets_refill_and_are_evicted(backend, clock):
+    limiter = LoginRateLimiter(
+        backend, {"ip": (2, 10), "email": (100, 10)}, clock=clock
+    )
+    assert limiter.hit("10.0.0.1", "a@example.com") == 0
+    assert limiter.hit("10.0.0.1", "b@example.com") == 0
+    assert limiter.hit("10.0.0.1", "c@example.com") == pytest.approx(5)
+    assert limiter.hit("10.0.0.2", "c@example.com") == 0
+
+    # One token comes back every 5 seconds
+    clock.now += 5
+    assert limiter.hit("10.0.0.1", "c@example.com") == 0
+    assert limiter.hit("10.0.0.1", "c@example.com") > 0
+
+    # Once every bucket is full again, the next sweep drops them all
+    clock.now += 60
+    limiter.hit("10.0.0.3", "d@example.com")
+    store = backend.client if isinstance(backend, RedisBackend) else backend
+    assert len(store) == 2
+
+
+def test_emails_share_a_bucket_whatever_their_case(clock):
+    limiter = LoginRateLimiter(
+        MemoryBackend(), {"ip": (100, 10), "email": (1, 10)}, clock=clock
+    )
+    assert limiter.hit("10.0.0.1", "User@Example.com ") == 0
+    assert limiter.hit("10.0.0.1", "user@example.com") > 0
+
+
+def test_throttled_logins_do_no_database_work(app):
+    for _ in range(3):
+        assert log_in(app, "user@example.com", "Wrong-password-1!").status_code == 200
+
+    with app.app_context(), count_queries() as counter:
+        response = log_in(app, "user@example.com", PASSWORD)
+    assert response.status_code == 429
+    # A token is back after 20 seconds, less the time the attempts took
+    assert 15 <= int(response.headers["Retry-After"]) <= 20
+    assert counter.count == 0
+
+
+def test_one_ip_is_limited_across_emails(app):
+    for n in range(5):
+        assert log_in(app, f"user{n}@example.com", PASSWORD).status_code == 200
+    assert log_in(app, "user@example.com", PASSWORD).status_code == 429
+    assert log_in(app, "user@example.com", PASSWORD, ip="10.0.0.2").status_code == 302
+
+
+def test_guessing_at_an_email_does_not_lock_its_owner_out(app):
+    for _ in range(3):
+        response = log_in(app, "user@example.com", "Wrong-password-1!", "10.6.6.6")
+        assert response.status_code == 200
+    assert log_in(app, "user@example.com", PASSWORD, "10.6.6.6").status_code == 429
+    assert log_in(app, "user@example.com", PASSWORD, "10.0.0.2").status_code == 302
+
+
+@pytest.mark.parametrize("app", [1], indirect=True)
+def test_trusted_proxies_pass_on_the_client_address(app):
+    for n in range(6):
+        response = log_in(
+            app, f"user{n}@example.com", PASSWORD, forwarded_for="1.1.1.1"
+        )
+    assert response.status_code == 429
+    # Every client comes through the same proxy, at 10.0.0.1
+    response = log_in(app, "user@example.com", PASSWORD, forwarded_for="2.2.2.2")
+    assert response.status_code == 302
+
+
+def test_forwarded_addresses_are_ignored_without_trusted_proxies(app):
+    for n in range(5):
+        log_in(app, f"user{n}@example.com", PASSWORD, forwarded_for=f"1.1.1.{n}")
+    response = log_in(app, "user@example.com", PASSWORD, forwarded_for="2.2.2.2")
+    assert response.status_code == 429
+
+
+def test_limiter_can_be_disabled():
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "LOGIN_RATE_LIMIT": False,
+        }
+    )
+    assert "login_limiter" not in app.extensions
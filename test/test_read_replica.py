@@ -0,0 +1,135 @@
+import pytest
+
+from app import create_app, db
+from app.counters import get_open_ticket_counter
+from app.database import REPLICA_BIND, SQLiteReplicator, read_from_replica
+from app.models import Ticket, User
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def app(tmp_path, replicator):
+    """Fixture to create an app whose reads can go to a separate replica file."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SQLALCHEMY_BINDS": {REPLICA_BIND: f"sqlite:///{tmp_path / 'replica.db'}"},
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "OPEN_TICKETS_RECONCILE_SECONDS": 0,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="testuser@example.com", name="Test User", role="admin")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        replicator.sync()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def replicator(tmp_path):
+    return SQLiteReplicator(tmp_path / "primary.db", tmp_path / "replica.db")
+
+
+def add_ticket(title):
+    db.session.add(
+        Ticket(
+            title=title,
+            description="A replicated test ticket",
+            status="open",
+            priority="low",
+            user_id=1,
+        )
+    )
+    db.session.commit()
+
+
+def login(client):
+    client.post("/login", data={"email": "testuser@example.com", "password": PASSWORD})
+    # Forget the login POST, so the next reads are not kept on the primary
+    with client.session_transaction() as session:
+        session.pop("_primary_until", None)
+
+
+def get(app, client, url):
+    with app.app_context():
+        return client.get(url).get_data(as_text=True)
+
+
+def test_reads_outside_replica_block_use_primary(app, replicator):
+    add_ticket("Primary only")
+
+    assert Ticket.query.count() == 1
+    with read_from_replica():
+        assert Ticket.query.count() == 0
+
+    replicator.sync()
+    with read_from_replica():
+        assert Ticket.query.count() == 1
+
+
+def test_writes_inside_replica_block_go_to_primary(app, replicator):
+    with read_from_replica():
+        add_ticket("Written while reading from the replica")
+        db.session.execute(db.update(Ticket).values(priority="high"))
+        db.session.commit()
+
+    assert Ticket.query.filter_by(priority="high").count() == 1
+    with read_from_replica():
+        assert Ticket.query.count() == 0
+
+
+def test_list_views_read_from_replica(app, client, replicator):
+    login(client)
+    add_ticket("Not replicated yet")
+
+    assert "Not replicated yet" not in get(app, client, "/all_tickets")
+
+    replicator.sync()
+    assert "Not replicated yet" in get(app, client, "/all_tickets")
+
+
+def test_client_reads_its_own_writes_after_post(app, client):
+    login(client)
+    response = client.post(
+        "/create_ticket",
+        data={
+            "title": "My new ticket",
+            "description": "Created on the primary",
+            "priority": "low",
+            "status": "open",
+        },
+    )
+    assert response.status_code == 302
+
+    assert "My new ticket" in get(app, client, "/all_tickets")
+
+    # Another client still sees the lagging replica
+    other = app.test_client()
+    login(other)
+    assert "My new ticket" not in get(app, other, "/all_tickets")
+
+
+def test_open_ticket_count_is_recounted_from_primary(app, replicator):
+    counter = get_open_ticket_counter()
+    add_ticket("Counted before replication")
+    with read_from_replica():
+        assert counter.get() == 1
+
+    # A bulk change invalidates the count, and the lagging replica must not
+    # bring back the old one
+    db.session.execute(db.update(Ticket).values(status="closed"))
+    db.session.commit()
+    with read_from_replica():
+        assert Ticket.query.count() == 0
+        assert counter.get() == 0
@@ -4,7 +4,7 @@ from flask import url_for
 import pytest
 from app import create_app, db
 from app.models import User, Ticket
-from app.routes import load_user
+from app.user_cache import load_user
 
 
 @pytest.fixture
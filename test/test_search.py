@@ -0,0 +1,183 @@
+import pytest
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.search import (
+    fts_query,
+    install_search_index,
+    make_snippet,
+    search_tickets,
+)
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app with a few searchable tickets."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        admin = User(email="admin@example.com", name="Admin", role="admin")
+        support = User(email="support@example.com", name="Support", role="support")
+        regular = User(email="regular@example.com", name="Regular", role="regular")
+        for user in (admin, support, regular):
+            user.set_password(PASSWORD)
+        db.session.add_all([admin, support, regular])
+        db.session.commit()
+
+        db.session.add_all(
+            [
+                Ticket(
+                    title="Printer is jammed",
+                    description="Paper keeps getting stuck in the third floor printer",
+                    status="open",
+                    priority="high",
+                    user_id=regular.id,
+                    assigned_to=support.id,
+                ),
+                Ticket(
+                    title="Cannot log in",
+                    description="The login page rejects my password",
+                    status="closed",
+                    priority="low",
+                    user_id=admin.id,
+                ),
+                Ticket(
+                    title="Monitor flickers",
+                    description="The screen flickers when the printer is printing",
+                    status="open",
+                    priority="medium",
+                    user_id=admin.id,
+                ),
+            ]
+        )
+        db.session.commit()
+        db.session.add(
+            Comment(
+                comment_text="Replaced the <b>toner</b> cartridge",
+                ticket_id=2,
+                user_id=support.id,
+            )
+        )
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def user(email):
+    return User.query.filter_by(email=email).one()
+
+
+def titles(results):
+    return [hit.ticket.title for hit in results.hits]
+
+
+def test_title_matches_rank_above_description_matches(app):
+    results = search_tickets(user("admin@example.com"), "printer")
+    assert titles(results) == ["Printer is jammed", "Monitor flickers"]
+
+
+def test_comments_are_searchable_and_snippets_are_escaped(app):
+    results = search_tickets(user("admin@example.com"), "toner")
+    assert titles(results) == ["Cannot log in"]
+    assert str(results.hits[0].snippet) == (
+        "Replaced the &lt;b&gt;<mark>toner</mark>&lt;/b&gt; cartridge"
+    )
+
+
+def test_last_word_matches_as_prefix(app):
+    assert titles(search_tickets(user("admin@example.com"), "monit")) == [
+        "Monitor flickers"
+    ]
+
+
+def test_search_syntax_in_input_is_treated_as_text(app):
+    assert fts_query('Jammed" OR title:*') == '"jammed" "or" "title"*'
+    assert fts_query("  ?! ") is None
+    assert search_tickets(user("admin@example.com"), "?!").hits == []
+
+
+def test_index_follows_updates_and_deletes(app):
+    admin = user("admin@example.com")
+    ticket = db.session.get(Ticket, 3)
+    ticket.title = "Display flickers"
+    db.session.commit()
+    assert titles(search_tickets(admin, "display")) == ["Display flickers"]
+    assert titles(search_tickets(admin, "monitor")) == []
+
+    db.session.delete(Comment.query.one())
+    db.session.commit()
+    assert search_tickets(admin, "toner").hits == []
+
+
+def test_filters(app):
+    admin = user("admin@example.com")
+    support_id = user("support@example.com").id
+
+    assert titles(search_tickets(admin, "printer", status="open", priority="high")) == [
+        "Printer is jammed"
+    ]
+    assert titles(search_tickets(admin, "printer", assignee=str(support_id))) == [
+        "Printer is jammed"
+    ]
+    assert titles(search_tickets(admin, "printer", assignee="none")) == [
+        "Monitor flickers"
+    ]
+    assert search_tickets(admin, "printer", status="closed").hits == []
+
+
+def test_regular_users_only_find_their_own_tickets(app):
+    assert titles(search_tickets(user("regular@example.com"), "printer")) == [
+        "Printer is jammed"
+    ]
+
+
+def test_results_are_paginated(app):
+    admin = user("admin@example.com")
+    first = search_tickets(admin, "printer", per_page=1)
+    second = search_tickets(admin, "printer", page=2, per_page=1)
+    assert first.has_next and not first.has_prev
+    assert titles(first) + titles(second) == ["Printer is jammed", "Monitor flickers"]
+    assert not second.has_next
+
+
+def test_installing_index_fills_it_from_existing_rows(app):
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE search_index")
+        install_search_index(conn)
+    assert titles(search_tickets(user("admin@example.com"), "toner")) == [
+        "Cannot log in"
+    ]
+
+
+def test_search_page(app, client):
+    client.post("/login", data={"email": "admin@example.com", "password": PASSWORD})
+
+    response = client.get("/search")
+    assert response.status_code == 200
+    assert b"Enter a word or two" in response.data
+
+    response = client.get("/search?q=paper&status=open")
+    assert response.status_code == 200
+    assert b"Printer is jammed" in response.data
+    assert b"<mark>Paper</mark> keeps getting stuck" in response.data
+
+    response = client.get("/search?q=nothingmatches")
+    assert b"No tickets match" in response.data
+
+
+def test_snippet_is_cut_around_first_match():
+    content = " ".join(f"word{i}" for i in range(100)) + " toner " + "tail " * 50
+    snippet = str(make_snippet(content, ("toner",), words=8))
+    assert snippet == "…word98 word99 <mark>toner</mark> tail tail tail tail tail…"
@@ -0,0 +1,111 @@
+import pytest
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.search import search_tickets
+from app.seed import SEED_PASSWORD, seed_database
+
+
+def make_app():
+    return create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app with an empty database."""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def snapshot():
+    tickets = db.session.execute(
+        db.select(
+            Ticket.id, Ticket.title, Ticket.status, Ticket.user_id, Ticket.assigned_to
+        ).order_by(Ticket.id)
+    ).all()
+    comments = db.session.execute(
+        db.select(Comment.ticket_id, Comment.user_id, Comment.created_at).order_by(
+            Comment.id
+        )
+    ).all()
+    return tickets, comments
+
+
+def test_same_seed_gives_same_data(app):
+    seed_database(50, 200, 500, seed=7, chunk_size=64)
+    first = snapshot()
+
+    other = make_app()
+    with other.app_context():
+        db.create_all()
+        seed_database(50, 200, 500, seed=7)
+        assert snapshot() == first
+        db.drop_all()
+
+    assert (User.query.count(), Ticket.query.count(), Comment.query.count()) == (
+        50,
+        200,
+        500,
+    )
+
+
+def test_rows_are_consistent(app):
+    seed_database(100, 1000, 3000)
+
+    roles = {u.id: u.role for u in User.query}
+    assert {"admin", "support", "regular"} <= set(roles.values())
+    statuses = set()
+    for ticket in Ticket.query:
+        statuses.add(ticket.status)
+        assert roles[ticket.user_id] == "regular"
+        if ticket.status != "open":
+            assert roles[ticket.assigned_to] in ("admin", "support")
+        assert ticket.updated_at >= ticket.created_at
+    assert statuses == {"open", "in-progress", "closed"}
+
+    for comment in Comment.query.join(Ticket):
+        assert comment.user_id in (comment.ticket.user_id, comment.ticket.assigned_to)
+        assert comment.created_at > comment.ticket.created_at
+
+
+def test_seeding_again_adds_more_rows(app):
+    seed_database(10, 20, 30)
+    seed_database(10, 20, 30)
+
+    assert User.query.count() == 20
+    assert Comment.query.join(Ticket).count() == 60
+
+
+def test_seeded_users_can_log_in_and_tickets_are_searchable(app):
+    seed_database(10, 50, 0)
+
+    admin = User.query.filter_by(role="admin").first()
+    assert admin.email == f"admin{admin.id}@seed.example.com"
+    assert admin.check_password(SEED_PASSWORD)
+    title_word = Ticket.query.first().title.split()[0]
+    assert search_tickets(admin, title_word).hits
+
+
+def test_seed_command(app):
+    result = app.test_cli_runner().invoke(
+        args=["seed", "--users", "5", "--tickets", "10", "--comments", "10"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "tickets: 10 rows" in result.output
+    assert Ticket.query.count() == 10
+
+    result = app.test_cli_runner().invoke(args=["seed", "--users", "2"])
+    assert result.exit_code != 0
+    assert "at least 3 users" in result.output
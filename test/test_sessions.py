@@ -0,0 +1,183 @@
+from unittest.mock import patch
+
+import pytest
+from flask import flash, get_flashed_messages
+
+from app import create_app, db
+from app.models import User
+from app.sessions import REFRESH_INTERVAL, ServerSessionInterface
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+LIFETIME = 600
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture(params=["sqlite", "kv"])
+def app(request, tmp_path, clock):
+    """Fixture to create an app with server-side sessions and one user."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+            "PASSWORD_HASH_WORKERS": 0,
+            "SESSION_BACKEND": request.param,
+            "SESSION_SQLITE_PATH": str(tmp_path / "sessions.db"),
+            "SESSION_IDLE_TIMEOUT": LIFETIME,
+        }
+    )
+    app.session_interface.clock = clock
+
+    @app.route("/_flash")
+    def flash_message():
+        flash("Saved on the server")
+        return ""
+
+    @app.route("/_flashes")
+    def flashed_messages():
+        return " ".join(get_flashed_messages())
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="user@example.com", name="User", role="regular")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def request(app, client, method, url, **kwargs):
+    with app.app_context():
+        return client.open(url, method=method, **kwargs)
+
+
+def log_in(app, client):
+    return request(
+        app,
+        client,
+        "POST",
+        "/login",
+        data={"email": "user@example.com", "password": PASSWORD},
+    )
+
+
+def session_cookie(client):
+    cookie = client.get_cookie("session")
+    return cookie and cookie.value
+
+
+def test_cookie_holds_only_an_opaque_id(app):
+    client = app.test_client()
+    assert log_in(app, client).status_code == 302
+
+    sid, version = session_cookie(client).split(".")
+    assert len(sid) == 43 and version.isdigit()
+    assert request(app, client, "GET", "/all_tickets").status_code == 200
+    # The store never sees the ID itself
+    store = app.session_interface.store
+    assert store.get(sid) is None
+    assert store.get(ServerSessionInterface._key(sid)) is not None
+
+
+def test_flashed_messages_round_trip(app):
+    client = app.test_client()
+    request(app, client, "GET", "/_flash")
+    assert request(app, client, "GET", "/_flashes").text == "Saved on the server"
+    assert request(app, client, "GET", "/_flashes").text == ""
+
+
+def test_logging_in_and_out_changes_the_id(app):
+    client = app.test_client()
+    request(app, client, "GET", "/_flash")
+    anonymous = session_cookie(client).split(".")[0]
+
+    log_in(app, client)
+    logged_in = session_cookie(client).split(".")[0]
+    assert logged_in != anonymous
+    assert (
+        app.session_interface.store.get(ServerSessionInterface._key(anonymous)) is None
+    )
+
+    request(app, client, "GET", "/logout")
+    assert session_cookie(client) is None or (
+        session_cookie(client).split(".")[0] not in (anonymous, logged_in)
+    )
+    assert request(app, client, "GET", "/all_tickets").status_code == 302
+
+
+def test_sessions_expire_after_idling(app, clock):
+    client = app.test_client()
+    log_in(app, client)
+
+    # Requests keep pushing the expiry back
+    for _ in range(3):
+        clock.now += LIFETIME / 2
+        assert request(app, client, "GET", "/all_tickets").status_code == 200
+
+    clock.now += LIFETIME
+    assert request(app, client, "GET", "/all_tickets").status_code == 302
+
+
+def test_unchanged_sessions_are_written_back_only_now_and_then(app, clock):
+    client = app.test_client()
+    log_in(app, client)
+    store = app.session_interface.store
+
+    with patch.object(store, "put", wraps=store.put) as put:
+        request(app, client, "GET", "/all_tickets")
+        assert put.call_count == 0
+
+        clock.now += REFRESH_INTERVAL
+        request(app, client, "GET", "/all_tickets")
+        assert put.call_count == 1
+
+
+def test_cached_sessions_skip_the_store(app):
+    client = app.test_client()
+    log_in(app, client)
+    store = app.session_interface.store
+
+    with patch.object(store, "get", wraps=store.get) as get:
+        request(app, client, "GET", "/all_tickets")
+        assert get.call_count == 0
+
+        # An older version of the session is not served from the cache
+        sid, version = session_cookie(client).split(".")
+        client.set_cookie("session", f"{sid}.{int(version) - 1}")
+        assert request(app, client, "GET", "/all_tickets").status_code == 200
+        assert get.call_count == 1
+
+
+def test_sweep_deletes_idle_sessions(app, clock):
+    if app.config["SESSION_BACKEND"] == "kv":
+        pytest.skip("Redis expires the keys itself")
+    log_in(app, app.test_client())
+    store = app.session_interface.store
+    assert len(store) == 1
+
+    clock.now += LIFETIME
+    result = app.test_cli_runner().invoke(args=["sessions", "sweep"])
+    assert result.exit_code == 0, result.output
+    assert "Deleted 1 expired sessions." in result.output
+    assert len(store) == 0
+
+
+def test_cookie_sessions_by_default():
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    assert not isinstance(app.session_interface, ServerSessionInterface)
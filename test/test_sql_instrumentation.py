@@ -0,0 +1,129 @@
+import json
+import logging
+
+import pytest
+
+from app import create_app, db
+from app.instrumentation import RequestSQLStats, slow_query_logger
+from app.models import Ticket, User
+
+from .query_count import count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Fixture to create apps with instrumentation settings and one ticket."""
+    handlers = list(slow_query_logger.handlers)
+
+    def make_app(**config):
+        app = create_app(
+            {
+                "TESTING": True,
+                "SECRET_KEY": "test-secret-key",
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+                "WTF_CSRF_ENABLED": False,
+                "SLOW_QUERY_LOG": str(tmp_path / "slow.log"),
+                **config,
+            }
+        )
+        with app.app_context():
+            db.create_all()
+            user = User(email="admin@example.com", name="Admin", role="admin")
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(
+                Ticket(
+                    title="Printer is jammed",
+                    description="Paper is stuck",
+                    status="open",
+                    priority="high",
+                    user_id=user.id,
+                )
+            )
+            db.session.commit()
+        return app
+
+    yield make_app
+    for handler in set(slow_query_logger.handlers) - set(handlers):
+        slow_query_logger.removeHandler(handler)
+        handler.close()
+
+
+def login(app, client):
+    with app.app_context():
+        client.post("/login", data={"email": "admin@example.com", "password": PASSWORD})
+
+
+def test_server_timing_reports_the_requests_queries(make_app):
+    app = make_app()
+    client = app.test_client()
+    login(app, client)
+    with app.app_context():
+        with count_queries() as counter:
+            response = client.get("/ticket/1")
+
+    assert response.status_code == 200
+    db_timing, app_timing = response.headers["Server-Timing"].split(", ")
+    assert db_timing.startswith("db;dur=")
+    assert db_timing.endswith(f';desc="{counter.count} queries"')
+    assert app_timing.startswith("app;dur=")
+
+
+def test_requests_are_logged_as_json(make_app, caplog):
+    app = make_app(SQL_SLOWEST_STATEMENTS=2)
+    client = app.test_client()
+    login(app, client)
+    with caplog.at_level(logging.INFO, logger="app.sql"), app.app_context():
+        client.get("/ticket/1")
+
+    records = [json.loads(r.message) for r in caplog.records if r.name == "app.sql"]
+    assert len(records) == 1
+    record = records[0]
+    assert record["path"] == "/ticket/1"
+    assert record["endpoint"] == "main.ticket_details"
+    assert record["status"] == 200
+    assert record["statements"] > 0
+    assert len(record["slowest"]) == 2
+    assert record["slowest"][0]["ms"] >= record["slowest"][1]["ms"]
+
+
+def test_slow_statements_are_logged_with_their_plan(make_app, tmp_path):
+    app = make_app(SLOW_QUERY_MS=0)
+    client = app.test_client()
+    login(app, client)
+    with app.app_context():
+        client.get("/ticket/1")
+
+    log = (tmp_path / "slow.log").read_text()
+    assert "GET /ticket/1 (main.ticket_details)" in log
+    assert "FROM ticket" in log
+    # SQLite's EXPLAIN QUERY PLAN output for the lookup by primary key
+    assert "SEARCH ticket USING INTEGER PRIMARY KEY" in log
+
+
+def test_fast_statements_are_not_logged(make_app, tmp_path):
+    app = make_app(SLOW_QUERY_MS=10_000)
+    client = app.test_client()
+    login(app, client)
+    with app.app_context():
+        client.get("/ticket/1")
+    assert not (tmp_path / "slow.log").exists()
+
+
+def test_instrumentation_can_be_turned_off(make_app):
+    app = make_app(SQL_INSTRUMENTATION=False)
+    response = app.test_client().get("/login")
+    assert "Server-Timing" not in response.headers
+
+
+def test_stats_keep_only_the_slowest_statements():
+    stats = RequestSQLStats(keep=2)
+    for seconds, statement in [(0.1, "a"), (0.5, "b"), (0.2, "c"), (0.05, "d")]:
+        stats.record(statement, seconds)
+    assert stats.count == 4
+    assert stats.db_seconds == pytest.approx(0.85)
+    assert stats.slowest == [(0.5, "b"), (0.2, "c")]
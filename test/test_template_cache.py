@@ -0,0 +1,67 @@
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app, db
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Fixture to create apps caching template bytecode in a temporary directory."""
+
+    def make_app(**config):
+        app = create_app(
+            {
+                "TESTING": True,
+                "SECRET_KEY": "test-secret-key",
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "WTF_CSRF_ENABLED": False,
+                "TEMPLATE_BYTECODE_CACHE": True,
+                "TEMPLATE_CACHE_DIR": str(tmp_path / "jinja_cache"),
+                **config,
+            }
+        )
+        with app.app_context():
+            db.create_all()
+        return app
+
+    return make_app
+
+
+def get_login_page(app):
+    with app.app_context():
+        return app.test_client().get("/login")
+
+
+def test_precompiled_templates_are_not_compiled_again(make_app, tmp_path):
+    result = make_app().test_cli_runner().invoke(args=["templates", "precompile"])
+    assert result.exit_code == 0, result.output
+    templates = len(list((tmp_path / "jinja_cache").iterdir()))
+    assert f"Compiled {templates} templates" in result.output
+
+    # A new worker loads the bytecode instead of compiling
+    app = make_app()
+    with patch.object(app.jinja_env, "compile", side_effect=AssertionError):
+        assert get_login_page(app).status_code == 200
+
+
+def test_templates_render_when_the_cache_cannot_be_written(make_app, tmp_path, caplog):
+    app = make_app()
+    shutil.rmtree(tmp_path / "jinja_cache")
+    assert get_login_page(app).status_code == 200
+    assert "Could not write template bytecode" in caplog.text
+
+
+def test_preloading_fills_the_template_cache(make_app):
+    app = make_app(TEMPLATE_PRELOAD=True)
+    assert len(app.jinja_env.cache) == len(app.jinja_env.list_templates())
+
+
+def test_bytecode_cache_can_be_turned_off(make_app, tmp_path):
+    app = make_app(TEMPLATE_BYTECODE_CACHE=False)
+    assert app.jinja_env.bytecode_cache is None
+    assert get_login_page(app).status_code == 200
+    assert not (tmp_path / "jinja_cache").exists()
+    result = app.test_cli_runner().invoke(args=["templates", "precompile"])
+    assert result.exit_code != 0
@@ -0,0 +1,233 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import create_app, db
+from app.models import Comment, Ticket, User
+from app.tickets import update_ticket
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app with an admin, a support user and a ticket."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        admin = User(email="admin@example.com", name="Admin", role="admin")
+        support = User(email="support@example.com", name="Support", role="support")
+        for user in (admin, support):
+            user.set_password(PASSWORD)
+        db.session.add_all([admin, support])
+        db.session.commit()
+        db.session.add(
+            Ticket(
+                title="Printer is jammed",
+                description="Paper is stuck",
+                status="open",
+                priority="low",
+                user_id=admin.id,
+            )
+        )
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def login(app, email):
+    client = app.test_client()
+    client.post("/login", data={"email": email, "password": PASSWORD})
+    return client
+
+
+@pytest.fixture
+def commits():
+    """Counts the session commits made while the test runs."""
+    count = []
+
+    def record(session):
+        count.append(session)
+
+    event.listen(Session, "after_commit", record)
+    yield count
+    event.remove(Session, "after_commit", record)
+
+
+def ticket_state():
+    db.session.expire_all()
+    ticket = db.session.get(Ticket, 1)
+    comments = [c.comment_text for c in Comment.query.order_by(Comment.id)]
+    return ticket, comments
+
+
+def test_assignment_and_audit_comment_commit_together(app, commits):
+    client = login(app, "admin@example.com")
+    commits.clear()
+
+    with app.app_context():
+        response = client.post("/assign_ticket/1", data={"assigned_to": 2})
+    assert response.status_code == 302
+    assert len(commits) == 1
+
+    ticket, comments = ticket_state()
+    assert ticket.assigned_to == 2
+    assert comments == ["Ticket assigned to Support."]
+
+
+def test_support_takes_unassigned_ticket(app, commits):
+    client = login(app, "support@example.com")
+    commits.clear()
+
+    with app.app_context():
+        client.post("/unassigned_tickets", data={"ticket_id": 1})
+    assert len(commits) == 1
+
+    ticket, comments = ticket_state()
+    assert ticket.assigned_to == 2
+    assert comments == ["Ticket assigned to Support."]
+
+
+def test_ticket_details_changes_commit_once(app, commits):
+    client = login(app, "admin@example.com")
+    commits.clear()
+
+    with app.app_context():
+        client.post(
+            "/ticket/1",
+            data={
+                "comment_text": "Ordered new rollers",
+                "status": "in-progress",
+                "priority": "low",
+                "assignee": "2",
+            },
+        )
+    assert len(commits) == 1
+
+    ticket, comments = ticket_state()
+    assert (ticket.status, ticket.priority, ticket.assigned_to) == (
+        "in-progress",
+        "low",
+        2,
+    )
+    # The unchanged priority is not recorded
+    assert comments == [
+        "Ordered new rollers",
+        "Status changed to in-progress.",
+        "Assignee changed to Support.",
+    ]
+
+
+@pytest.mark.parametrize(
+    "assignee, message",
+    [
+        ("abc", "Invalid assignee selected."),
+        ("99", "The selected user does not exist."),
+    ],
+)
+def test_ticket_details_rejects_bad_assignees(app, commits, assignee, message):
+    admin = db.session.get(User, 1)
+    with update_ticket(db.session.get(Ticket, 1), admin) as update:
+        update.assign(db.session.get(User, 2))
+    client = login(app, "admin@example.com")
+    commits.clear()
+
+    with app.app_context():
+        response = client.post(
+            "/ticket/1", data={"status": "closed", "assignee": assignee}
+        )
+        assert response.status_code == 302
+        assert message in client.get(response.location).text
+    assert commits == []
+
+    ticket, comments = ticket_state()
+    assert (ticket.status, ticket.assigned_to) == ("open", 2)
+    assert comments == ["Assignee changed to Support."]
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ({}, "The selected ticket does not exist."),
+        ({"ticket_id": "abc"}, "The selected ticket does not exist."),
+        ({"ticket_id": "99"}, "The selected ticket does not exist."),
+        ({"ticket_id": "1", "assigned_to": "abc"}, "The selected user does not exist."),
+        ({"ticket_id": "1", "assigned_to": "99"}, "The selected user does not exist."),
+    ],
+)
+def test_assigning_unknown_tickets_or_users_is_refused(app, commits, data, message):
+    client = login(app, "admin@example.com")
+    commits.clear()
+
+    with app.app_context():
+        response = client.post("/unassigned_tickets", data={"assigned_to": "2", **data})
+        assert response.status_code == 302
+        assert message in client.get(response.location).text
+    assert commits == []
+    ticket, comments = ticket_state()
+    assert ticket.assigned_to is None
+    assert comments == []
+
+
+def test_regular_users_cannot_take_unassigned_tickets(app, commits):
+    regular = User(email="regular@example.com", name="Regular", role="regular")
+    regular.set_password(PASSWORD)
+    db.session.add(regular)
+    db.session.commit()
+    client = login(app, "regular@example.com")
+    commits.clear()
+
+    with app.app_context():
+        response = client.post("/unassigned_tickets", data={"ticket_id": 1})
+    assert response.status_code == 302
+    assert commits == []
+    ticket, comments = ticket_state()
+    assert ticket.assigned_to is None
+    assert comments == []
+
+
+def test_status_update_is_audited(app):
+    client = login(app, "support@example.com")
+
+    with app.app_context():
+        client.post("/update_status/1", data={"status": "closed"})
+
+    ticket, comments = ticket_state()
+    assert ticket.status == "closed"
+    assert comments == ["Status changed to closed."]
+
+
+def test_failed_update_writes_nothing(app):
+    admin = db.session.get(User, 1)
+    ticket = db.session.get(Ticket, 1)
+
+    with pytest.raises(RuntimeError):
+        with update_ticket(ticket, admin) as update:
+            update.assign(db.session.get(User, 2))
+            update.set_priority("high")
+            raise RuntimeError("request aborted")
+
+    ticket, comments = ticket_state()
+    assert (ticket.assigned_to, ticket.priority) == (None, "low")
+    assert comments == []
+
+
+def test_unchanged_values_are_not_audited(app):
+    admin = db.session.get(User, 1)
+    ticket = db.session.get(Ticket, 1)
+
+    with update_ticket(ticket, admin) as update:
+        update.set_status("open")
+        update.assign(None)
+    assert not update.changed
+    assert Comment.query.count() == 0
@@ -0,0 +1,89 @@
+import dataclasses
+
+import pytest
+
+from app import create_app, db
+from app.models import User
+from app.user_cache import UserCache, UserSnapshot, load_user
+from test.query_count import count_queries
+
+PASSWORD = "gyjvo9-kewvoh-Vurmuj!"
+
+
+@pytest.fixture
+def app():
+    """Fixture to create a Flask app instance for testing."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "test-secret-key",
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+            "WTF_CSRF_ENABLED": False,
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="testuser@example.com", name="Test User", role="admin")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def snapshot(user_id):
+    return UserSnapshot(user_id, f"User {user_id}", f"{user_id}@example.com", "regular")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = UserCache(maxsize=2)
+    cache.set(snapshot(1))
+    cache.set(snapshot(2))
+    cache.get(1)
+    cache.set(snapshot(3))
+
+    assert cache.get(1) is not None
+    assert cache.get(2) is None
+    assert cache.get(3) is not None
+    assert len(cache) == 2
+
+
+def test_cache_entries_expire():
+    cache = UserCache(ttl=0)
+    cache.set(snapshot(1))
+    assert cache.get(1) is None
+
+
+def test_snapshots_are_immutable():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot(1).name = "Changed"
+
+
+def test_load_user_is_served_from_cache(app):
+    first = load_user("1")
+    assert first.name == "Test User" and first.is_authenticated
+
+    with count_queries() as counter:
+        assert load_user(1) is first
+    assert counter.count == 0
+
+
+def test_profile_update_invalidates_cached_user(app, client):
+    client.post("/login", data={"email": "testuser@example.com", "password": PASSWORD})
+    with app.app_context():
+        client.get("/update_profile")
+    assert load_user(1).name == "Test User"
+
+    response = client.post(
+        "/update_profile",
+        data={"name": "Renamed User", "email": "renamed@example.com"},
+    )
+    assert response.status_code == 302
+
+    with app.app_context():
+        response = client.get("/update_profile")
+    assert b"Signed in as: Renamed User" in response.data
+    assert load_user(1).email == "renamed@example.com"